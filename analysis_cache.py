@@ -0,0 +1,99 @@
+"""
+Meeting AI Analyser - Analysis result cache
+Content-addressed LRU cache on disk (data/analysis_cache/), bounded in
+entries and bytes. Keys hash the normalized transcript, the prompt
+template, the conversation id and the backend.
+"""
+import hashlib
+import json
+import os
+import threading
+
+from paths import ANALYSIS_CACHE_DIR
+
+MAX_ENTRIES = 200
+MAX_BYTES = 20 * 1024 * 1024
+
+# Exposed in /api/analyst
+stats = {"hits": 0, "misses": 0, "last": ""}
+
+_lock = threading.Lock()
+
+
+def normalize(transcript):
+    """Drop the session header and blank lines, collapse whitespace"""
+    lines = []
+    for line in transcript.splitlines():
+        line = " ".join(line.split())
+        if line and not line.startswith("==="):
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def make_key(transcript, template, conversation_id="", backend=""):
+    payload = json.dumps([normalize(transcript), template, conversation_id or "", backend])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _path(key):
+    return os.path.join(ANALYSIS_CACHE_DIR, key + ".md")
+
+
+def get(key):
+    """Cached analysis or None. A hit refreshes the entry's LRU position (mtime)."""
+    path = _path(key)
+    with _lock:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = f.read()
+            os.utime(path)
+        except OSError:
+            stats["misses"] += 1
+            stats["last"] = "miss"
+            return None
+        stats["hits"] += 1
+        stats["last"] = "hit"
+        return value
+
+
+def put(key, value):
+    path = _path(key)
+    with _lock:
+        os.makedirs(ANALYSIS_CACHE_DIR, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(value)
+        os.replace(tmp, path)
+        _prune()
+
+
+def _prune():
+    """Evict least recently used entries beyond MAX_ENTRIES / MAX_BYTES"""
+    entries = []
+    with os.scandir(ANALYSIS_CACHE_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(".md") and entry.is_file():
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+    entries.sort(reverse=True)
+    total = 0
+    for i, (_, size, path) in enumerate(entries):
+        total += size
+        if i >= MAX_ENTRIES or total > MAX_BYTES:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def info():
+    """Stats + current size, for /api/analyst"""
+    entries = 0
+    size = 0
+    if os.path.isdir(ANALYSIS_CACHE_DIR):
+        with os.scandir(ANALYSIS_CACHE_DIR) as it:
+            for entry in it:
+                if entry.name.endswith(".md"):
+                    entries += 1
+                    size += entry.stat().st_size
+    return dict(stats, entries=entries, bytes=size)
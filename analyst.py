@@ -1,39 +1,69 @@
 """
 Meeting AI Analyser - AI analysis module
-Reads transcription every 60s and runs Claude to analyze the ongoing meeting
+Watches the transcription and runs Claude to analyze the ongoing meeting
+when enough new content was said (see scheduler.py)
 """
-import glob
+import argparse
+import hashlib
 import json
 import os
-import subprocess
 import sys
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from paths import TRANSCRIPTION_FILE, ANALYSIS_FILE, LOG_FILE, TEMP_PROMPT
+import analysis_cache
+import applog
+import conversation_index
+import events
+import sections
+import transcript_store
+from backends import ClaudeCLIBackend, make_backend
+from paths import TRANSCRIPTION_FILE, ANALYSIS_FILE, LOG_FILE, CHUNK_CACHE_FILE
+from scheduler import AnalysisScheduler, TranscriptWatcher
+from tracing import span
+from transcript import chunk_lines, compress, estimate_tokens, fit_budget, format_clock, parse_lines
 
 
-def log(msg):
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(f"[{time.strftime('%H:%M:%S')}] {msg}\n")
+log = applog.logger(LOG_FILE)
 
 
 # Timing state (exposed for server.py)
-analyst_status = {"state": "idle", "last_run": 0, "next_run": 0, "interval": 60, "paused": False, "conversation_id": ""}
+analyst_status = {"state": "idle", "last_run": 0, "next_run": 0, "interval": 60, "paused": False, "conversation_id": "",
+                  "mode": "incremental", "last_kind": "", "last_prompt_chars": 0,
+                  "pending_words": 0, "last_reason": "", "debounce": 0, "backend": "",
+                  "lenses": {}, "compression": {}}
+
+# Analysis being generated (streaming mode), pushed by server.py as "analysis_partial"
+partial_analysis = {"content": "", "version": 0, "active": False}
+
+CLAUDE_TIMEOUT = 120
+
+# Analysis backend (backends.py), created on first use
+_backend = None
+_backend_lock = threading.Lock()
+
+# The analyst sleeps until one of these is published (events.py), or until
+# the scheduler's next deadline
+WAKE_TOPICS = ("transcript", "analyst", "stop")
 
 # Events for manual trigger and pause control
 _trigger_event = threading.Event()
+_trigger_opts = {"force": False}
 _pause_lock = threading.Lock()
 
 
-def trigger_now():
-    """Trigger an immediate analysis (called from server.py)"""
+def trigger_now(force=False):
+    """Trigger an immediate analysis (called from server.py). force=True bypasses the cache."""
+    _trigger_opts["force"] = force
     _trigger_event.set()
+    events.publish("analyst", trigger=True)
 
 
 def set_paused(paused):
     """Pause or resume automatic analysis"""
     analyst_status["paused"] = paused
+    events.publish("analyst", paused=paused)
 
 
 def set_conversation_id(cid):
@@ -57,71 +87,37 @@ def _find_claude_projects_dir():
     return None
 
 
-def list_conversations(limit=50):
-    """Scan all projects in .claude/projects/ for conversation JSONL files"""
+def list_conversations(limit=50, offset=0, prefix=""):
+    """Conversations in .claude/projects/, most recent first (see conversation_index.py)"""
     claude_dir = _find_claude_projects_dir()
     if not claude_dir:
-        return {"conversations": [], "base_path": None}
-    files = glob.glob(os.path.join(claude_dir, "**", "*.jsonl"), recursive=True)
-    files.sort(key=os.path.getmtime, reverse=True)
-    results = []
-    for fpath in files[:limit]:
-        sid = os.path.splitext(os.path.basename(fpath))[0]
-        raw_project = os.path.basename(os.path.dirname(fpath))
-        if raw_project == "subagents":
-            continue
-        # Clean: strip drive prefix (C-- or c--), keep rest as-is
-        project = raw_project
-        if project[:3].lower() == "c--":
-            project = project[3:]
-        mtime = os.path.getmtime(fpath)
-        date_str = time.strftime("%m/%d %H:%M", time.localtime(mtime))
-        preview = ""
-        try:
-            with open(fpath, "r", encoding="utf-8") as f:
-                for line_num, raw_line in enumerate(f):
-                    if line_num > 20:
-                        break
-                    entry = json.loads(raw_line)
-                    # Format 1: type=user with message.content[].text
-                    if entry.get("type") == "user":
-                        msg = entry.get("message", {})
-                        content_blocks = msg.get("content", []) if isinstance(msg, dict) else []
-                        if isinstance(content_blocks, list):
-                            for block in content_blocks:
-                                if isinstance(block, dict) and block.get("type") == "text":
-                                    preview = block.get("text", "").strip()[:80]
-                                    break
-                        elif isinstance(content_blocks, str):
-                            preview = content_blocks.strip()[:80]
-                        if preview:
-                            break
-                    # Format 2: queue-operation with content
-                    if entry.get("type") == "queue-operation" and entry.get("content"):
-                        raw_content = entry["content"]
-                        for text_line in raw_content.split("\n"):
-                            s = text_line.strip()
-                            if s and not s.startswith("===") and not s.startswith("INSTRUCTION"):
-                                preview = s[:80]
-                                break
-                        if preview:
-                            break
-        except Exception:
-            pass
-        if not preview:
-            preview = sid[:16]
-        results.append({"id": sid, "project": project, "date": date_str, "preview": preview})
-    return {"conversations": results, "base_path": claude_dir}
+        return {"conversations": [], "base_path": None, "total": 0}
+    conversation_index.refresh(claude_dir)
+    conversations, total = conversation_index.query(limit, offset, prefix)
+    return {"conversations": conversations, "base_path": claude_dir, "total": total,
+            "offset": offset, "limit": limit}
 
 
 _last_content_lock = threading.Lock()
-_last_content_ref = {"value": ""}
+# Fingerprint of the last analyzed transcript (transcript_store.fingerprint)
+_last_content_ref = {"hash": ""}
+
+
+# Incremental mode: last successful analysis and how much of the transcription
+# it covers (logical offset, see transcript_store). "anchor" is the text just
+# before offset, used to detect rewrites. "failed_consolidations" backs off the
+# next consolidation (consolidate_every doubles per failure, up to 8x).
+ANCHOR_CHARS = 200
+MAX_CONSOLIDATE_BACKOFF = 3
+_rolling = {"summary": "", "offset": 0, "anchor": "", "runs_since_full": 0, "failed_consolidations": 0}
 
 
 def reset_content():
     """Reset last_content so next analysis isn't skipped after a reset"""
     with _last_content_lock:
-        _last_content_ref["value"] = ""
+        _last_content_ref["hash"] = ""
+        _rolling.update(summary="", offset=0, anchor="", runs_since_full=0, failed_consolidations=0)
+        _lens_sections.clear()
 
 PROMPT = """You are a real-time meeting assistant. Here is the live transcription of an ongoing meeting.
 
@@ -139,153 +135,615 @@ TRANSCRIPTION:
 """
 
 
+INCREMENTAL_PROMPT = """You are a real-time meeting assistant. Below is your previous analysis of an ongoing meeting, followed by the new part of the live transcription since that analysis.
+
+INSTRUCTIONS:
+Update the previous analysis with the new transcription and return the complete updated analysis, same structure:
+1. Summarize the topics discussed
+2. List decisions made
+3. Identify open questions
+4. Suggest technical solutions if relevant
+5. List action items (who does what)
+
+Keep earlier points unless the new transcription changes them.
+Be concise and structured. Markdown format.
+
+PREVIOUS ANALYSIS:
+{summary}
+
+NEW TRANSCRIPTION:
+{delta}
+"""
+
+
+CHUNK_PROMPT = """You are a meeting assistant. Here is one part ({start} - {end}) of a meeting transcription.
+
+Summarize this part only, in a few bullet points: topics, decisions, open questions, action items (who does what).
+Be concise. Markdown format.
+
+TRANSCRIPTION:
+{transcription}
+"""
+
+REDUCE_PROMPT = """You are a real-time meeting assistant. Here are summaries of the consecutive parts of an ongoing meeting, followed by the latest part of the live transcription.
+
+INSTRUCTIONS:
+1. Summarize the topics discussed
+2. List decisions made
+3. Identify open questions
+4. Suggest technical solutions if relevant
+5. List action items (who does what)
+
+Cover the whole meeting. Be concise and structured. Markdown format.
+
+PART SUMMARIES:
+{summaries}
+
+LATEST TRANSCRIPTION:
+{tail}
+"""
+
+
+# Lens mode: one focused call per section, run concurrently
+LENS_PROMPT = """You are a real-time meeting assistant. Here is the live transcription of an ongoing meeting.
+
+INSTRUCTIONS:
+{focus}
+
+Return only the content of the "{title}" section, without the heading.
+Be concise: bullet points, Markdown format. Write "None so far." if there is nothing yet.
+
+TRANSCRIPTION:
+{transcription}
+"""
+
+# name -> (section title, focus instruction)
+LENSES = {
+    "summary": ("Topics Discussed", "Summarize the topics discussed."),
+    "decisions": ("Decisions Made", "List the decisions made."),
+    "questions": ("Open Questions", "Identify the open questions."),
+    "actions": ("Action Items", "List the action items: who does what, and by when if it was said."),
+    "risks": ("Risks", "Identify risks, blockers and concerns, raised or implied."),
+    "technical": ("Technical Deep-Dive", "Suggest technical solutions to the problems discussed, with trade-offs."),
+}
+DEFAULT_LENSES = ("summary", "decisions", "questions", "technical", "actions")
+
+# Last completed text of each lens: shown until that lens completes again
+_lens_sections = {}
+
+
+# Transcript preprocessing before prompting (see transcript.compress / fit_budget)
+_compression = {"enabled": True, "granularity": 60, "budget": 0, "policy": "head_tail"}
+
+
+def set_compression(enabled=True, budget=0, policy="head_tail", granularity=60):
+    """budget: max transcript tokens per prompt (0 = no limit)"""
+    _compression.update(enabled=enabled, budget=budget, policy=policy, granularity=granularity)
+
+
+def prepare_transcript(text, budget=True):
+    """Transcript as sent to Claude: compressed, then trimmed to the token budget"""
+    raw_tokens = estimate_tokens(text)
+    with span("compress", cat="analyst", chars=len(text)):
+        if _compression["enabled"]:
+            text = compress(text, _compression["granularity"])
+        if budget:
+            text = fit_budget(text, _compression["budget"], _compression["policy"])
+    analyst_status["compression"] = {"raw_tokens": raw_tokens, "tokens": estimate_tokens(text)}
+    return text
+
+
 def read_transcription():
+    """(text, start): the transcription (its recent window in long-session
+    mode) and the logical offset where it starts. (None, 0) without a file."""
     if not os.path.exists(TRANSCRIPTION_FILE):
-        return None
-    with open(TRANSCRIPTION_FILE, "r", encoding="utf-8") as f:
-        return f.read().strip()
-
-
-def analyze_with_claude(text):
-    prompt = PROMPT.format(transcription=text)
-
-    # Write prompt to temp file to avoid Windows quote issues
-    prompt_file = TEMP_PROMPT
-    with open(prompt_file, "w", encoding="utf-8") as f:
-        f.write(prompt)
-
-    # Find claude in known paths
-    claude_cmd = "claude"
-    for path in [
-        os.path.expanduser("~/AppData/Roaming/npm/claude.cmd"),
-        "C:/Program Files/nodejs/claude.cmd",
-    ]:
-        if os.path.exists(path):
-            claude_cmd = path
-            break
+        return None, 0
+    text, start = transcript_store.read_window()
+    stripped = text.lstrip()
+    return stripped.rstrip(), start + len(text) - len(stripped)
 
-    log(f"Using claude: {claude_cmd}")
-    try:
-        env = os.environ.copy()
-        env.pop("CLAUDECODE", None)
-        cmd = [claude_cmd, "--print"]
-        cid = analyst_status["conversation_id"]
-        if cid:
-            cmd += ["--resume", cid]
-        log(f"Calling {' '.join(cmd)} (prompt length: {len(prompt)})")
-        result = subprocess.run(
-            cmd,
-            input=prompt,
-            capture_output=True,
-            text=True,
-            timeout=120,
-            encoding="utf-8",
-            env=env,
-        )
-        log(f"Return code: {result.returncode}")
-        log(f"Stdout length: {len(result.stdout)}")
-        if result.stderr:
-            log(f"Stderr: {result.stderr[:500]}")
-        if result.returncode == 0 and result.stdout.strip():
-            return result.stdout.strip()
-        else:
-            log(f"FAIL: no output or bad return code")
-            return None
-    except FileNotFoundError:
-        log(f"ERROR: claude not found at {claude_cmd}")
-        sys.exit(1)
-    except subprocess.TimeoutExpired:
-        log("ERROR: claude timed out (120s)")
+
+def analyze_with_claude(text, on_text=None):
+    """Full analysis of the whole transcription"""
+    return run_claude(PROMPT.format(transcription=prepare_transcript(text)), on_text=on_text)
+
+
+def analyze_incremental(summary, delta, on_text=None):
+    """Update a previous analysis with the transcription delta only"""
+    return run_claude(INCREMENTAL_PROMPT.format(summary=summary, delta=prepare_transcript(delta)), on_text=on_text)
+
+
+def transcript_delta(content, start=0):
+    """Text appended since the last successful analysis ("" if none).
+
+    `start` is the logical offset of content (see read_transcription). None
+    when there is no previous analysis, the transcription was reset/rewritten,
+    or the delta no longer fits in the window.
+    """
+    offset = _rolling["offset"] - start
+    if not _rolling["offset"] or offset <= 0 or len(content) < offset:
         return None
-    except Exception as e:
-        log(f"ERROR: {type(e).__name__}: {e}")
+    if content[max(0, offset - ANCHOR_CHARS):offset] != _rolling["anchor"]:
         return None
-    finally:
-        if os.path.exists(prompt_file):
-            os.remove(prompt_file)
+    return content[offset:].strip()
 
 
-def start(stop_event, interval=60):
-    """Entry point for module mode (called from main.py as thread)"""
-    _run(stop_event=stop_event, interval=interval)
+def get_backend():
+    """Active analysis backend (claude CLI unless set_backend() chose another)"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = ClaudeCLIBackend(timeout=CLAUDE_TIMEOUT)
+            analyst_status["backend"] = _backend.id()
+        return _backend
+
+
+def set_backend(backend):
+    global _backend
+    with _backend_lock:
+        _backend = backend
+        analyst_status["backend"] = backend.id()
+
+
+def cancel_analysis():
+    """Abort the running analysis (the run is then reported as failed)"""
+    log("Analysis cancelled")
+    get_backend().cancel()
+
+
+def run_claude(prompt, resume=True, on_text=None):
+    """Send a prompt to the analysis backend, return the response text or None.
 
+    resume=False never attaches the selected conversation (used for parallel chunk calls).
+    on_text(text so far) switches to streaming output and is called as tokens arrive.
+    """
+    analyst_status["last_prompt_chars"] = len(prompt)
+    cid = analyst_status["conversation_id"] if resume else ""
+    return get_backend().analyze(prompt, conversation_id=cid, on_text=on_text)
 
-def _run(stop_event=None, interval=60):
-    """Main analysis logic"""
-    _last_content_ref["value"] = ""
+
+# Map-reduce mode: summaries of closed chunks, keyed by content hash (persisted)
+CHUNK_CACHE_MAX = 1000
+_chunk_cache = {}
+_chunk_cache_loaded = False
+_chunk_cache_lock = threading.Lock()
+
+
+def _chunk_key(chunk):
+    settings = f"{_compression['enabled']}:{_compression['granularity']}"
+    return hashlib.sha256((CHUNK_PROMPT + "\0" + settings + "\0" + chunk["text"]).encode("utf-8")).hexdigest()
+
+
+def _load_chunk_cache():
+    global _chunk_cache_loaded
+    if _chunk_cache_loaded:
+        return
+    _chunk_cache_loaded = True
+    if os.path.exists(CHUNK_CACHE_FILE):
+        try:
+            with open(CHUNK_CACHE_FILE, "r", encoding="utf-8") as f:
+                _chunk_cache.update(json.load(f))
+        except Exception as e:
+            log.warning(f"Chunk cache unreadable, starting empty: {e}")
+
+
+def _save_chunk_cache():
+    # Oldest entries first (insertion order): keep the most recent ones
+    for key in list(_chunk_cache)[:-CHUNK_CACHE_MAX]:
+        del _chunk_cache[key]
+    tmp = CHUNK_CACHE_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(_chunk_cache, f)
+    os.replace(tmp, CHUNK_CACHE_FILE)
+
+
+def summarize_chunks(chunks, workers=3):
+    """Map step: summary of each closed chunk (None on failure).
+
+    Cached chunks are never re-sent; the others run concurrently on at most `workers` calls.
+    A partial chunk (cut by the long-session window) is summarized but never cached.
+    """
+    with _chunk_cache_lock:
+        _load_chunk_cache()
+        keys = [_chunk_key(c) for c in chunks]
+        pending = {k: c for k, c in zip(keys, chunks) if c["partial"] or k not in _chunk_cache}
+    fresh = {}
+
+    if pending:
+        log(f"Summarizing {len(pending)}/{len(chunks)} chunks ({workers} workers)")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chunk") as pool:
+            futures = {
+                pool.submit(run_claude, CHUNK_PROMPT.format(
+                    start=format_clock(c["start"]), end=format_clock(c["end"]),
+                    transcription=prepare_transcript(c["text"], budget=False),
+                ), False): k
+                for k, c in pending.items()
+            }
+            for future in as_completed(futures):
+                summary = future.result()
+                if summary:
+                    fresh[futures[future]] = summary
+        with _chunk_cache_lock:
+            _chunk_cache.update((k, s) for k, s in fresh.items() if not pending[k]["partial"])
+            _save_chunk_cache()
+
+    with _chunk_cache_lock:
+        return [fresh.get(k) or _chunk_cache.get(k) for k in keys]
+
+
+def analyze_mapreduce(text, chunk_seconds=300, workers=3, on_text=None, partial_head=False):
+    """Summarize closed time chunks (cached), then reduce them with the open tail.
+
+    partial_head: `text` is a window whose older lines were cut (long-session mode).
+    """
+    chunks = chunk_lines(parse_lines(text), chunk_seconds, partial_head)
+    closed = [c for c in chunks if c["closed"]]
+    if not closed:
+        return analyze_with_claude(text, on_text)
+
+    with span("map", cat="analyst", chunks=len(closed)):
+        summaries = summarize_chunks(closed, workers)
+    parts = []
+    for chunk, summary in zip(closed, summaries):
+        # A failed chunk goes in verbatim rather than being dropped
+        parts.append(f"### {format_clock(chunk['start'])} - {format_clock(chunk['end'])}\n{summary or chunk['text']}")
+    with span("reduce", cat="analyst"):
+        tail = prepare_transcript(chunks[-1]["text"])
+        return run_claude(REDUCE_PROMPT.format(summaries="\n\n".join(parts), tail=tail), on_text=on_text)
+
+
+def _render_lenses(lenses, current):
+    parts = []
+    for name in lenses:
+        body = current.get(name) or _lens_sections.get(name) or "_Analyzing..._"
+        parts.append(f"## {LENSES[name][0]}\n{body}")
+    return "\n\n".join(parts)
+
+
+def analyze_lenses(text, lenses=DEFAULT_LENSES, workers=3, on_text=None):
+    """One call per lens, at most `workers` at once.
+
+    Each lens replaces its own section as soon as it completes (ANALYSIS_FILE and
+    on_text); the others keep their previous text meanwhile. A failed lens keeps
+    its previous text. Returns (combined analysis, every lens succeeded); the
+    analysis is None if every lens failed.
+    """
+    text = prepare_transcript(text)
+    current = {}
+    lock = threading.Lock()
+    analyst_status["lenses"] = {name: "pending" for name in lenses}
+
+    def _publish():
+        if on_text:
+            on_text(_render_lenses(lenses, current))
+
+    def _run_lens(name):
+        title, focus = LENSES[name]
+        analyst_status["lenses"][name] = "running"
+
+        def _on_text(partial):
+            with lock:
+                current[name] = partial
+                _publish()
+
+        with span("lens", cat="analyst", lens=name):
+            return run_claude(LENS_PROMPT.format(focus=focus, title=title, transcription=text), resume=False,
+                              on_text=_on_text if on_text else None)
+
+    done = completed = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(_run_lens, name): name for name in lenses}
+        for future in as_completed(futures):
+            name = futures[future]
+            result = future.result()
+            completed += 1
+            with lock:
+                if result:
+                    done += 1
+                    _lens_sections[name] = result
+                    current[name] = result
+                else:
+                    current.pop(name, None)
+                analyst_status["lenses"][name] = "done" if result else "failed"
+                log.log(applog.INFO if result else applog.WARNING, f"Lens {name}: {'done' if result else 'FAILED'}")
+                _publish()
+                # The final document is written by _run
+                if result and completed < len(futures):
+                    write_analysis(_render_lenses(lenses, current))
+    if not done:
+        return None, False
+    return _render_lenses(lenses, current), done == len(futures)
+
+
+def _prompt_template(mode, lenses=DEFAULT_LENSES):
+    """Prompt template(s) and preprocessing an analysis depends on, part of the cache key"""
+    if mode == "incremental":
+        template = PROMPT + INCREMENTAL_PROMPT
+    elif mode == "mapreduce":
+        template = CHUNK_PROMPT + REDUCE_PROMPT
+    elif mode == "lenses":
+        template = LENS_PROMPT + json.dumps([LENSES[name] for name in lenses])
+    else:
+        template = PROMPT
+    return template + json.dumps(_compression, sort_keys=True)
+
+
+def _backend_id():
+    return get_backend().id()
+
+
+def _analysis_header():
+    return f"# Meeting Analysis - {time.strftime('%Y-%m-%d %H:%M')}\n\n"
+
+
+def publish_partial(text):
+    """Expose the analysis being generated to server.py (pushed on /api/stream)"""
+    partial_analysis["content"] = _analysis_header() + text
+    partial_analysis["version"] += 1
+    partial_analysis["active"] = True
+    events.publish("analysis_partial")
+
+
+def end_partial():
+    """The analysis being generated is over (written or failed): clients drop the partial"""
+    partial_analysis["active"] = False
+    events.publish("analysis_partial")
+
+
+def write_analysis(analysis):
+    """Replace ANALYSIS_FILE atomically, so readers never see a half-written analysis.
+
+    The analysis is also stored as versioned sections (sections.py) for the UI.
+    """
+    header = _analysis_header()
+    sections.update(analysis, header.strip("# \n"))
+    tmp = ANALYSIS_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(header)
+        f.write(analysis)
+        f.write("\n")
+    for attempt in range(5):
+        try:
+            os.replace(tmp, ANALYSIS_FILE)
+            break
+        except PermissionError:
+            # Windows: the server may be reading the file right now
+            time.sleep(0.05)
+    else:
+        os.replace(tmp, ANALYSIS_FILE)
+    events.publish("analysis")
+
+
+def start(stop_event, interval=60, mode="incremental", consolidate_every=10, chunk_minutes=5, workers=3,
+          stream=True, schedule=None, lenses=DEFAULT_LENSES):
+    """Entry point for module mode (called from main.py as thread)"""
+    _run(stop_event=stop_event, interval=interval, mode=mode, consolidate_every=consolidate_every,
+         chunk_minutes=chunk_minutes, workers=workers, stream=stream, schedule=schedule, lenses=lenses)
+
+
+def _wait(cursor, until=None):
+    """Sleep until new transcription, a trigger, pause/resume or stop (events after `cursor`),
+    or until `until` (time.time()); returns the new cursor.
+
+    Also wakes every events fallback interval, for a transcription written
+    by a process that doesn't publish here.
+    """
+    timeout = events.settings["fallback"]
+    if until:
+        timeout = min(timeout, max(0.0, until - time.time()))
+    cursor, _ = events.wait(WAKE_TOPICS, cursor, timeout)
+    return cursor
+
+
+def _run(stop_event=None, interval=60, mode="incremental", consolidate_every=10, chunk_minutes=5, workers=3,
+         stream=True, schedule=None, lenses=DEFAULT_LENSES):
+    """Main analysis logic.
+
+    Runs are decided by AnalysisScheduler from what was said since the last run
+    (`schedule`: its keyword options); `interval` is the longest wait once
+    something new was said.
+    mode="incremental" sends only the transcript delta plus the previous analysis,
+    and every `consolidate_every` runs re-consolidates from the cached chunk
+    summaries (map-reduce); a failed consolidation falls back to incremental
+    runs and is retried after twice as many; mode="mapreduce"
+    summarizes `chunk_minutes` chunks in parallel (cached) and reduces them;
+    mode="lenses" runs one focused call per lens (`workers` at once), each
+    updating its own section; mode="full" always sends the whole transcription.
+    stream=True publishes the analysis as it is generated (partial_analysis).
+    """
+    reset_content()
+    scheduler = AnalysisScheduler(max_interval=interval, **(schedule or {}))
+    watcher = TranscriptWatcher(TRANSCRIPTION_FILE)
 
     log("=== ANALYST STARTED ===")
-    log(f"Interval: {interval}s")
+    log(f"Max interval: {interval}s, mode: {mode}, schedule: {schedule or 'default'}")
+    log(f"Backend: {get_backend().id()}")
     analyst_status["interval"] = interval
-    analyst_status["next_run"] = time.time() + interval
+    analyst_status["mode"] = mode
+    analyst_status["next_run"] = 0
     print("[ANALYST] AI analysis module started")
-    print(f"[ANALYST] Interval: {interval}s")
+    print(f"[ANALYST] Max interval: {interval}s, mode: {mode}")
 
     while True:
         if stop_event and stop_event.is_set():
             break
 
+        # Taken before looking at the state: what is published from now on wakes _wait()
+        cursor = events.cursor()
+
         # Check for manual trigger
         manual = _trigger_event.is_set()
+        force = manual and _trigger_opts["force"]
         if manual:
             _trigger_event.clear()
+            _trigger_opts["force"] = False
+
+        # Cheap: stat + read only what was appended since the last check
+        now = time.time()
+        scheduler.observe(watcher.poll(), now)
+        analyst_status["pending_words"] = scheduler.pending_words
 
         # Skip auto-analysis if paused (but allow manual triggers)
         if analyst_status["paused"] and not manual:
             analyst_status["state"] = "paused"
             analyst_status["next_run"] = 0
-            # Wait 1s or until triggered/unpaused
-            if stop_event:
-                stop_event.wait(1)
-            else:
-                time.sleep(1)
+            _wait(cursor)
             continue
 
-        # Re-check paused after waking up (user may have paused during sleep)
-        if analyst_status["paused"] and not manual:
+        reason = "manual" if manual else scheduler.due(now)
+        if not reason:
+            analyst_status["state"] = "idle"
+            analyst_status["next_run"] = scheduler.next_run()
+            _wait(cursor, scheduler.next_check(now))
             continue
 
-        content = read_transcription()
+        with span("read_transcription", cat="analyst"):
+            content, start = read_transcription()
+            content_hash = transcript_store.fingerprint(content) if content else ""
 
-        if content and len(content) > 50 and (content != _last_content_ref["value"] or manual):
-            _last_content_ref["value"] = content
+        run_start = time.time()
+        duration = 0
+        if content and len(content) > 50 and (content_hash != _last_content_ref["hash"] or manual):
+            _last_content_ref["hash"] = content_hash
             timestamp = time.strftime("%H:%M:%S")
-            trigger_label = " (manual)" if manual else ""
+            trigger_label = f" ({reason})"
+            analyst_status["last_reason"] = reason
             log(f"New transcription ({len(content)} chars), launching analysis...{trigger_label}")
             print(f"[{timestamp}] Analyzing{trigger_label}...")
 
+            delta = transcript_delta(content, start) if mode == "incremental" else None
+            backoff = 2 ** min(_rolling["failed_consolidations"], MAX_CONSOLIDATE_BACKOFF)
+            incremental = bool(delta) and _rolling["runs_since_full"] < consolidate_every * backoff
+            if incremental:
+                kind = "incremental"
+            elif delta:
+                # Re-consolidate from the chunk summaries: only chunks closed since are sent
+                kind = "consolidate"
+            else:
+                kind = mode if mode in ("mapreduce", "lenses") else "full"
+            log.debug(f"Analysis kind: {kind} (delta: {len(delta) if delta else 0} chars)")
+
             analyst_status["state"] = "analyzing"
-            analysis = analyze_with_claude(content)
+            cache_key = analysis_cache.make_key(
+                content, _prompt_template(mode, lenses), analyst_status["conversation_id"], _backend_id(),
+            )
+            analysis = None if force else analysis_cache.get(cache_key)
+            if analysis:
+                log("Cache hit: same transcript/prompt/conversation already analyzed")
+                kind = "cached"
+            else:
+                on_text = publish_partial if stream else None
+                complete = True
+                with span("analysis", cat="analyst", chars=len(content), manual=manual, kind=kind):
+                    if incremental:
+                        analysis = analyze_incremental(_rolling["summary"], delta, on_text)
+                    elif kind in ("mapreduce", "consolidate"):
+                        analysis = analyze_mapreduce(content, chunk_minutes * 60, workers, on_text,
+                                                     partial_head=start > 0)
+                    elif kind == "lenses":
+                        analysis, complete = analyze_lenses(content, lenses, workers, on_text)
+                    else:
+                        analysis = analyze_with_claude(content, on_text)
+                # Failed lenses hold older text: not cached, so the next run retries them
+                if analysis and complete:
+                    analysis_cache.put(cache_key, analysis)
             analyst_status["state"] = "paused" if analyst_status["paused"] else "idle"
             analyst_status["last_run"] = time.time()
+            analyst_status["last_kind"] = kind
+            if kind != "cached":
+                duration = analyst_status["last_run"] - run_start
 
             if analysis:
-                with open(ANALYSIS_FILE, "w", encoding="utf-8") as f:
-                    f.write(f"# Meeting Analysis - {time.strftime('%Y-%m-%d %H:%M')}\n\n")
-                    f.write(analysis)
-                    f.write("\n")
+                if kind == "incremental":
+                    _rolling["runs_since_full"] += 1
+                elif kind != "cached":
+                    _rolling.update(runs_since_full=0, failed_consolidations=0)
+                _rolling.update(summary=analysis, offset=start + len(content), anchor=content[-ANCHOR_CHARS:])
+                with span("analysis_write", cat="analyst"):
+                    write_analysis(analysis)
 
                 print(f"[{timestamp}] Analysis saved to {ANALYSIS_FILE}")
             else:
+                if kind == "consolidate":
+                    # Keep going incrementally from the last summary, retry later
+                    _rolling["failed_consolidations"] += 1
+                    backoff = 2 ** min(_rolling["failed_consolidations"], MAX_CONSOLIDATE_BACKOFF)
+                    log.warning(f"Consolidation failed, back to incremental (retry in "
+                                f"{consolidate_every * backoff - _rolling['runs_since_full']} runs)")
                 print(f"[{timestamp}] No analysis returned.")
-        else:
-            timestamp = time.strftime("%H:%M:%S")
-            if manual:
-                print(f"[{timestamp}] Manual trigger: no new transcription to analyze.")
-            else:
-                print(f"[{timestamp}] Waiting for new transcription...")
+            end_partial()
+        elif manual:
+            print(f"[{time.strftime('%H:%M:%S')}] Manual trigger: no new transcription to analyze.")
 
-        analyst_status["next_run"] = time.time() + interval
-        if stop_event:
-            stop_event.wait(interval)
-        else:
-            time.sleep(interval)
+        # Only a real analysis (not a cache hit) feeds the duration average used for debouncing
+        scheduler.record_run(duration, time.time())
+        analyst_status["next_run"] = scheduler.next_run()
+        analyst_status["debounce"] = round(scheduler.debounce(), 1)
 
     print("[ANALYST] Analysis module stopped.")
 
 
+def report(path, output=None, chunk_minutes=5, workers=3):
+    """Post-meeting report: map-reduce analysis of a saved transcription"""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read().strip()
+    analysis = analyze_mapreduce(text, chunk_minutes * 60, workers)
+    if not analysis:
+        print("[REPORT] No analysis returned.")
+        return 1
+    output = output or os.path.splitext(path)[0] + "_report.md"
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(f"# Meeting Report - {time.strftime('%Y-%m-%d %H:%M')}\n\n")
+        f.write(analysis)
+        f.write("\n")
+    print(f"[REPORT] Saved to {output}")
+    return 0
+
+
+def parse_lenses(value):
+    """argparse type for --lenses: "actions,decisions" -> ("actions", "decisions")"""
+    names = tuple(n.strip() for n in value.split(",") if n.strip())
+    unknown = [n for n in names if n not in LENSES]
+    if unknown or not names:
+        raise argparse.ArgumentTypeError(f"unknown lens(es): {', '.join(unknown)} (choose from {', '.join(LENSES)})")
+    return names
+
+
 def main():
     """Standalone entry point"""
+    parser = argparse.ArgumentParser(description="Meeting AI Analyser - Analysis")
+    parser.add_argument("--interval", type=int, default=60,
+                        help="Longest wait before analyzing new content (seconds)")
+    parser.add_argument("--min-words", type=int, default=80, help="Analyze once this many new words")
+    parser.add_argument("--silence", type=int, default=10, help="Analyze after this many seconds of silence")
+    parser.add_argument("--min-interval", type=int, default=20, help="Minimum gap between analyses (seconds)")
+    parser.add_argument("--mode", choices=["incremental", "mapreduce", "lenses", "full"], default="incremental")
+    parser.add_argument("--lenses", type=parse_lenses, default=DEFAULT_LENSES,
+                        help=f"Lens mode: comma-separated lenses among {', '.join(LENSES)}")
+    parser.add_argument("--consolidate-every", type=int, default=10,
+                        help="Incremental mode: re-consolidate every N runs")
+    parser.add_argument("--chunk-minutes", type=int, default=5, help="Map-reduce chunk length")
+    parser.add_argument("--workers", type=int, default=3, help="Map-reduce/lens parallel calls")
+    parser.add_argument("--no-compress", action="store_true", help="Send the raw transcript (no compression)")
+    parser.add_argument("--token-budget", type=int, default=0,
+                        help="Max transcript tokens per prompt, 0 = no limit")
+    parser.add_argument("--truncate", choices=["head_tail", "tail"], default="head_tail",
+                        help="What to keep over the token budget: opening + most recent, or most recent only")
+    parser.add_argument("--report", type=str, default=None, metavar="TRANSCRIPT",
+                        help="Write a one-shot map-reduce report for a saved transcription and exit")
+    parser.add_argument("--output", type=str, default=None, help="Report output file")
+    parser.add_argument("--backend", choices=["cli", "http"], default="cli",
+                        help="cli: claude --print per analysis; http: direct API calls (ANTHROPIC_API_KEY)")
+    parser.add_argument("--backend-url", type=str, default=None, help="HTTP backend base URL")
+    parser.add_argument("--backend-model", type=str, default=None, help="HTTP backend model")
+    args = parser.parse_args()
+
+    set_backend(make_backend(args.backend, args.backend_url, args.backend_model, CLAUDE_TIMEOUT))
+    set_compression(not args.no_compress, args.token_budget, args.truncate)
+
+    if args.report:
+        sys.exit(report(args.report, args.output, args.chunk_minutes, args.workers))
+
     print("=" * 60)
     print("  MEETING AI ANALYSER - Analysis Module")
     print(f"  Reading from: {TRANSCRIPTION_FILE}")
@@ -293,7 +751,10 @@ def main():
     print("  Ctrl+C to stop")
     print("=" * 60 + "\n")
     try:
-        _run()
+        schedule = {"min_words": args.min_words, "silence": args.silence, "min_interval": args.min_interval}
+        _run(interval=args.interval, mode=args.mode, consolidate_every=args.consolidate_every,
+             chunk_minutes=args.chunk_minutes, workers=args.workers,
+             schedule=schedule, lenses=args.lenses)
     except KeyboardInterrupt:
         print("\n[STOP] Analysis stopped.")
 
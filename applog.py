@@ -0,0 +1,185 @@
+"""
+Meeting AI Analyser - Logging
+Debug logs shared by all modules. Callers only format a line and put it on
+a queue; a background thread writes batches to files it keeps open, and
+rotates a file once it grows past MAX_BYTES (file.log -> file.log.1 ...).
+
+Usage:
+    import applog
+    log = applog.logger(LOG_FILE)
+    log("Analysis done")             # INFO
+    log.debug(f"Prompt: {prompt}")   # dropped unless the level is DEBUG
+    log.error("claude not found")
+
+The transcription worker process redirects its lines to the main process
+(see redirect()), so each file has a single writer.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+_NAMES = {v: k.upper() for k, v in LEVELS.items()}
+
+MAX_BYTES = 5 * 1024 * 1024
+BACKUPS = 3
+# Lines written per batch at most (the writer drains the queue up to this)
+BATCH_SIZE = 500
+
+level = LEVELS.get(os.environ.get("MEETING_AI_LOG_LEVEL", "").lower(), INFO)
+
+_queue = queue.SimpleQueue()
+_files = {}
+_writer = None
+_writer_lock = threading.Lock()
+_sink = None
+_STOP = object()
+
+
+class Logger:
+    __slots__ = ("path",)
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, msg):
+        self.log(INFO, msg)
+
+    def log(self, lvl, msg):
+        if lvl >= level:
+            emit((self.path, f"[{time.strftime('%H:%M:%S')}] {_NAMES[lvl]:<7s} {msg}\n"))
+
+    def debug(self, msg):
+        self.log(DEBUG, msg)
+
+    def info(self, msg):
+        self.log(INFO, msg)
+
+    def warning(self, msg):
+        self.log(WARNING, msg)
+
+    def error(self, msg):
+        self.log(ERROR, msg)
+
+
+def logger(path):
+    return Logger(path)
+
+
+def configure(log_level=None, max_bytes=None, backups=None):
+    global level, MAX_BYTES, BACKUPS
+    if log_level:
+        level = LEVELS[log_level] if isinstance(log_level, str) else log_level
+    if max_bytes:
+        MAX_BYTES = max_bytes
+    if backups is not None:
+        BACKUPS = backups
+
+
+def redirect(sink):
+    """Hand records ((path, line) tuples) to sink instead of writing them here"""
+    global _sink
+    _sink = sink
+
+
+def emit(record):
+    """Queue a (path, line) record; also used for records forwarded by a worker"""
+    if _sink:
+        _sink(record)
+        return
+    if _writer is None:
+        _start_writer()
+    _queue.put(record)
+
+
+def _start_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_write_loop, name="log-writer", daemon=True)
+            _writer.start()
+
+
+def _rotate(path):
+    f = _files.pop(path)
+    f.close()
+    try:
+        for i in range(BACKUPS - 1, 0, -1):
+            if os.path.exists(f"{path}.{i}"):
+                os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+        if BACKUPS:
+            os.replace(path, f"{path}.1")
+        else:
+            os.remove(path)
+    except OSError:
+        # Windows: another process has it open; retried at the next batch
+        pass
+
+
+def _write_batch(batch):
+    by_path = {}
+    for path, line in batch:
+        by_path.setdefault(path, []).append(line)
+    for path, lines in by_path.items():
+        try:
+            f = _files.get(path)
+            if f is None:
+                f = _files[path] = open(path, "a", encoding="utf-8")
+            f.write("".join(lines))
+            f.flush()
+            if f.tell() >= MAX_BYTES:
+                _rotate(path)
+        except OSError:
+            _files.pop(path, None)
+
+
+def _write_loop():
+    while True:
+        record = _queue.get()
+        batch = []
+        done = None
+        while True:
+            if record is _STOP or isinstance(record, threading.Event):
+                done = record
+                break
+            batch.append(record)
+            if len(batch) >= BATCH_SIZE:
+                break
+            try:
+                record = _queue.get_nowait()
+            except queue.Empty:
+                break
+        if batch:
+            _write_batch(batch)
+        if isinstance(done, threading.Event):
+            done.set()
+        elif done is _STOP:
+            for f in _files.values():
+                f.close()
+            _files.clear()
+            return
+
+
+def flush(timeout=2):
+    """Wait until every queued line is written"""
+    if _writer is None or not _writer.is_alive():
+        return
+    done = threading.Event()
+    _queue.put(done)
+    done.wait(timeout)
+
+
+def shutdown(timeout=2):
+    """Write the remaining lines and close the files (before os._exit)"""
+    global _writer
+    if _writer is None or not _writer.is_alive():
+        return
+    _queue.put(_STOP)
+    _writer.join(timeout)
+    _writer = None
+
+
+atexit.register(shutdown)
@@ -0,0 +1,133 @@
+"""
+Meeting AI Analyser - Network audio ingest
+Streams audio from remote capture clients into headless-mode sessions
+(POST /api/sessions/<id>/audio, usually with Transfer-Encoding: chunked).
+
+Body formats (Content-Type):
+  - application/octet-stream: raw int16 little-endian PCM, interleaved, in
+    the session format (channels, rate)
+  - audio/opus: Opus packets, each preceded by its length (2 bytes, big
+    endian); decoded with opuslib (optional dependency)
+
+Backpressure: the body is read in CHUNK_BYTES pieces; while the session has
+MAX_PENDING segments waiting for inference, reading pauses, so TCP flow
+control slows the client down instead of buffering without bound. A stream
+blocked longer than BACKPRESSURE_TIMEOUT is ended with 503 (client retries).
+"""
+import struct
+import time
+
+CHUNK_BYTES = 32 * 1024
+MAX_PENDING = 3
+BACKPRESSURE_TIMEOUT = 15
+
+OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+# Longest Opus frame: 120 ms
+OPUS_MAX_FRAME_MS = 120
+
+
+class IngestError(Exception):
+    """Rejected stream: message + HTTP status"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class PCMDecoder:
+    """Raw PCM: passes whole frames through, carries a partial frame over"""
+
+    name = "pcm"
+
+    def __init__(self, channels, rate):
+        self.frame_bytes = 2 * channels
+        self._rest = b""
+
+    def decode(self, data):
+        data = self._rest + data
+        usable = len(data) - len(data) % self.frame_bytes
+        self._rest = data[usable:]
+        return data[:usable]
+
+    def finish(self):
+        if self._rest:
+            raise IngestError(f"stream ended inside a frame ({len(self._rest)} stray bytes)")
+        return b""
+
+
+class OpusDecoder:
+    """Length-prefixed Opus packets -> int16 PCM"""
+
+    name = "opus"
+
+    def __init__(self, channels, rate):
+        if rate not in OPUS_RATES:
+            raise IngestError(f"Opus needs a session rate in {OPUS_RATES}, not {rate}", 415)
+        try:
+            import opuslib
+        except ImportError:
+            raise IngestError("Opus ingest needs opuslib (pip install opuslib)", 415)
+        self._decoder = opuslib.Decoder(rate, channels)
+        self._max_frame = rate * OPUS_MAX_FRAME_MS // 1000
+        self._buffer = bytearray()
+
+    def decode(self, data):
+        self._buffer += data
+        out = []
+        while len(self._buffer) >= 2:
+            (size,) = struct.unpack_from(">H", self._buffer)
+            if len(self._buffer) < 2 + size:
+                break
+            packet = bytes(self._buffer[2:2 + size])
+            del self._buffer[:2 + size]
+            out.append(self._decoder.decode(packet, self._max_frame))
+        return b"".join(out)
+
+    def finish(self):
+        if self._buffer:
+            raise IngestError(f"stream ended inside an Opus packet ({len(self._buffer)} stray bytes)")
+        return b""
+
+
+DECODERS = {
+    "application/octet-stream": PCMDecoder,
+    "audio/opus": OpusDecoder,
+}
+
+
+def make_decoder(content_type, channels, rate):
+    cls = DECODERS.get((content_type or "application/octet-stream").split(";")[0].strip().lower())
+    if cls is None:
+        raise IngestError(f"unsupported Content-Type {content_type!r} (use {', '.join(DECODERS)})", 415)
+    return cls(channels, rate)
+
+
+def ingest(session, scheduler, stream, content_type=None):
+    """Read an audio body into a session until EOF; returns the stream stats"""
+    decoder = make_decoder(content_type, session.channels, session.rate)
+    stats = {"format": decoder.name, "bytes_in": 0, "pcm_bytes": 0, "backpressure_waits": 0,
+             "backpressure_ms": 0.0, "started": time.time()}
+    if not session.open_stream(stats):
+        raise IngestError("session already has an active audio stream", 409)
+    try:
+        while True:
+            if scheduler.pending(session.id) >= MAX_PENDING:
+                t0 = time.perf_counter()
+                stats["backpressure_waits"] += 1
+                ok = scheduler.wait_pending(session.id, MAX_PENDING, BACKPRESSURE_TIMEOUT)
+                stats["backpressure_ms"] += (time.perf_counter() - t0) * 1000
+                if not ok:
+                    raise IngestError("inference backlog: stream paused too long, retry later", 503)
+            data = stream.read(CHUNK_BYTES)
+            if not data:
+                break
+            stats["bytes_in"] += len(data)
+            pcm = decoder.decode(data)
+            if pcm:
+                stats["pcm_bytes"] += len(pcm)
+                session.feed(pcm)
+        decoder.finish()
+    finally:
+        stats["backpressure_ms"] = round(stats["backpressure_ms"], 1)
+        session.close_stream(stats)
+    return stats
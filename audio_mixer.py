@@ -0,0 +1,322 @@
+"""
+Meeting AI Analyser - Loopback + microphone mixer
+The two sources are captured by different devices, whose clocks don't run
+at exactly their nominal rates: over a meeting, the mic drifts ahead of or
+behind the loopback. Cutting both at each segment and truncating to the
+shorter one dropped the difference every time. The mixer keeps one timeline
+instead, the loopback's:
+
+  - Capture clocks: each capture callback ticks a CaptureClock with the
+    frames it delivered. A least-squares fit of tick times against frame
+    counts gives the capture time of any frame and the device's real rate
+  - Alignment: every loopback sample is mapped to the mic position captured
+    at the same time, and the mic is resampled there (linear interpolation
+    at a fractional step = the ratio of the two real rates). Mic audio not
+    used yet is carried to the next segment; small alignment errors are
+    closed by slightly changing the step, large ones (dropped audio) by a jump
+  - Hold-back: loopback audio whose mic counterpart hasn't been delivered
+    yet (capture callbacks come every 0.5 s) is carried to the next segment
+    too, up to HOLD_MAX, so nothing is mixed with a hole
+  - Limiter: the sum is kept under LIMIT_CEILING by a gain computed per
+    block, lowered one block before a peak and released linearly, carried
+    across segments (no level jump at segment boundaries)
+
+Everything is vectorized in numpy on buffers that are reused from one
+segment to the next. Without capture clocks (e.g. bench), chunks are
+assumed to end at the same time and the clocks are fitted on that.
+"""
+import time
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+# Capture needed before a clock fit replaces the nominal rate (s)
+CLOCK_MIN_SPAN = 20
+# Largest rate error believed: a fit beyond this is jitter, not drift
+MAX_DRIFT = 0.005
+# Fastest change of the resampling step used to close an alignment error
+MAX_SLEW = 0.002
+# Alignment error beyond which the mic jumps to its position (s)
+RESYNC = 0.2
+# Loopback held back at most this long waiting for the mic (s)
+HOLD_MAX = 1.0
+# Mic audio kept ahead of the loopback at most (s)
+BACKLOG_MAX = 5.0
+
+LIMIT_CEILING = 0.95
+LIMIT_BLOCK = 160  # 10 ms
+# Time for the limiter gain to recover from 0 to 1 (s)
+LIMIT_RELEASE = 0.5
+
+
+class CaptureClock:
+    """Capture time of a stream's frames, fitted on its callback times.
+
+    `state` is (time of frame 0, seconds per frame) on time.monotonic(),
+    0 per frame until the first tick. It can be a shared-memory view: the
+    producer ticks in the capture process, the mixer reads it in another.
+    """
+
+    def __init__(self, rate, state=None):
+        self.rate = rate
+        self.state = state if state is not None else [0.0, 0.0]
+        # Input latency of the device: a callback runs this long after its last frame
+        self.latency = 0.0
+        self.frames = 0
+        self._origin = None
+        self._sums = [0, 0.0, 0.0, 0.0, 0.0]  # n, x, y, xx, xy relative to the origin
+
+    @property
+    def started(self):
+        return self.state[1] > 0
+
+    def tick(self, frames, now=None):
+        """Producer: `frames` more frames were delivered (at `now`)"""
+        now = (time.monotonic() if now is None else now) - self.latency
+        self.frames += frames
+        if self._origin is None:
+            self._origin = (self.frames, now)
+        x, y = self.frames - self._origin[0], now - self._origin[1]
+        s = self._sums
+        s[0] += 1
+        s[1] += x
+        s[2] += y
+        s[3] += x * x
+        s[4] += x * y
+        nominal = 1.0 / self.rate
+        if y < CLOCK_MIN_SPAN:
+            period, start = nominal, now - self.frames * nominal
+        else:
+            n = s[0]
+            period = (n * s[4] - s[1] * s[2]) / (n * s[3] - s[1] * s[1])
+            period = min(max(period, nominal * (1 - MAX_DRIFT)), nominal * (1 + MAX_DRIFT))
+            start = self._origin[1] + (s[2] - period * s[1]) / n - period * self._origin[0]
+        self.state[0], self.state[1] = start, period
+
+    def time_of(self, frame):
+        return self.state[0] + frame * self.state[1]
+
+    def frame_at(self, t):
+        return (t - self.state[0]) / self.state[1]
+
+
+class _Fifo:
+    """float32 samples in a reused array: appended at the end, consumed from the front"""
+
+    def __init__(self):
+        self.buf = np.zeros(0, np.float32)
+        self.head = 0
+        self.size = 0
+
+    def view(self):
+        return self.buf[self.head:self.head + self.size]
+
+    def append(self, data):
+        n = len(data)
+        if self.head + self.size + n > len(self.buf):
+            if self.size + n > len(self.buf) // 2:
+                buf = np.zeros(2 * (self.size + n), np.float32)
+                buf[:self.size] = self.view()
+                self.buf = buf
+            else:
+                # head > len / 2 >= size: the two ranges don't overlap
+                self.buf[:self.size] = self.view()
+            self.head = 0
+        self.buf[self.head + self.size:self.head + self.size + n] = data
+        self.size += n
+
+    def consume(self, n):
+        n = min(n, self.size)
+        self.head += n
+        self.size -= n
+        if not self.size:
+            self.head = 0
+
+    def clear(self):
+        self.head = self.size = 0
+
+
+class Mixer:
+    """Mixes the mic into the loopback timeline, one segment at a time"""
+
+    def __init__(self, lb_rate, mic_rate, clocks=None, rate=SAMPLE_RATE, hold=HOLD_MAX):
+        self.rate = rate
+        self.scale = (rate / lb_rate, rate / mic_rate)
+        # Without capture clocks, fit clocks on the chunk sizes (chunks end together)
+        self._count_clocks = clocks is None
+        self.clocks = clocks or {"loopback": CaptureClock(lb_rate), "mic": CaptureClock(mic_rate)}
+        self.hold = int(hold * rate)
+        self.backlog = int(BACKLOG_MAX * rate)
+        self.resync = RESYNC * rate
+        self._lb = _Fifo()
+        self._mic = _Fifo()
+        # Native frames received so far (the fifos hold the last ones, converted)
+        self._lb_end = self._mic_end = 0
+        # Mic backlog position of the first loopback sample not mixed yet
+        self._phase = None
+        self._gain = 1.0
+        self._buffers = {}
+        self._ramp = np.zeros(0)
+        self._frac = (np.arange(LIMIT_BLOCK, dtype=np.float32) + 1) / LIMIT_BLOCK
+        self.loopback = self.mic = np.zeros(0, np.float32)
+        self.stats = {"segments": 0, "drift_ppm": 0, "offset_ms": 0.0, "held_ms": 0, "resyncs": 0, "gain": 1.0}
+
+    def _work(self, name, n, dtype=np.float32):
+        """Reused buffer of at least n items"""
+        buf = self._buffers.get(name)
+        if buf is None or len(buf) < n:
+            buf = self._buffers[name] = np.empty(n + n // 4, dtype)
+        return buf[:n]
+
+    def _arange(self, n):
+        if len(self._ramp) < n:
+            self._ramp = np.arange(n + n // 4, dtype=np.float64)
+        return self._ramp[:n]
+
+    def skip(self, lb_frames=0, mic_frames=0):
+        """Frames of each stream discarded before the next mix() (e.g. captured while loading)"""
+        self._lb_end += lb_frames
+        self._mic_end += mic_frames
+        self._lb.clear()
+        self._mic.clear()
+        self._phase = None
+
+    def mix(self, lb, mic, lb_frames, mic_frames):
+        """Mix a chunk of each source (mono float32 at the mixer rate; mic may be None).
+
+        lb_frames / mic_frames: native frames the chunks were converted from.
+        Returns the mixed audio, in a buffer reused by the next call;
+        self.loopback and self.mic hold the two aligned sources it was made of.
+        """
+        lb_clock, mic_clock = self.clocks["loopback"], self.clocks["mic"]
+        self._lb_end += lb_frames
+        self._mic_end += mic_frames
+        if self._count_clocks:
+            now = self._lb_end / lb_clock.rate
+            lb_clock.tick(lb_frames, now)
+            if mic_frames:
+                mic_clock.tick(mic_frames, now)
+        self._lb.append(lb)
+        if mic is not None:
+            self._mic.append(mic)
+
+        n = self._lb.size
+        error = 0.0
+        if not (mic_clock.started and lb_clock.started):
+            n_out = n
+            self.mic = self._work("mic", n)
+            self.mic.fill(0)
+            self._phase = None
+        else:
+            sl, sm = self.scale
+            m = self._mic.size
+            t = lb_clock.time_of(self._lb_end - n / sl)
+            target = (mic_clock.frame_at(t) - (self._mic_end - m / sm)) * sm
+            # Mic samples per loopback sample
+            ratio = lb_clock.state[1] / mic_clock.state[1] * sm / sl
+            if self._phase is not None:
+                error = target - self._phase
+            if self._phase is None or abs(error) > self.resync:
+                if self._phase is not None:
+                    self.stats["resyncs"] += 1
+                self._phase = target
+            step = ratio + min(max((target - self._phase) / n, -MAX_SLEW), MAX_SLEW)
+            ready = int(np.floor((m - 1 - self._phase) / step)) + 1
+            n_out = max(min(max(ready, 0), n), n - self.hold)
+            self.mic = self._align(self._phase, step, n_out)
+            self._phase += n_out * step
+            used = min(m, max(0, int(self._phase)))
+            excess = max(0, m - used - self.backlog)
+            self._mic.consume(used + excess)
+            self._phase -= used + excess
+            self.stats["drift_ppm"] = round((ratio - 1) * 1e6)
+
+        self.loopback = self._work("loopback", n_out)
+        np.copyto(self.loopback, self._lb.view()[:n_out])
+        self._lb.consume(n_out)
+        out = self._work("out", n_out)
+        np.add(self.loopback, self.mic, out=out)
+        self._limit(out)
+
+        self.stats["segments"] += 1
+        self.stats["offset_ms"] = round(error / self.rate * 1000, 1)
+        self.stats["held_ms"] = round(self._lb.size / self.rate * 1000)
+        return out
+
+    def _align(self, phase, step, n):
+        """Mic resampled at n loopback samples: backlog positions phase + k * step"""
+        mic = self._mic.view()
+        m = len(mic)
+        aligned = self._work("mic", n)
+        # Positions are increasing: the ones inside the backlog are a range
+        k0 = min(n, max(0, int(np.ceil(-phase / step)))) if m >= 2 else n
+        k1 = min(n, max(k0, int(np.floor((m - 1 - phase) / step)) + 1))
+        aligned[:k0] = 0
+        aligned[k1:] = 0
+        if k1 == k0:
+            return aligned
+        pos = self._work("pos", n, np.float64)[k0:k1]
+        np.multiply(self._arange(n)[k0:k1], step, out=pos)
+        pos += phase
+        idx = self._work("idx", n, np.intp)[k0:k1]
+        np.copyto(idx, pos, casting="unsafe")
+        np.clip(idx, 0, m - 2, out=idx)
+        pos -= idx
+        a = aligned[k0:k1]
+        # mode="raise" would buffer the result
+        np.take(mic, idx, out=a, mode="clip")
+        idx += 1
+        b = self._work("next", n)[k0:k1]
+        np.take(mic, idx, out=b, mode="clip")
+        b -= a
+        b *= pos
+        a += b
+        return aligned
+
+    def _limit(self, out):
+        """Peak limiter, in place: block gains, released linearly, ramped within blocks"""
+        n = len(out)
+        if not n:
+            return
+        size = LIMIT_BLOCK
+        blocks = -(-n // size)
+        level = self._work("level", n)
+        np.abs(out, out=level)
+        starts = self._work("starts", blocks, np.intp)
+        np.multiply(self._arange(blocks), size, out=starts, casting="unsafe")
+        need = self._work("need", blocks)
+        np.maximum.reduceat(level, starts, out=need)
+        np.maximum(need, LIMIT_CEILING, out=need)
+        np.divide(LIMIT_CEILING, need, out=need)
+
+        # Release: gain[b] = min(need[b], gain[b - 1] + release), as a running minimum
+        release = size / (LIMIT_RELEASE * self.rate)
+        rel = self._work("release", blocks)
+        np.multiply(self._arange(blocks), release, out=rel)
+        gain = self._work("gain", blocks + 1)
+        g = gain[1:]
+        np.subtract(need, rel, out=g)
+        np.minimum.accumulate(g, out=g)
+        np.minimum(g, self._gain + release, out=g)
+        g += rel
+        # Look one block ahead: the gain is already down when a peak starts
+        np.minimum(g[:-1], g[1:], out=g[:-1])
+        # (the first block can't be anticipated by the previous segment)
+        gain[0] = min(self._gain, g[0])
+
+        # Block b ramps from gain[b] (end of the previous block) to gain[b + 1]
+        full = n // size
+        if full:
+            ramp = self._work("ramp", full * size).reshape(full, size)
+            delta = self._work("delta", full)
+            np.subtract(gain[1:full + 1], gain[:full], out=delta)
+            np.multiply(delta[:, None], self._frac, out=ramp)
+            ramp += gain[:full, None]
+            out[:full * size].reshape(full, size)[...] *= ramp
+        rest = n - full * size
+        if rest:
+            out[full * size:] *= gain[full] + (gain[full + 1] - gain[full]) * self._frac[:rest]
+        np.clip(out, -1.0, 1.0, out=out)
+        self._gain = float(gain[blocks])
+        self.stats["gain"] = round(float(g.min()), 2)
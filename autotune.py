@@ -0,0 +1,291 @@
+"""
+Meeting AI Analyser - CPU inference autotuner
+One-time benchmark of the CPU settings of faster-whisper / CTranslate2 on a
+reference clip:
+
+  1. compute type: int8 (the default, lowest precision) or a wider type
+     this CPU happens to run faster
+  2. cpu_threads for 1, 2, 4... concurrent transcriptions (num_workers),
+     never more threads in total than logical cores
+  3. beam size, only with a real speech clip: a smaller beam is kept only
+     if its transcript still matches beam 5's, so speed isn't bought with
+     accuracy
+
+The profile is saved per machine and model in data/cpu_profiles.json;
+live_transcribe.load_whisper_model() applies it when running on CPU.
+
+Usage:
+    python main.py --autotune --model small
+    python autotune.py --model small --clip meeting.wav
+
+The reference clip is --clip, else bench/fixtures/reference.wav, else a
+synthetic signal. A synthetic signal only times the encoder (it can't tell
+whether a smaller beam hurts accuracy), so the beam size is not tuned with it.
+"""
+import argparse
+import difflib
+import gc
+import json
+import os
+import platform
+import statistics
+import threading
+import time
+import wave
+
+from paths import BUNDLE_DIR, DATA_DIR
+
+PROFILES_FILE = os.path.join(DATA_DIR, "cpu_profiles.json")
+REFERENCE_CLIP = os.path.join(BUNDLE_DIR, "bench", "fixtures", "reference.wav")
+
+CLIP_SECONDS = 30
+REPEATS = 2
+COMPUTE_TYPES = ("int8", "int8_float32", "int16", "float32")
+BEAM_SIZES = (5, 3, 1)
+# What load_whisper_model() uses without a profile (cpu_threads 0 = CTranslate2's default, 4)
+BASELINE = {"compute_type": "int8", "cpu_threads": 0, "beam_size": 5}
+# Word-level similarity to the beam 5 transcript a smaller beam must reach
+MIN_SIMILARITY = 0.9
+# More concurrent transcriptions only if they add this much throughput
+WORKERS_GAIN = 1.05
+
+
+def machine_id():
+    """Profiles are per machine: a data dir copied across the fleet doesn't reuse them"""
+    return f"{platform.node()}|{platform.machine()}|{platform.processor() or '?'}|{os.cpu_count() or 1}"
+
+
+def core_counts():
+    """(physical, logical) cores; physical = logical without psutil"""
+    logical = os.cpu_count() or 1
+    try:
+        import psutil
+        physical = psutil.cpu_count(logical=False) or logical
+    except ImportError:
+        physical = logical
+    return physical, logical
+
+
+def _read_profiles():
+    try:
+        with open(PROFILES_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_profile(model_size):
+    """Tuned CPU profile of this machine for model_size, None if never tuned"""
+    return _read_profiles().get(machine_id(), {}).get(model_size)
+
+
+def save_profile(model_size, profile):
+    profiles = _read_profiles()
+    profiles.setdefault(machine_id(), {})[model_size] = profile
+    tmp = PROFILES_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(profiles, f, indent=2)
+    os.replace(tmp, PROFILES_FILE)
+
+
+def threads_for(profile, num_workers):
+    """cpu_threads per transcription when num_workers run at once"""
+    tuned = profile["cpu_threads"].get(str(num_workers))
+    if tuned:
+        return tuned
+    # Worker count not tuned: share the cores the single-worker setting uses
+    return max(1, profile["cpu_threads"]["1"] // num_workers)
+
+
+def thread_plans(physical, logical):
+    """{num_workers: [cpu_threads candidates]} with workers x threads <= logical cores"""
+    plans = {}
+    workers = 1
+    while workers == 1 or workers <= physical // 2:
+        candidates = {max(1, physical // workers), max(1, logical // workers)}
+        if workers == 1:
+            candidates |= {t for t in (2, 4, physical // 2) if 1 <= t <= logical}
+        plans[workers] = sorted(candidates)
+        workers *= 2
+    return plans
+
+
+def supported_compute_types():
+    try:
+        import ctranslate2
+        supported = ctranslate2.get_supported_compute_types("cpu")
+    except (ImportError, AttributeError, RuntimeError):
+        supported = {"int8", "float32"}
+    return [c for c in COMPUTE_TYPES if c in supported]
+
+
+def load_clip(path=None, seconds=CLIP_SECONDS):
+    """(float32 mono 16 kHz samples, source) of the reference clip"""
+    import numpy as np
+
+    import live_transcribe
+
+    path = path or (REFERENCE_CLIP if os.path.exists(REFERENCE_CLIP) else None)
+    if path:
+        with wave.open(path, "rb") as wf:
+            frames = wf.readframes(min(wf.getnframes(), int(seconds * wf.getframerate())))
+            return live_transcribe.to_mono_16k(frames, wf.getnchannels(), wf.getframerate()), path
+    # Harmonic bursts at a syllable-like rate: keeps the encoder busy like speech
+    t = np.arange(int(seconds * live_transcribe.SAMPLE_RATE)) / live_transcribe.SAMPLE_RATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / live_transcribe.SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = np.clip(np.sin(2 * np.pi * 3 * t), 0, None) * (np.sin(2 * np.pi * 0.25 * t) > -0.5)
+    return (0.1 * voice * envelope).astype(np.float32), "synthetic"
+
+
+def similarity(a, b):
+    return difflib.SequenceMatcher(None, a.lower().split(), b.lower().split()).ratio()
+
+
+class Tuner:
+    """Times transcriptions of one clip under candidate settings"""
+
+    def __init__(self, model_size, audio, real_speech=True, repeats=REPEATS, language="en"):
+        self.model_size = model_size
+        self.language = language
+        self.audio = audio
+        self.real_speech = real_speech
+        self.repeats = repeats
+        self.clip_seconds = len(audio) / 16000
+        self.results = []
+        self._model = None
+        self._model_key = None
+
+    def _load(self, compute_type, cpu_threads, num_workers):
+        key = (compute_type, cpu_threads, num_workers)
+        if key != self._model_key:
+            from faster_whisper import WhisperModel
+            self._model = None
+            gc.collect()
+            self._model = WhisperModel(self.model_size, device="cpu", compute_type=compute_type,
+                                       cpu_threads=cpu_threads, num_workers=num_workers)
+            self._model_key = key
+        return self._model
+
+    def _transcribe(self, model, beam_size):
+        # Same decoding options as live_transcribe.transcribe_segment; the
+        # VAD would drop a synthetic clip entirely
+        segments, _ = model.transcribe(self.audio, language=self.language,
+                                       beam_size=beam_size, vad_filter=self.real_speech,
+                                       vad_parameters=dict(min_silence_duration_ms=500, speech_pad_ms=300))
+        return " ".join(s.text.strip() for s in segments)
+
+    def measure(self, compute_type, cpu_threads, num_workers=1, beam_size=5):
+        """Median wall time of `num_workers` concurrent transcriptions of the clip"""
+        for result in self.results:
+            if (result["compute_type"], result["cpu_threads"], result["num_workers"],
+                    result["beam_size"]) == (compute_type, cpu_threads, num_workers, beam_size):
+                return result
+        model = self._load(compute_type, cpu_threads, num_workers)
+        texts = [""] * num_workers
+
+        def run(i):
+            texts[i] = self._transcribe(model, beam_size)
+
+        run(0)  # warm-up
+        times = []
+        for _ in range(self.repeats):
+            threads = [threading.Thread(target=run, args=(i,)) for i in range(num_workers)]
+            t0 = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            times.append(time.perf_counter() - t0)
+        seconds = statistics.median(times)
+        result = {"compute_type": compute_type, "cpu_threads": cpu_threads, "num_workers": num_workers,
+                  "beam_size": beam_size, "seconds": round(seconds, 3),
+                  # Audio seconds transcribed per wall second, all workers together
+                  "throughput": round(num_workers * self.clip_seconds / seconds, 2), "text": texts[0]}
+        self.results.append(result)
+        print(f"[AUTOTUNE] {compute_type:<12s} threads={cpu_threads:<3d} workers={num_workers:<2d} "
+              f"beam={beam_size}  {seconds:6.2f}s  {result['throughput']:6.2f}x real time")
+        return result
+
+    def run(self):
+        physical, logical = core_counts()
+        print(f"[AUTOTUNE] Model {self.model_size}, {physical} physical / {logical} logical cores, "
+              f"clip {self.clip_seconds:.0f}s")
+        baseline = self.measure(**BASELINE)
+
+        # 1. Compute type, one transcription on all physical cores
+        compute_type = min((self.measure(c, physical) for c in supported_compute_types()),
+                           key=lambda r: r["seconds"])["compute_type"]
+
+        # 2. Threads per transcription for each number of concurrent transcriptions
+        cpu_threads, throughput = {}, {}
+        for workers, candidates in thread_plans(physical, logical).items():
+            fastest = max((self.measure(compute_type, threads, workers) for threads in candidates),
+                          key=lambda r: r["throughput"])
+            cpu_threads[str(workers)] = fastest["cpu_threads"]
+            throughput[str(workers)] = fastest["throughput"]
+        num_workers = 1
+        for workers, value in throughput.items():
+            if value > WORKERS_GAIN * throughput[str(num_workers)]:
+                num_workers = int(workers)
+
+        # 3. Beam size (real speech only: accuracy can't be judged on a synthetic clip)
+        beam_size = BASELINE["beam_size"]
+        if self.real_speech:
+            reference = self.measure(compute_type, cpu_threads["1"], 1, BASELINE["beam_size"])
+            for beam in BEAM_SIZES[1:]:
+                result = self.measure(compute_type, cpu_threads["1"], 1, beam)
+                if (similarity(result["text"], reference["text"]) < MIN_SIMILARITY
+                        or result["seconds"] >= reference["seconds"]):
+                    break
+                beam_size = beam
+
+        tuned = min((r for r in self.results if r["compute_type"] == compute_type
+                     and r["cpu_threads"] == cpu_threads["1"] and r["num_workers"] == 1
+                     and r["beam_size"] == beam_size), key=lambda r: r["seconds"])
+        return {
+            "compute_type": compute_type,
+            "cpu_threads": cpu_threads,
+            "num_workers": num_workers,
+            "beam_size": beam_size,
+            "throughput": throughput,
+            "speedup": round(baseline["seconds"] / tuned["seconds"], 2),
+            "tuned": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+
+def run(model_size="small", clip=None, seconds=CLIP_SECONDS, repeats=REPEATS, language="en"):
+    """Tune, save and return the profile of model_size on this machine"""
+    audio, source = load_clip(clip, seconds)
+    if source == "synthetic":
+        print("[AUTOTUNE] No reference clip (--clip or bench/fixtures/reference.wav): "
+              "synthetic signal, beam size not tuned")
+    profile = Tuner(model_size, audio, real_speech=source != "synthetic", repeats=repeats,
+                    language=language).run()
+    profile["clip"] = source
+    save_profile(model_size, profile)
+    print(f"[AUTOTUNE] Profile: {profile['compute_type']}, {profile['cpu_threads']['1']} threads, "
+          f"beam {profile['beam_size']}, {profile['num_workers']} worker(s) for multi-session; "
+          f"{profile['speedup']}x faster than the defaults")
+    print(f"[AUTOTUNE] Saved to {PROFILES_FILE}")
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune faster-whisper CPU settings for this machine")
+    parser.add_argument("--model", default="small", help="Whisper model to tune")
+    parser.add_argument("--clip", default=None, help="Reference WAV with speech (default: bench/fixtures/reference.wav)")
+    parser.add_argument("--seconds", type=float, default=CLIP_SECONDS, help="Clip length used")
+    parser.add_argument("--language", default="en", help="Language of the clip")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="Timed runs per candidate")
+    parser.add_argument("--show", action="store_true", help="Print the saved profile and exit")
+    args = parser.parse_args()
+    if args.show:
+        print(json.dumps(load_profile(args.model), indent=2))
+        return
+    run(args.model, args.clip, args.seconds, args.repeats, args.language)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+"""
+Meeting AI Analyser - Analysis backends
+Pluggable interface used by analyst.py to get an analysis for a prompt:
+  - ClaudeCLIBackend: runs `claude --print` (one process per analysis)
+  - HTTPBackend: calls the Messages API directly over pooled keep-alive
+    connections (no process spawn / CLI startup per analysis)
+
+bench/stub_server.py serves the same HTTP API locally for testing.
+"""
+import http.client
+import json
+import os
+import queue
+import shlex
+import socket
+import subprocess
+import threading
+import time
+import urllib.parse
+
+import applog
+from paths import LOG_FILE
+from tracing import span
+
+DEFAULT_TIMEOUT = 120
+DEFAULT_HTTP_URL = "https://api.anthropic.com"
+DEFAULT_HTTP_MODEL = "claude-sonnet-4-5"
+ANTHROPIC_VERSION = "2023-06-01"
+
+# HTTP statuses worth retrying (rate limit, overload, transient server errors)
+RETRY_STATUS = {429, 500, 502, 503, 504, 529}
+
+
+log = applog.logger(LOG_FILE)
+
+
+class Backend:
+    """Interface: analyze() returns the response text, or None on failure/cancel"""
+
+    name = "backend"
+
+    def analyze(self, prompt, conversation_id="", on_text=None):
+        """Run one prompt. on_text(text so far) is called as output streams in."""
+        raise NotImplementedError
+
+    def cancel(self):
+        """Abort every in-flight analyze() call"""
+
+    def id(self):
+        """Stable identity (part of the analysis cache key)"""
+        return self.name
+
+
+# ---------------------------------------------------------------------------
+# claude CLI
+# ---------------------------------------------------------------------------
+
+def find_claude_cmd():
+    """Command used to invoke claude (MEETING_AI_CLAUDE_CMD overrides, e.g. a bench stub)"""
+    override = os.environ.get("MEETING_AI_CLAUDE_CMD")
+    if override:
+        return [a.strip('"') for a in shlex.split(override, posix=os.name != "nt")]
+
+    # Find claude in known paths
+    for path in [
+        os.path.expanduser("~/AppData/Roaming/npm/claude.cmd"),
+        "C:/Program Files/nodejs/claude.cmd",
+    ]:
+        if os.path.exists(path):
+            return [path]
+    return ["claude"]
+
+
+def parse_stream_line(line):
+    """One line of `claude --output-format stream-json` -> (kind, text).
+
+    kind: "delta" (new tokens), "message" (complete assistant text), "result"
+    (final answer, None on error), "raw" (non-JSON output) or None (ignored).
+    """
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        return ("raw", line) if line.strip() else (None, "")
+    if not isinstance(entry, dict):
+        return None, ""
+    etype = entry.get("type")
+    if etype == "stream_event":
+        delta = (entry.get("event") or {}).get("delta") or {}
+        if delta.get("type") == "text_delta":
+            return "delta", delta.get("text", "")
+    elif etype == "assistant":
+        blocks = (entry.get("message") or {}).get("content") or []
+        text = "".join(b.get("text", "") for b in blocks if isinstance(b, dict) and b.get("type") == "text")
+        if text:
+            return "message", text
+    elif etype == "result":
+        return "result", None if entry.get("is_error") else entry.get("result", "")
+    return None, ""
+
+
+class ClaudeCLIBackend(Backend):
+    """`claude --print`, one process per analysis. The command is resolved once."""
+
+    name = "cli"
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, cmd=None):
+        self.timeout = timeout
+        self.cmd = cmd or find_claude_cmd()
+        self._procs = set()
+        self._lock = threading.Lock()
+
+    def id(self):
+        return "cli:" + " ".join(self.cmd)
+
+    def cancel(self):
+        with self._lock:
+            procs = list(self._procs)
+        for proc in procs:
+            proc.kill()
+
+    def analyze(self, prompt, conversation_id="", on_text=None):
+        # The prompt goes on stdin (no command-line quoting issues on Windows)
+        log(f"Using claude: {' '.join(self.cmd)}")
+        try:
+            env = os.environ.copy()
+            env.pop("CLAUDECODE", None)
+            cmd = self.cmd + ["--print"]
+            if on_text:
+                cmd += ["--output-format", "stream-json", "--verbose", "--include-partial-messages"]
+            if conversation_id:
+                cmd += ["--resume", conversation_id]
+            log(f"Calling {' '.join(cmd)} (prompt length: {len(prompt)})")
+            with span("claude", cat="analyst", prompt_chars=len(prompt), streaming=bool(on_text)):
+                returncode, stdout, stderr = self._run(cmd, prompt, env, on_text)
+            log.debug(f"Return code: {returncode}")
+            log.debug(f"Stdout length: {len(stdout)}")
+            if stderr:
+                log.warning(f"Stderr: {stderr[:500]}")
+            if returncode == 0 and stdout.strip():
+                return stdout.strip()
+            else:
+                log.error(f"FAIL: no output or bad return code")
+                return None
+        except FileNotFoundError:
+            log.error(f"claude not found at {self.cmd}")
+            raise SystemExit(1)
+        except subprocess.TimeoutExpired:
+            log.error(f"claude timed out ({self.timeout}s)")
+            return None
+        except Exception as e:
+            log.error(f"{type(e).__name__}: {e}")
+            return None
+
+    def _run(self, cmd, prompt, env, on_text):
+        """Run claude, streaming stdout to on_text if given.
+
+        Returns (returncode, stdout, stderr) like subprocess.run; raises TimeoutExpired.
+        """
+        proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            env=env,
+        )
+        with self._lock:
+            self._procs.add(proc)
+        try:
+            if not on_text:
+                try:
+                    stdout, stderr = proc.communicate(prompt, timeout=self.timeout)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.communicate()
+                    raise
+                return proc.returncode, stdout, stderr
+            return self._stream(proc, cmd, prompt, on_text)
+        finally:
+            with self._lock:
+                self._procs.discard(proc)
+
+    def _stream(self, proc, cmd, prompt, on_text):
+        timed_out = threading.Event()
+
+        def _kill():
+            timed_out.set()
+            proc.kill()
+
+        def _feed():
+            try:
+                proc.stdin.write(prompt)
+                proc.stdin.close()
+            except OSError:
+                pass
+
+        stderr = []
+        readers = [
+            threading.Thread(target=_feed, daemon=True),
+            threading.Thread(target=lambda: stderr.append(proc.stderr.read()), daemon=True),
+        ]
+        for t in readers:
+            t.start()
+        timer = threading.Timer(self.timeout, _kill)
+        timer.start()
+
+        text = ""
+        final = None
+        saw_delta = False
+        try:
+            for line in proc.stdout:
+                kind, value = parse_stream_line(line)
+                if kind == "delta":
+                    saw_delta = True
+                    text += value
+                elif kind == "message" and not saw_delta:
+                    text = value
+                elif kind == "raw":
+                    text += value
+                elif kind == "result":
+                    final = value or ""
+                    continue
+                else:
+                    continue
+                on_text(text)
+            proc.wait()
+        finally:
+            timer.cancel()
+            for t in readers:
+                t.join(timeout=1)
+
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, self.timeout)
+        return proc.returncode, final if final is not None else text, "".join(stderr)
+
+
+# ---------------------------------------------------------------------------
+# Direct HTTP (Messages API)
+# ---------------------------------------------------------------------------
+
+class HTTPBackend(Backend):
+    """Messages API client over a pool of keep-alive connections.
+
+    Retries connection errors and RETRY_STATUS responses with exponential
+    backoff; cancel() closes in-flight connections. Resuming a claude
+    conversation is a CLI feature: conversation_id is ignored here.
+    """
+
+    name = "http"
+
+    def __init__(self, url=DEFAULT_HTTP_URL, model=DEFAULT_HTTP_MODEL, api_key=None,
+                 timeout=DEFAULT_TIMEOUT, retries=2, pool_size=4, max_tokens=4096):
+        parsed = urllib.parse.urlsplit(url)
+        self.url = url
+        self.https = parsed.scheme == "https"
+        self.host = parsed.hostname
+        self.port = parsed.port or (443 if self.https else 80)
+        self.path = parsed.path.rstrip("/") + "/v1/messages"
+        self.model = model
+        self.api_key = api_key if api_key is not None else os.environ.get("ANTHROPIC_API_KEY", "")
+        self.timeout = timeout
+        self.retries = retries
+        self.max_tokens = max_tokens
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._active = set()
+        self._lock = threading.Lock()
+        self._epoch = 0
+
+    def id(self):
+        return f"http:{self.url}:{self.model}"
+
+    def _connect(self):
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def _acquire(self):
+        """(connection, reused) - an idle pooled connection if any"""
+        try:
+            return self._pool.get_nowait(), True
+        except queue.Empty:
+            return self._connect(), False
+
+    def _release(self, conn, keep):
+        with self._lock:
+            self._active.discard(conn)
+        if keep:
+            try:
+                self._pool.put_nowait(conn)
+                return
+            except queue.Full:
+                pass
+        conn.close()
+
+    def cancel(self):
+        with self._lock:
+            self._epoch += 1
+            active = list(self._active)
+        for conn in active:
+            # Unblocks the reading thread, which then discards the connection
+            if conn.sock:
+                try:
+                    conn.sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    def analyze(self, prompt, conversation_id="", on_text=None):
+        body = json.dumps({
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": bool(on_text),
+        }).encode("utf-8")
+        headers = {
+            "content-type": "application/json",
+            "anthropic-version": ANTHROPIC_VERSION,
+            "x-api-key": self.api_key,
+            "connection": "keep-alive",
+        }
+        epoch = self._epoch
+        deadline = time.time() + self.timeout
+        attempt = 0
+        log(f"HTTP analysis: {self.url} model={self.model} (prompt length: {len(prompt)})")
+        while True:
+            conn, reused = self._acquire()
+            with self._lock:
+                self._active.add(conn)
+            try:
+                with span("http", cat="analyst", prompt_chars=len(prompt), reused=reused, attempt=attempt):
+                    conn.request("POST", self.path, body=body, headers=headers)
+                    resp = conn.getresponse()
+                    if resp.status == 200:
+                        text = self._read_stream(resp, on_text, deadline) if on_text else self._read_json(resp)
+                        if epoch != self._epoch:
+                            raise ConnectionAbortedError("cancelled")
+                        self._release(conn, not resp.will_close)
+                        return text.strip() if text and text.strip() else None
+                    error = resp.read()[:500]
+                    self._release(conn, not resp.will_close)
+                log.warning(f"HTTP {resp.status}: {error!r}")
+                if resp.status not in RETRY_STATUS:
+                    return None
+            except (OSError, ValueError, http.client.HTTPException) as e:
+                self._release(conn, False)
+                if epoch != self._epoch:
+                    log("HTTP analysis cancelled")
+                    return None
+                if reused:
+                    # Idle keep-alive connection closed by the server: retry at once on a fresh one
+                    continue
+                log.warning(f"HTTP error: {type(e).__name__}: {e}")
+            if epoch != self._epoch or attempt >= self.retries or time.time() >= deadline:
+                return None
+            time.sleep(min(2 ** attempt, max(0, deadline - time.time())))
+            attempt += 1
+
+    def _read_json(self, resp):
+        data = json.loads(resp.read().decode("utf-8"))
+        return "".join(b.get("text", "") for b in data.get("content", []) if b.get("type") == "text")
+
+    def _read_stream(self, resp, on_text, deadline):
+        """Server-sent events: accumulate text deltas until message_stop"""
+        text = ""
+        while True:
+            line = resp.readline()
+            if not line:
+                break
+            if time.time() > deadline:
+                raise TimeoutError("analysis timed out")
+            if not line.startswith(b"data:"):
+                continue
+            event = json.loads(line[5:].decode("utf-8"))
+            etype = event.get("type")
+            if etype == "content_block_delta" and event.get("delta", {}).get("type") == "text_delta":
+                text += event["delta"].get("text", "")
+                on_text(text)
+            elif etype == "error":
+                log.error(f"HTTP stream error: {event.get('error')}")
+                resp.read()
+                return None
+            elif etype == "message_stop":
+                resp.read()
+                break
+        return text
+
+
+def make_backend(kind="cli", url=None, model=None, timeout=DEFAULT_TIMEOUT):
+    """Backend from main.py/analyst.py options"""
+    if kind == "http":
+        return HTTPBackend(url=url or DEFAULT_HTTP_URL, model=model or DEFAULT_HTTP_MODEL, timeout=timeout)
+    return ClaudeCLIBackend(timeout=timeout)
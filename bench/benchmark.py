@@ -0,0 +1,642 @@
+"""
+Meeting AI Analyser - End-to-end benchmark
+Replays fixture recordings through the segmenting/transcription path, runs the
+analyst against a stub backend, drives the Flask endpoints with simulated
+browser clients and times module imports against startup targets. Results
+are written as JSON so runs can be compared.
+
+Usage:
+    python bench/benchmark.py                              # all stages, stub model
+    python bench/benchmark.py --model tiny                 # real faster-whisper model
+    python bench/benchmark.py --stages server --clients 20
+    python bench/benchmark.py --stages startup             # exit code 1 over target
+    python bench/benchmark.py --output run.json --compare baseline.json
+
+Fixtures:
+    bench/fixtures/<name>.wav       replayed as the loopback source
+    bench/fixtures/<name>.mic.wav   (optional) replayed as the microphone
+    With no fixtures, a synthetic 60s recording is generated.
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import wave
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+STUB_CLAUDE = os.path.join(BENCH_DIR, "stub_claude.py")
+
+# Generated files must not clobber the real data/ dir: set before importing paths
+os.environ.setdefault("MEETING_AI_DATA_DIR", tempfile.mkdtemp(prefix="meeting-bench-"))
+sys.path.insert(0, REPO_DIR)
+
+# Callback block size used by live_transcribe (frames_per_buffer = sr * 0.5)
+CALLBACK_SECONDS = 0.5
+
+# Metrics compared by --compare: (path in results, higher is better)
+COMPARED_METRICS = [
+    ("transcription.segment_latency.p95", False),
+    ("transcription.realtime_factor", True),
+    ("analysis.latency.p95", False),
+    ("analysis.first_token.p95", False),
+    ("server.requests_per_sec", True),
+    ("server.latency.p95", False),
+    ("server.sse_propagation.p95", False),
+    ("startup.modules.main.p50", False),
+    ("startup.modules.server.p50", False),
+    ("startup.modules.analyst.p50", False),
+    ("startup.modules.live_transcribe.p50", False),
+]
+
+# Startup budget: import time of each entry module in a fresh interpreter (seconds).
+# main must stay lazy (heavy modules load after the UI is up); server is Flask.
+STARTUP_TARGETS = {
+    "main": 0.1,
+    "server": 0.5,
+    "analyst": 0.15,
+    "live_transcribe": 0.4,
+}
+
+
+def percentiles(values):
+    """Summary stats (seconds) for a list of samples"""
+    if not values:
+        return {"count": 0}
+    s = sorted(values)
+
+    def pct(p):
+        k = (len(s) - 1) * p / 100
+        lo = int(k)
+        hi = min(lo + 1, len(s) - 1)
+        return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+    return {
+        "count": len(s),
+        "mean": round(sum(s) / len(s), 6),
+        "min": round(s[0], 6),
+        "p50": round(pct(50), 6),
+        "p90": round(pct(90), 6),
+        "p95": round(pct(95), 6),
+        "p99": round(pct(99), 6),
+        "max": round(s[-1], 6),
+    }
+
+
+class StageMemory:
+    """Peak/delta RSS for one stage (+ Python heap peak with --tracemalloc)"""
+
+    trace_python = False
+
+    def __enter__(self):
+        self.rss_before = self.rss_peak = _rss()
+        self._done = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+        if self.trace_python:
+            tracemalloc.start()
+        return self
+
+    def _sample(self):
+        while not self._done.wait(0.05):
+            self.rss_peak = max(self.rss_peak, _rss())
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self._sampler.join()
+        rss_after = _rss()
+        self.result = {
+            "rss_peak_mb": round(max(self.rss_peak, rss_after) / 1e6, 3),
+            "rss_delta_mb": round((rss_after - self.rss_before) / 1e6, 3),
+        }
+        if self.trace_python:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.result["py_peak_mb"] = round(peak / 1e6, 3)
+
+
+def _rss():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return 0
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+def synth_fixture(path, seconds=60, sr=48000, channels=2):
+    """Speech-like test signal: modulated noise bursts separated by pauses"""
+    import numpy as np
+    rng = np.random.default_rng(0)
+    t = np.arange(seconds * sr) / sr
+    envelope = (np.sin(2 * np.pi * 0.2 * t) > -0.3).astype(np.float32)
+    syllables = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)
+    voice = np.sin(2 * np.pi * 180 * t) + 0.3 * rng.standard_normal(len(t))
+    mono = (0.2 * envelope * syllables * voice).astype(np.float32)
+    data = np.repeat(mono[:, None], channels, axis=1)
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(sr)
+        wf.writeframes((np.clip(data, -1, 1) * 32767).astype(np.int16).tobytes())
+
+
+def load_fixtures(fixtures_dir):
+    """List of (name, loopback wav, mic wav or None)"""
+    fixtures = []
+    if os.path.isdir(fixtures_dir):
+        for fname in sorted(os.listdir(fixtures_dir)):
+            if fname.endswith(".wav") and not fname.endswith(".mic.wav"):
+                name = fname[:-4]
+                mic = os.path.join(fixtures_dir, name + ".mic.wav")
+                fixtures.append((name, os.path.join(fixtures_dir, fname), mic if os.path.exists(mic) else None))
+    if not fixtures:
+        path = os.path.join(os.environ["MEETING_AI_DATA_DIR"], "synthetic.wav")
+        synth_fixture(path)
+        fixtures.append(("synthetic", path, None))
+    return fixtures
+
+
+def read_wav(path):
+    with wave.open(path, "rb") as wf:
+        return wf.readframes(wf.getnframes()), wf.getnchannels(), wf.getframerate()
+
+
+def callback_blocks(raw, channels, sr):
+    """Split raw int16 audio into the blocks the WASAPI callback would deliver"""
+    step = int(sr * CALLBACK_SECONDS) * 2 * channels
+    return [raw[i:i + step] for i in range(0, len(raw), step)]
+
+
+# ---------------------------------------------------------------------------
+# Stage 1: transcription
+# ---------------------------------------------------------------------------
+
+class StubWhisperModel:
+    """Mimics WhisperModel.transcribe: fixed real-time factor, canned text"""
+
+    class _Segment:
+        def __init__(self, text):
+            self.text = text
+
+    def __init__(self, rtf=0.05):
+        self.rtf = rtf
+        self.calls = 0
+
+    def transcribe(self, audio, **kwargs):
+        with wave.open(audio, "rb") as wf:
+            duration = wf.getnframes() / wf.getframerate()
+        time.sleep(duration * self.rtf)
+        self.calls += 1
+        words = " ".join(f"word{self.calls}_{i}" for i in range(int(duration * 2.5)))
+        return iter([self._Segment(words)]), None
+
+
+def _timed(module, name, bucket):
+    """Wrap module.name so every call records its duration into bucket[name]"""
+    original = getattr(module, name)
+    samples = bucket.setdefault(name, [])
+
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter() - t0)
+
+    setattr(module, name, wrapper)
+    return original
+
+
+def bench_transcription(args, fixtures):
+    import audio_mixer
+    import live_transcribe
+
+    if args.model == "stub":
+        model = StubWhisperModel(rtf=args.stub_rtf)
+    else:
+        model = live_transcribe.load_whisper_model(args.model)
+        if model is None:
+            return {"error": f"could not load model {args.model}"}
+
+    stage_times = {}
+    originals = {name: _timed(live_transcribe, name, stage_times)
+                 for name in ("to_mono_16k", "mix_sources", "transcribe_segment", "append_line")}
+    live_transcribe.init_output()
+
+    segment_latency = []
+    audio_seconds = 0.0
+    committed = 0
+    with StageMemory() as mem:
+        t_start = time.perf_counter()
+        for name, lb_path, mic_path in fixtures:
+            lb_raw, lb_channels, lb_sr = read_wav(lb_path)
+            mic_blocks, mic_channels, mic_sr = [], 1, 48000
+            if mic_path:
+                mic_raw, mic_channels, mic_sr = read_wav(mic_path)
+                mic_blocks = callback_blocks(mic_raw, mic_channels, mic_sr)
+            audio_seconds += len(lb_raw) / (2 * lb_channels * lb_sr)
+
+            first, regular = live_transcribe.segment_thresholds(lb_sr, args.segment)
+            mixer = audio_mixer.Mixer(lb_sr, mic_sr, rate=live_transcribe.SAMPLE_RATE) if mic_path else None
+            lb_frames, mic_frames = [], []
+            segment_count = 0
+            prev_text = ""
+            for i, block in enumerate(callback_blocks(lb_raw, lb_channels, lb_sr)):
+                lb_frames.append(block)
+                if i < len(mic_blocks):
+                    mic_frames.append(mic_blocks[i])
+                if args.realtime:
+                    time.sleep(CALLBACK_SECONDS)
+                total_samples = sum(len(f) for f in lb_frames) // (2 * lb_channels)
+                if total_samples < (first if segment_count == 0 else regular):
+                    continue
+                segment_count += 1
+                t0 = time.perf_counter()
+                text, prev_text = live_transcribe.process_segment(
+                    model, segment_count, b"".join(lb_frames), lb_channels, lb_sr,
+                    b"".join(mic_frames) if mic_path else None, mic_channels, mic_sr,
+                    prev_text, args.language, mixer=mixer,
+                )
+                segment_latency.append(time.perf_counter() - t0)
+                committed += 1 if text else 0
+                lb_frames.clear()
+                mic_frames.clear()
+        wall = time.perf_counter() - t_start
+
+    for name, fn in originals.items():
+        setattr(live_transcribe, name, fn)
+
+    return {
+        "model": args.model,
+        "fixtures": [f[0] for f in fixtures],
+        "audio_seconds": round(audio_seconds, 3),
+        "wall_seconds": round(wall, 3),
+        "realtime_factor": round(audio_seconds / wall, 3) if wall > 0 else 0,
+        "segments": len(segment_latency),
+        "committed": committed,
+        "segment_latency": percentiles(segment_latency),
+        "stages": {name: percentiles(v) for name, v in stage_times.items()},
+        "memory": mem.result,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Stage 2: analysis
+# ---------------------------------------------------------------------------
+
+def _synthetic_transcript(lines):
+    return "\n".join(
+        f"[{10 + i // 360:02d}:{i // 6 % 60:02d}:{i % 6 * 10:02d}] "
+        f"Line {i}: we should look at the rollout plan and the budget for next quarter."
+        for i in range(lines)
+    )
+
+
+def bench_analysis(args):
+    os.environ["MEETING_AI_CLAUDE_CMD"] = f'"{sys.executable}" "{STUB_CLAUDE}"'
+    os.environ["STUB_CLAUDE_DELAY"] = str(args.stub_delay)
+    import analyst
+    from backends import HTTPBackend, ClaudeCLIBackend
+
+    stub = None
+    if args.backend == "http":
+        from stub_server import start_stub, stats as stub_stats
+        stub, url = start_stub()
+        analyst.set_backend(HTTPBackend(url=url, api_key="stub"))
+    else:
+        analyst.set_backend(ClaudeCLIBackend())
+
+    latency, first_token = [], []
+    by_size = {}
+    with StageMemory() as mem:
+        for lines in args.transcript_lines:
+            text = _synthetic_transcript(lines)
+            samples, ttft = [], []
+            for _ in range(args.analysis_runs):
+                first = []
+
+                def on_text(_text):
+                    if not first:
+                        first.append(time.perf_counter() - t0)
+
+                t0 = time.perf_counter()
+                result = analyst.analyze_with_claude(text, None if args.no_stream else on_text)
+                samples.append(time.perf_counter() - t0)
+                ttft += first
+                if not result:
+                    return {"error": "stub backend returned no analysis"}
+            latency += samples
+            first_token += ttft
+            by_size[str(lines)] = {"transcript_chars": len(text), "latency": percentiles(samples),
+                                   "first_token": percentiles(ttft)}
+
+    result = {
+        "backend": "stub_server" if stub else "stub_claude",
+        "stub_delay": args.stub_delay,
+        "streaming": not args.no_stream,
+        "latency": percentiles(latency),
+        "first_token": percentiles(first_token),
+        "by_transcript_lines": by_size,
+        "memory": mem.result,
+    }
+    if stub:
+        result["connections"] = dict(stub_stats)
+        stub.shutdown()
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Stage 3: web server
+# ---------------------------------------------------------------------------
+
+# Requests a browser tab issues, weighted by how often index.html polls them
+BROWSER_MIX = [
+    ("/api/levels", 25),    # every 200ms
+    ("/api/analyst", 5),    # every 1s
+    ("/api/heartbeat", 1),  # every 5s
+    ("/api/transcription", 1),
+    ("/api/analysis", 1),
+    ("/api/status", 1),
+]
+
+
+def _browser_client(port, deadline, latencies, errors):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    schedule = [path for path, weight in BROWSER_MIX for _ in range(weight)]
+    i = 0
+    while time.perf_counter() < deadline:
+        path = schedule[i % len(schedule)]
+        i += 1
+        t0 = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            resp = conn.getresponse()
+            resp.read()
+            latencies.setdefault(path, []).append(time.perf_counter() - t0)
+            if resp.status != 200:
+                errors.append(f"{path}: HTTP {resp.status}")
+        except Exception as e:
+            errors.append(f"{path}: {type(e).__name__}")
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.close()
+
+
+def _sse_client(port, deadline, sent, propagation, first_event):
+    """Reads /api/stream and measures how long appended lines take to show up"""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    t0 = time.perf_counter()
+    conn.request("GET", "/api/stream")
+    resp = conn.getresponse()
+    seen = set()
+    try:
+        while time.perf_counter() < deadline:
+            line = resp.fp.readline()
+            if not line:
+                break
+            if not line.startswith(b"data: "):
+                continue
+            now = time.perf_counter()
+            if not first_event:
+                first_event.append(now - t0)
+            content = line[6:].decode("utf-8", errors="replace")
+            for token, t_sent in list(sent.items()):
+                if token not in seen and token in content:
+                    seen.add(token)
+                    propagation.append(now - t_sent)
+    except Exception:
+        pass
+    finally:
+        conn.close()
+
+
+def bench_server(args):
+    from werkzeug.serving import make_server
+    import server
+    from paths import TRANSCRIPTION_FILE, ANALYSIS_FILE
+
+    server.app_status.update({"ready": True, "message": "Benchmark"})
+    with open(TRANSCRIPTION_FILE, "w", encoding="utf-8") as f:
+        f.write(_synthetic_transcript(args.transcript_lines[-1]) + "\n")
+    with open(ANALYSIS_FILE, "w", encoding="utf-8") as f:
+        f.write("# Meeting Analysis - benchmark\n\n## Topics Discussed\n- Benchmark\n")
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    httpd = make_server("127.0.0.1", 0, server.app, threaded=True)
+    port = httpd.server_port
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    latencies, errors, propagation, sent = {}, [], [], {}
+    first_events = [[] for _ in range(args.sse_clients)]
+    with StageMemory() as mem:
+        deadline = time.perf_counter() + args.duration
+        threads = [threading.Thread(target=_browser_client, args=(port, deadline, latencies, errors), daemon=True)
+                   for _ in range(args.clients)]
+        threads += [threading.Thread(target=_sse_client, args=(port, deadline, sent, propagation, first_events[i]),
+                                     daemon=True)
+                    for i in range(args.sse_clients)]
+        t_start = time.perf_counter()
+        for t in threads:
+            t.start()
+
+        # Writer: appends a uniquely tagged caption like live_transcribe does
+        n = 0
+        while time.perf_counter() < deadline - 3:
+            n += 1
+            token = f"benchtoken{n:05d}"
+            sent[token] = time.perf_counter()
+            with open(TRANSCRIPTION_FILE, "a", encoding="utf-8") as f:
+                f.write(f"[{time.strftime('%H:%M:%S')}] {token} appended by benchmark\n")
+            time.sleep(args.append_interval)
+        for t in threads:
+            t.join(timeout=args.duration + 10)
+        wall = time.perf_counter() - t_start
+    httpd.shutdown()
+
+    all_latencies = [x for v in latencies.values() for x in v]
+    expected = len(sent) * args.sse_clients
+    return {
+        "clients": args.clients,
+        "sse_clients": args.sse_clients,
+        "duration": round(wall, 3),
+        "requests": len(all_latencies),
+        "requests_per_sec": round(len(all_latencies) / wall, 2) if wall > 0 else 0,
+        "errors": len(errors),
+        "error_samples": errors[:10],
+        "latency": percentiles(all_latencies),
+        "endpoints": {path: percentiles(v) for path, v in sorted(latencies.items())},
+        "sse_first_event": percentiles([x for fe in first_events for x in fe]),
+        "sse_propagation": percentiles(propagation),
+        "sse_delivered": f"{len(propagation)}/{expected}",
+        "memory": mem.result,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Stage 4: startup
+# ---------------------------------------------------------------------------
+
+_IMPORT_TIMER = """
+import sys, time
+t0 = time.perf_counter()
+import {module}
+print(time.perf_counter() - t0)
+"""
+
+
+def bench_startup(args):
+    """Import time of each entry module, fresh interpreter per sample"""
+    import subprocess
+    import startup
+
+    modules = {}
+    missed = []
+    for module, target in STARTUP_TARGETS.items():
+        samples = []
+        for _ in range(args.startup_runs):
+            proc = subprocess.run([sys.executable, "-c", _IMPORT_TIMER.format(module=module)],
+                                  capture_output=True, text=True, cwd=REPO_DIR)
+            if proc.returncode != 0:
+                modules[module] = {"error": proc.stderr.strip().splitlines()[-1]}
+                break
+            samples.append(float(proc.stdout.strip()))
+        if not samples:
+            continue
+        stats = percentiles(samples)
+        stats["target"] = target
+        stats["ok"] = stats["p50"] <= target
+        modules[module] = stats
+        if not stats["ok"]:
+            missed.append(module)
+            print(f"[STARTUP] {module}: {stats['p50'] * 1000:.0f} ms > target {target * 1000:.0f} ms")
+
+    slowest = sorted(startup.import_report(tuple(STARTUP_TARGETS)), key=lambda r: r["self"], reverse=True)
+    return {
+        "modules": modules,
+        "missed_targets": missed,
+        "slowest_imports": [{"module": r["module"], "self": round(r["self"], 6)} for r in slowest[:10]],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Results
+# ---------------------------------------------------------------------------
+
+def _lookup(results, dotted):
+    node = results
+    for key in dotted.split("."):
+        if not isinstance(node, dict) or key not in node:
+            return None
+        node = node[key]
+    return node if isinstance(node, (int, float)) else None
+
+
+def compare(results, baseline, tolerance):
+    """List of regressions vs a previous run (relative change beyond tolerance)"""
+    regressions = []
+    for path, higher_is_better in COMPARED_METRICS:
+        new, old = _lookup(results, path), _lookup(baseline, path)
+        if new is None or old is None or old == 0:
+            continue
+        change = (new - old) / old
+        worse = change < -tolerance if higher_is_better else change > tolerance
+        status = "REGRESSION" if worse else "ok"
+        print(f"[COMPARE] {path:<40s} {old:>10.4f} -> {new:>10.4f} ({change:+.1%}) {status}")
+        if worse:
+            regressions.append({"metric": path, "baseline": old, "current": new, "change": round(change, 4)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Meeting AI Analyser - Benchmark")
+    parser.add_argument("--stages", default="transcription,analysis,server,startup",
+                        help="Comma-separated: transcription, analysis, server, startup")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Directory of .wav fixtures")
+    parser.add_argument("--model", default="stub", help="Whisper model size, or 'stub'")
+    parser.add_argument("--stub-rtf", type=float, default=0.05, help="Stub model real-time factor")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--segment", type=int, default=10, help="Segment duration (seconds)")
+    parser.add_argument("--realtime", action="store_true", help="Replay at capture speed")
+    parser.add_argument("--stub-delay", type=float, default=0.5, help="Stub backend latency (seconds)")
+    parser.add_argument("--backend", choices=["cli", "http"], default="cli",
+                        help="Analysis backend: stub CLI process or stub HTTP server")
+    parser.add_argument("--analysis-runs", type=int, default=3, help="Analyses per transcript size")
+    parser.add_argument("--no-stream", action="store_true", help="Analyze without streaming output")
+    parser.add_argument("--transcript-lines", type=lambda s: [int(x) for x in s.split(",")],
+                        default=[60, 360, 720], help="Transcript sizes to analyze (lines)")
+    parser.add_argument("--clients", type=int, default=8, help="Simulated browser clients")
+    parser.add_argument("--sse-clients", type=int, default=4, help="Concurrent /api/stream clients")
+    parser.add_argument("--duration", type=float, default=15, help="Server load duration (seconds)")
+    parser.add_argument("--append-interval", type=float, default=1.0, help="Seconds between appended captions")
+    parser.add_argument("--startup-runs", type=int, default=5, help="Fresh interpreters per startup sample")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Also record Python heap peaks (slows allocation-heavy stages)")
+    parser.add_argument("--trace", help="Also write a Chrome trace of all stages to this file")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    StageMemory.trace_python = args.tracemalloc
+    if args.trace:
+        import tracing
+        tracing.enable()
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "data_dir": os.environ["MEETING_AI_DATA_DIR"],
+            "args": vars(args),
+        }
+    }
+
+    if "transcription" in stages:
+        print("[BENCH] Transcription stage...")
+        results["transcription"] = bench_transcription(args, load_fixtures(args.fixtures))
+    if "analysis" in stages:
+        print("[BENCH] Analysis stage...")
+        results["analysis"] = bench_analysis(args)
+    if "server" in stages:
+        print("[BENCH] Server stage...")
+        results["server"] = bench_server(args)
+    if "startup" in stages:
+        print("[BENCH] Startup stage...")
+        results["startup"] = bench_startup(args)
+
+    if args.trace:
+        print(f"[BENCH] Trace written to {tracing.dump(args.trace)}")
+
+    exit_code = 1 if results.get("startup", {}).get("missed_targets") else 0
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        results["regressions"] = compare(results, baseline, args.tolerance)
+        exit_code = 1 if results["regressions"] else exit_code
+
+    out = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(out + "\n")
+        print(f"[BENCH] Results written to {args.output}")
+    else:
+        print(out)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Meeting AI Analyser - Remote capture client (test / load generator)
+Creates sessions on a headless server (python main.py --headless) and
+streams audio to them over chunked HTTP at real-time pace (or faster),
+the way a thin capture client would.
+
+Usage:
+    python bench/ingest_client.py --url http://127.0.0.1:5555 --wav meeting.wav
+    python bench/ingest_client.py --sessions 8 --seconds 120 --speed 4
+
+Without --wav a synthetic tone is sent. Reports, per session, how long the
+server held back the upload (backpressure) and the final session status.
+"""
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+import urllib.parse
+import wave
+
+import numpy as np
+
+# 100 ms of audio per chunk
+CHUNK_SECONDS = 0.1
+
+
+def _request(url, method, path, body=None):
+    u = urllib.parse.urlsplit(url)
+    conn = http.client.HTTPConnection(u.hostname, u.port or 80, timeout=60)
+    conn.request(method, path, json.dumps(body) if body is not None else None,
+                 {"Content-Type": "application/json"})
+    resp = conn.getresponse()
+    data = json.loads(resp.read() or b"{}")
+    conn.close()
+    return resp.status, data
+
+
+def load_audio(args):
+    """(int16 interleaved bytes, channels, rate)"""
+    if args.wav:
+        with wave.open(args.wav, "rb") as wf:
+            return wf.readframes(wf.getnframes()), wf.getnchannels(), wf.getframerate()
+    t = np.arange(int(args.seconds * args.rate)) / args.rate
+    # Tone bursts with gaps, so segments alternate speech-like / silence
+    tone = 0.3 * np.sin(2 * np.pi * 220 * t) * (np.sin(2 * np.pi * 0.2 * t) > 0)
+    return (tone * 32767).astype(np.int16).tobytes(), 1, args.rate
+
+
+def stream_session(args, index, audio, channels, rate, results):
+    status, info = _request(args.url, "POST", "/api/sessions", {
+        "id": f"{args.prefix}{index}", "language": args.language,
+        "segment": args.segment, "channels": channels, "rate": rate,
+    })
+    if status != 201:
+        results[index] = {"error": info.get("error", status)}
+        return
+    session_id = info["id"]
+    chunk = int(rate * CHUNK_SECONDS) * 2 * channels
+    blocked = [0.0]
+
+    def body():
+        t0 = time.perf_counter()
+        for i, pos in enumerate(range(0, len(audio), chunk)):
+            # Real-time pace / speed
+            ahead = t0 + i * CHUNK_SECONDS / args.speed - time.perf_counter()
+            if ahead > 0:
+                time.sleep(ahead)
+            sent = time.perf_counter()
+            yield audio[pos:pos + chunk]
+            # Time spent inside the socket send = server not reading (backpressure)
+            blocked[0] += max(0.0, time.perf_counter() - sent - 0.001)
+
+    u = urllib.parse.urlsplit(args.url)
+    conn = http.client.HTTPConnection(u.hostname, u.port or 80, timeout=120)
+    started = time.perf_counter()
+    conn.request("POST", f"/api/sessions/{session_id}/audio", body(),
+                 {"Content-Type": "application/octet-stream"}, encode_chunked=True)
+    resp = conn.getresponse()
+    reply = json.loads(resp.read() or b"{}")
+    conn.close()
+    elapsed = time.perf_counter() - started
+
+    _, final = _request(args.url, "DELETE", f"/api/sessions/{session_id}")
+    results[index] = {
+        "session": session_id,
+        "http": resp.status,
+        "upload_s": round(elapsed, 2),
+        "audio_s": round(len(audio) / (2 * channels * rate), 1),
+        "backpressure_waits": reply.get("stream", {}).get("backpressure_waits"),
+        "backpressure_ms": reply.get("stream", {}).get("backpressure_ms"),
+        "segments": final.get("segments"),
+        "committed": final.get("committed"),
+        "error": reply.get("error"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream audio to a headless Meeting AI Analyser")
+    parser.add_argument("--url", default="http://127.0.0.1:5555")
+    parser.add_argument("--wav", default=None, help="16-bit WAV to stream (default: synthetic)")
+    parser.add_argument("--seconds", type=float, default=60, help="Synthetic audio length")
+    parser.add_argument("--rate", type=int, default=16000, help="Synthetic audio sample rate")
+    parser.add_argument("--sessions", type=int, default=1, help="Concurrent sessions")
+    parser.add_argument("--speed", type=float, default=1.0, help="Upload pace, x real time")
+    parser.add_argument("--segment", type=int, default=10)
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--prefix", default="client-", help="Session id prefix")
+    args = parser.parse_args()
+
+    audio, channels, rate = load_audio(args)
+    results = [None] * args.sessions
+    threads = [threading.Thread(target=stream_session, args=(args, i, audio, channels, rate, results))
+               for i in range(args.sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for r in results:
+        print(json.dumps(r))
+    sys.exit(1 if any(r is None or r.get("error") for r in results) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Meeting AI Analyser - Stub analysis backend
+Stands in for the `claude` CLI during benchmarks: reads the prompt on stdin,
+waits a configurable latency and prints a canned Markdown analysis.
+
+Usage (what analyst.py ends up running):
+    set MEETING_AI_CLAUDE_CMD=python bench/stub_claude.py
+    python analyst.py
+
+With `--output-format stream-json`, emits the analysis as stream-json events
+(token deltas spread over the delay) like the real CLI.
+
+Env:
+    STUB_CLAUDE_DELAY       fixed latency in seconds (default 0.5)
+    STUB_CLAUDE_PER_KCHAR   extra latency per 1000 prompt chars (default 0.01)
+"""
+import json
+import os
+import sys
+import time
+
+ANALYSIS = """## Topics Discussed
+- Stub topic ({chars} prompt chars)
+
+## Decisions Made
+- None (stub backend)
+
+## Open Questions
+- None
+
+## Suggested Technical Solutions
+- None
+
+## Action Items
+- Nobody: nothing to do
+"""
+
+
+def _emit(entry):
+    sys.stdout.write(json.dumps(entry) + "\n")
+    sys.stdout.flush()
+
+
+def stream(text, delay):
+    """Half the delay before the first token, the rest spread over the tokens"""
+    time.sleep(delay / 2)
+    tokens = [text[i:i + 16] for i in range(0, len(text), 16)]
+    for token in tokens:
+        _emit({"type": "stream_event", "event": {
+            "type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": token},
+        }})
+        time.sleep(delay / 2 / len(tokens))
+    _emit({"type": "assistant", "message": {"role": "assistant", "content": [{"type": "text", "text": text}]}})
+    _emit({"type": "result", "subtype": "success", "is_error": False, "result": text})
+
+
+def main():
+    prompt = sys.stdin.read()
+    delay = float(os.environ.get("STUB_CLAUDE_DELAY", "0.5"))
+    per_kchar = float(os.environ.get("STUB_CLAUDE_PER_KCHAR", "0.01"))
+    delay += per_kchar * len(prompt) / 1000
+    text = ANALYSIS.format(chars=len(prompt))
+    if "stream-json" in sys.argv:
+        stream(text, delay)
+    else:
+        time.sleep(delay)
+        sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    main()
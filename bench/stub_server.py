@@ -0,0 +1,131 @@
+"""
+Meeting AI Analyser - Stub HTTP analysis backend
+Serves POST /v1/messages (Messages API shape, JSON or SSE streaming) with
+the canned analysis from stub_claude.py, over HTTP/1.1 keep-alive.
+GET /stats reports connections vs requests (connection reuse).
+
+Usage:
+    python bench/stub_server.py --port 8765
+    python main.py --backend http --backend-url http://127.0.0.1:8765
+
+Env: STUB_CLAUDE_DELAY / STUB_CLAUDE_PER_KCHAR as for stub_claude.py
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from stub_claude import ANALYSIS
+
+stats = {"connections": 0, "requests": 0}
+_stats_lock = threading.Lock()
+
+
+def _delay(prompt):
+    delay = float(os.environ.get("STUB_CLAUDE_DELAY", "0.5"))
+    return delay + float(os.environ.get("STUB_CLAUDE_PER_KCHAR", "0.01")) * len(prompt) / 1000
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with _stats_lock:
+            stats["connections"] += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send_json(200, stats)
+        else:
+            self._send_json(404, {"type": "error", "error": {"type": "not_found_error"}})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path != "/v1/messages":
+            self._send_json(404, {"type": "error", "error": {"type": "not_found_error"}})
+            return
+        with _stats_lock:
+            stats["requests"] += 1
+        request = json.loads(body)
+        prompt = "".join(m["content"] for m in request.get("messages", []) if isinstance(m.get("content"), str))
+        text = ANALYSIS.format(chars=len(prompt))
+        delay = _delay(prompt)
+        if request.get("stream"):
+            self._stream(text, delay)
+        else:
+            time.sleep(delay)
+            self._send_json(200, {"type": "message", "role": "assistant",
+                                  "content": [{"type": "text", "text": text}], "stop_reason": "end_turn"})
+
+    def _event(self, data):
+        chunk = f"event: {data['type']}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+        self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+        self.wfile.flush()
+
+    def _stream(self, text, delay):
+        """Same pacing as stub_claude.stream(): half the delay before the first token"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self._event({"type": "message_start", "message": {"role": "assistant", "content": []}})
+        time.sleep(delay / 2)
+        tokens = [text[i:i + 16] for i in range(0, len(text), 16)]
+        for token in tokens:
+            self._event({"type": "content_block_delta", "index": 0,
+                         "delta": {"type": "text_delta", "text": token}})
+            time.sleep(delay / 2 / len(tokens))
+        self._event({"type": "message_stop"})
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up mid-response (cancelled analyses) are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_stub(port=0):
+    """Serve in a background thread, return (server, base_url)"""
+    server = StubServer(("127.0.0.1", port), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub Messages API server for benchmarks")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=None, help="Fixed latency (overrides STUB_CLAUDE_DELAY)")
+    args = parser.parse_args()
+    if args.delay is not None:
+        os.environ["STUB_CLAUDE_DELAY"] = str(args.delay)
+    server = StubServer(("127.0.0.1", args.port), StubHandler)
+    print(f"[STUB] Serving on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
 # -*- mode: python ; coding: utf-8 -*-
-"""PyInstaller spec for Meeting AI Analyser"""
+"""PyInstaller spec for Meeting AI Analyser
+
+One-file build by default: the .exe unpacks itself to a temp dir on every
+launch. MEETING_AI_ONEDIR=1 builds dist/MeetingAIAnalyser/ instead, which
+is extracted once (at install time) and starts without unpacking.
+"""
 import os
 import site
 
 block_cipher = None
+ONEDIR = os.environ.get("MEETING_AI_ONEDIR", "") not in ("", "0")
 
 # Find CTranslate2 and NVIDIA binaries
 site_packages = site.getsitepackages()[0]
@@ -49,9 +55,28 @@ a = Analysis(
         'flask',
         'psutil',
         'paths',
+        'applog',
+        'tracing',
+        'transcript',
         'live_transcribe',
+        'transcription_worker',
+        'meeting_sessions',
+        'audio_ingest',
+        'diarization',
+        'transcript_store',
+        'autotune',
+        'keyword_alerts',
+        'language_detect',
+        'events',
+        'audio_mixer',
         'analyst',
+        'analysis_cache',
+        'conversation_index',
+        'backends',
         'server',
+        'scheduler',
+        'sections',
+        'startup',
     ],
     hookspath=[],
     hooksconfig={},
@@ -65,20 +90,12 @@ a = Analysis(
 
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.zipfiles,
-    a.datas,
-    [],
+exe_options = dict(
     name='MeetingAIAnalyser',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
     upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -87,3 +104,28 @@ exe = EXE(
     entitlements_file=None,
     icon='assets/app.ico',
 )
+
+if ONEDIR:
+    exe = EXE(pyz, a.scripts, [], exclude_binaries=True, **exe_options)
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.zipfiles,
+        a.datas,
+        strip=False,
+        upx=True,
+        upx_exclude=[],
+        name='MeetingAIAnalyser',
+    )
+else:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        a.binaries,
+        a.zipfiles,
+        a.datas,
+        [],
+        upx_exclude=[],
+        runtime_tmpdir=None,
+        **exe_options,
+    )
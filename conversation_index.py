@@ -0,0 +1,164 @@
+"""
+Meeting AI Analyser - Conversation index
+Persistent index of Claude conversation files (data/conversation_index.json):
+path, mtime, size, project and preview. A refresh walks .claude/projects/
+with os.scandir and only re-reads files whose mtime or size changed.
+"""
+import json
+import os
+import threading
+import time
+
+from paths import CONVERSATION_INDEX_FILE
+
+# A refresh at most this often (seconds); listings in between use the index as is
+REFRESH_INTERVAL = 2
+
+# Lines read from the start of a conversation to find its preview
+PREVIEW_LINES = 21
+
+_index = {"base": None, "files": {}}
+_sorted = []
+_state = {"loaded": False, "refreshed": 0}
+_lock = threading.Lock()
+
+
+def read_preview(fpath):
+    """First user message of a conversation file ("" if none found)"""
+    preview = ""
+    try:
+        with open(fpath, "r", encoding="utf-8") as f:
+            for line_num, raw_line in enumerate(f):
+                if line_num >= PREVIEW_LINES:
+                    break
+                entry = json.loads(raw_line)
+                # Format 1: type=user with message.content[].text
+                if entry.get("type") == "user":
+                    msg = entry.get("message", {})
+                    content_blocks = msg.get("content", []) if isinstance(msg, dict) else []
+                    if isinstance(content_blocks, list):
+                        for block in content_blocks:
+                            if isinstance(block, dict) and block.get("type") == "text":
+                                preview = block.get("text", "").strip()[:80]
+                                break
+                    elif isinstance(content_blocks, str):
+                        preview = content_blocks.strip()[:80]
+                    if preview:
+                        break
+                # Format 2: queue-operation with content
+                if entry.get("type") == "queue-operation" and entry.get("content"):
+                    raw_content = entry["content"]
+                    for text_line in raw_content.split("\n"):
+                        s = text_line.strip()
+                        if s and not s.startswith("===") and not s.startswith("INSTRUCTION"):
+                            preview = s[:80]
+                            break
+                    if preview:
+                        break
+    except Exception:
+        pass
+    return preview
+
+
+def _project_name(dirname):
+    # Clean: strip drive prefix (C-- or c--), keep rest as-is
+    return dirname[3:] if dirname[:3].lower() == "c--" else dirname
+
+
+def _scan(base):
+    """(path, mtime, size) of every conversation file under base, subagents excluded"""
+    stack = [base]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name != "subagents":
+                            stack.append(entry.path)
+                    elif entry.name.endswith(".jsonl"):
+                        st = entry.stat()
+                        yield entry.path, st.st_mtime, st.st_size
+                except OSError:
+                    continue
+
+
+def _load():
+    _state["loaded"] = True
+    if os.path.exists(CONVERSATION_INDEX_FILE):
+        try:
+            with open(CONVERSATION_INDEX_FILE, "r", encoding="utf-8") as f:
+                _index.update(json.load(f))
+        except Exception:
+            pass
+
+
+def _save():
+    tmp = CONVERSATION_INDEX_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(_index, f)
+    os.replace(tmp, CONVERSATION_INDEX_FILE)
+
+
+def refresh(base, force=False):
+    """Bring the index up to date with the files under base. Returns True if anything changed."""
+    global _sorted
+    with _lock:
+        if not _state["loaded"]:
+            _load()
+        now = time.time()
+        if not force and _index["base"] == base and now - _state["refreshed"] < REFRESH_INTERVAL and _sorted:
+            return False
+        _state["refreshed"] = now
+
+        old = _index["files"] if _index["base"] == base else {}
+        files = {}
+        changed = _index["base"] != base
+        for path, mtime, size in _scan(base):
+            meta = old.get(path)
+            if meta is None or meta["mtime"] != mtime or meta["size"] != size:
+                meta = {
+                    "id": os.path.splitext(os.path.basename(path))[0],
+                    "project": _project_name(os.path.basename(os.path.dirname(path))),
+                    "mtime": mtime,
+                    "size": size,
+                    "preview": read_preview(path),
+                }
+                changed = True
+            files[path] = meta
+        changed = changed or len(files) != len(old)
+
+        if changed or not _sorted:
+            _index["base"] = base
+            _index["files"] = files
+            _sorted = sorted(files.values(), key=lambda m: m["mtime"], reverse=True)
+        if changed:
+            try:
+                _save()
+            except OSError:
+                pass
+        return changed
+
+
+def query(limit=50, offset=0, prefix=""):
+    """(page, total) of conversations, most recent first.
+
+    prefix filters on the session id or project name (case-insensitive).
+    """
+    entries = _sorted
+    if prefix:
+        prefix = prefix.lower()
+        entries = [m for m in entries if m["id"].lower().startswith(prefix)
+                   or m["project"].lower().startswith(prefix)]
+    page = []
+    for meta in entries[offset:offset + limit]:
+        page.append({
+            "id": meta["id"],
+            "project": meta["project"],
+            "date": time.strftime("%m/%d %H:%M", time.localtime(meta["mtime"])),
+            "preview": meta["preview"] or meta["id"][:16],
+        })
+    return page, len(entries)
@@ -0,0 +1,273 @@
+"""
+Meeting AI Analyser - Speaker diarization (optional, --diarize)
+Labels committed transcript lines with who spoke, off the caption path:
+process_segment() hands the segment audio over after writing the line and
+a background thread does the rest.
+
+  1. Speech regions: energy-based, on loopback + mic
+  2. Regions where the microphone dominates are "Me"
+  3. Other regions get a speaker embedding (resemblyzer if installed,
+     otherwise log-mel statistics computed with numpy) and are clustered
+     online against a fixed-size centroid matrix: no history is kept, so
+     memory stays bounded and past lines are never re-processed
+
+Labels go to a sidecar file (data/transcription_speakers.jsonl, one JSON
+object per committed line, keyed by its [HH:MM:SS] timestamp), leaving the
+transcript format untouched.
+"""
+import json
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+import applog
+import events
+from paths import SPEAKERS_FILE, DATA_DIR
+
+SAMPLE_RATE = 16000
+FRAME = 400  # 25 ms
+HOP = 160  # 10 ms
+N_MELS = 40
+
+# Speech regions: frame RMS above this, at least REGION_MIN seconds,
+# gaps shorter than REGION_GAP merged, split into REGION_MAX pieces
+SPEECH_RMS = 0.01
+REGION_MIN = 0.8
+REGION_GAP = 0.3
+REGION_MAX = 4.0
+# Mic RMS / loopback RMS above which a region is the local user
+MIC_DOMINANCE = 2.0
+
+MAX_SPEAKERS = 8
+# Centroids keep adapting: a new embedding weighs at least 1 / COUNT_CAP
+COUNT_CAP = 50
+# Segments waiting for diarization; more are dropped (captions never wait)
+QUEUE_SIZE = 8
+
+SELF_LABEL = "Me"
+
+log = applog.logger(os.path.join(DATA_DIR, "transcribe_debug.log"))
+
+
+def _mel_filterbank(n_mels=N_MELS, n_fft=512, sr=SAMPLE_RATE):
+    def mel(f):
+        return 2595 * np.log10(1 + f / 700)
+
+    def hz(m):
+        return 700 * (10 ** (m / 2595) - 1)
+
+    points = hz(np.linspace(mel(60), mel(sr / 2 * 0.9), n_mels + 2))
+    bins = np.floor((n_fft + 1) * points / sr).astype(int)
+    fb = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for i in range(n_mels):
+        left, center, right = bins[i], max(bins[i + 1], bins[i] + 1), max(bins[i + 2], bins[i + 1] + 2)
+        fb[i, left:center] = (np.arange(left, center) - left) / (center - left)
+        fb[i, center:right] = (right - np.arange(center, right)) / (right - center)
+    return fb
+
+
+def frame_signal(audio, frame=FRAME, hop=HOP):
+    """(n_frames, frame) strided view, no copy"""
+    n = 1 + (len(audio) - frame) // hop if len(audio) >= frame else 0
+    return np.lib.stride_tricks.as_strided(
+        audio, shape=(n, frame), strides=(audio.strides[0] * hop, audio.strides[0]), writeable=False)
+
+
+class SpectralEmbedder:
+    """Mean + std of log-mel energies: crude, dependency-free.
+
+    Each half is centered across bands, so loudness doesn't count, only the
+    shape of the spectral envelope.
+    """
+
+    name = "spectral"
+    threshold = 0.85
+
+    def __init__(self):
+        self._fb = _mel_filterbank()
+        self._window = np.hanning(FRAME).astype(np.float32)
+
+    def embed(self, audio):
+        frames = frame_signal(audio) * self._window
+        power = np.abs(np.fft.rfft(frames, n=512, axis=1)) ** 2
+        logmel = np.log(power @ self._fb.T + 1e-8)
+        mean, std = logmel.mean(axis=0), logmel.std(axis=0)
+        return np.concatenate([mean - mean.mean(), std - std.mean()])
+
+
+class ResemblyzerEmbedder:
+    """d-vectors from resemblyzer's pretrained speaker encoder"""
+
+    name = "resemblyzer"
+    threshold = 0.75
+
+    def __init__(self):
+        from resemblyzer import VoiceEncoder
+        self._encoder = VoiceEncoder(verbose=False)
+
+    def embed(self, audio):
+        return self._encoder.embed_utterance(audio)
+
+
+def make_embedder():
+    try:
+        return ResemblyzerEmbedder()
+    except ImportError:
+        return SpectralEmbedder()
+
+
+class OnlineClusterer:
+    """Incremental speaker clustering over a fixed-size centroid matrix.
+
+    Each embedding is compared (cosine) with every centroid at once; it joins
+    the closest speaker above `threshold`, else starts a new one (up to
+    max_speakers, then the closest wins).
+    """
+
+    def __init__(self, threshold, max_speakers=MAX_SPEAKERS):
+        self.threshold = threshold
+        self.max_speakers = max_speakers
+        self.centroids = None
+        self.counts = np.zeros(max_speakers)
+        self.k = 0
+
+    def reset(self):
+        self.centroids = None
+        self.counts[:] = 0
+        self.k = 0
+
+    @staticmethod
+    def _unit(x):
+        return x / np.maximum(np.linalg.norm(x, axis=-1, keepdims=True), 1e-8)
+
+    def assign(self, embeddings):
+        """Cluster index for each row of `embeddings` (n, dim), updating the model"""
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float64))
+        if self.centroids is None:
+            self.centroids = np.zeros((self.max_speakers, embeddings.shape[1]))
+        labels = []
+        for e in self._unit(embeddings):
+            if self.k:
+                sims = self._unit(self.centroids[:self.k]) @ self._unit(e)
+                j = int(np.argmax(sims))
+                if sims[j] < self.threshold and self.k < self.max_speakers:
+                    j = self._new(e)
+            else:
+                j = self._new(e)
+            self.counts[j] = min(self.counts[j] + 1, COUNT_CAP)
+            self.centroids[j] += (e - self.centroids[j]) / self.counts[j]
+            labels.append(j)
+        return labels
+
+    def _new(self, e):
+        j = self.k
+        self.centroids[j] = e
+        self.counts[j] = 0
+        self.k += 1
+        return j
+
+
+def speech_regions(audio, sr=SAMPLE_RATE):
+    """[(start, end)] sample ranges of speech"""
+    frames = frame_signal(audio)
+    if not len(frames):
+        return []
+    active = np.sqrt(np.mean(frames ** 2, axis=1)) > SPEECH_RMS
+    # Edges of active runs, in frames
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], active.astype(np.int8), [0]])))
+    runs = edges.reshape(-1, 2)
+    regions = []
+    gap = int(REGION_GAP * sr / HOP)
+    for start, end in runs:
+        if regions and start - regions[-1][1] <= gap:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+    out = []
+    longest = int(REGION_MAX * sr)
+    for start, end in regions:
+        s, e = start * HOP, min(end * HOP + FRAME, len(audio))
+        if e - s < REGION_MIN * sr:
+            continue
+        for piece in range(s, e, longest):
+            if min(piece + longest, e) - piece >= REGION_MIN * sr:
+                out.append((int(piece), int(min(piece + longest, e))))
+    return out
+
+
+class Diarizer:
+    """Background diarization of committed segments"""
+
+    def __init__(self, path=SPEAKERS_FILE, embedder=None):
+        self.path = path
+        self.embedder = embedder or make_embedder()
+        self.clusterer = OnlineClusterer(self.embedder.threshold)
+        self.stats = {"embedder": self.embedder.name, "segments": 0, "dropped": 0, "speakers": 0, "avg_ms": 0.0}
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._lock = threading.Lock()
+        threading.Thread(target=self._run, name="diarization", daemon=True).start()
+        log(f"Diarization enabled ({self.embedder.name} embeddings)")
+
+    def submit(self, timestamp, lb_mono, mic_mono=None):
+        """Queue a committed segment (never blocks)"""
+        try:
+            self._queue.put_nowait((timestamp, lb_mono, mic_mono))
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def reset(self):
+        """New transcript: empty the sidecar and forget the speakers"""
+        with self._lock:
+            self.clusterer.reset()
+            self.stats["speakers"] = 0
+            open(self.path, "w", encoding="utf-8").close()
+
+    def label(self, lb_mono, mic_mono=None):
+        """[(start_s, end_s, label)] for one segment"""
+        if mic_mono is not None and len(mic_mono):
+            n = min(len(lb_mono), len(mic_mono))
+            lb_mono, mic_mono = lb_mono[:n], mic_mono[:n]
+            mixed = lb_mono + mic_mono
+        else:
+            mic_mono = None
+            mixed = lb_mono
+        regions = speech_regions(mixed)
+        labels = [None] * len(regions)
+        remote = []
+        for i, (s, e) in enumerate(regions):
+            if mic_mono is not None:
+                mic_rms = np.sqrt(np.mean(mic_mono[s:e] ** 2))
+                lb_rms = np.sqrt(np.mean(lb_mono[s:e] ** 2))
+                if mic_rms > MIC_DOMINANCE * lb_rms:
+                    labels[i] = SELF_LABEL
+                    continue
+            remote.append(i)
+        if remote:
+            embeddings = np.stack([self.embedder.embed(lb_mono[regions[i][0]:regions[i][1]]) for i in remote])
+            with self._lock:
+                for i, j in zip(remote, self.clusterer.assign(embeddings)):
+                    labels[i] = f"Speaker {j + 1}"
+                self.stats["speakers"] = self.clusterer.k
+        return [(round(s / SAMPLE_RATE, 2), round(e / SAMPLE_RATE, 2), label)
+                for (s, e), label in zip(regions, labels)]
+
+    def _run(self):
+        while True:
+            timestamp, lb_mono, mic_mono = self._queue.get()
+            t0 = time.perf_counter()
+            try:
+                regions = self.label(lb_mono, mic_mono)
+            except Exception as e:
+                log.error(f"Diarization failed: {type(e).__name__}: {e}")
+                continue
+            speakers = list(dict.fromkeys(label for _, _, label in regions))
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"time": timestamp, "speakers": speakers, "regions": regions}) + "\n")
+            events.publish("speakers", time=timestamp)
+            n = self.stats["segments"] = self.stats["segments"] + 1
+            elapsed = (time.perf_counter() - t0) * 1000
+            self.stats["avg_ms"] = round(self.stats["avg_ms"] + (elapsed - self.stats["avg_ms"]) / n, 1)
+            log.debug(f"Speakers at {timestamp}: {', '.join(speakers) or '-'} ({elapsed:.0f} ms)")
@@ -0,0 +1,139 @@
+"""
+Meeting AI Analyser - Event bus and timers
+Stages publish what just happened and the threads that used to sleep-poll
+for it (SSE streams, the analyst) block in wait() until one of their topics
+is published: they react at once and use no CPU in between. call_later()
+replaces watchdog loops: a single timer thread sleeps until the earliest
+deadline.
+
+Topics:
+  transcript        a line was committed, or the transcript was reset
+  segment           a segment was processed (worker status updated)
+  speakers, alerts  diarization labels / keyword alerts appended
+  analysis          analysis (and its sections) written or cleared
+  analysis_partial  streamed analysis text grew
+  analyst           analyst control: manual trigger, pause, resume
+  stop              shutting down
+
+The transcription worker forwards its events to the main process
+(transcription_worker), so a subscriber doesn't care where a stage runs.
+
+Files stay the source of truth: waiters re-check them every `fallback`
+seconds even without events, for producers in processes that aren't wired
+to this bus (server.py and analyst.py started on their own, Method 3).
+main.py raises it, since every producer there publishes.
+"""
+import heapq
+import itertools
+import threading
+import time
+
+settings = {"fallback": 2.0}
+
+stats = {"published": 0, "timers": 0}
+
+_cond = threading.Condition()
+_seq = 0
+# Sequence number of the last publish of each topic
+_last = {}
+# topic -> [callback(topic, data)]; "*" receives every topic
+_subscribers = {}
+
+
+def configure(fallback=None):
+    if fallback:
+        settings["fallback"] = fallback
+
+
+def publish(topic, **data):
+    """Wake the waiters of `topic` and run its subscribers (in this thread: keep them short)"""
+    global _seq
+    with _cond:
+        _seq += 1
+        _last[topic] = _seq
+        stats["published"] += 1
+        callbacks = _subscribers.get(topic, []) + _subscribers.get("*", [])
+        _cond.notify_all()
+    for callback in callbacks:
+        try:
+            callback(topic, data)
+        except Exception as e:
+            print(f"[EVENTS] {topic} subscriber failed: {type(e).__name__}: {e}")
+
+
+def subscribe(topic, callback):
+    with _cond:
+        _subscribers.setdefault(topic, []).append(callback)
+
+
+def cursor():
+    """Position in the event sequence, to pass to wait()"""
+    return _seq
+
+
+def wait(topics, after, timeout=None):
+    """Block until one of `topics` is published after cursor `after`, or `timeout` seconds.
+
+    Returns (new cursor, topics published since `after`); the set is empty on timeout.
+    Take the cursor before checking state, so nothing published in between is missed.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with _cond:
+        while True:
+            fired = {topic for topic in topics if _last.get(topic, 0) > after}
+            if fired:
+                return _seq, fired
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return _seq, fired
+            _cond.wait(remaining)
+
+
+# ---------------------------------------------------------------------------
+# Timers
+# ---------------------------------------------------------------------------
+
+class Timer:
+    __slots__ = ("deadline", "callback", "cancelled")
+
+    def __init__(self, deadline, callback):
+        self.deadline = deadline
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+_timers = []
+_timer_ids = itertools.count()
+_timer_cond = threading.Condition()
+_timer_thread = None
+
+
+def call_later(delay, callback):
+    """Run callback() on the timer thread in `delay` seconds; returns a Timer (cancel())"""
+    global _timer_thread
+    timer = Timer(time.monotonic() + delay, callback)
+    with _timer_cond:
+        heapq.heappush(_timers, (timer.deadline, next(_timer_ids), timer))
+        stats["timers"] += 1
+        if _timer_thread is None:
+            _timer_thread = threading.Thread(target=_run_timers, name="timers", daemon=True)
+            _timer_thread.start()
+        _timer_cond.notify()
+    return timer
+
+
+def _run_timers():
+    while True:
+        with _timer_cond:
+            while not _timers or _timers[0][0] > time.monotonic():
+                _timer_cond.wait(_timers[0][0] - time.monotonic() if _timers else None)
+            _, _, timer = heapq.heappop(_timers)
+        if timer.cancelled:
+            continue
+        try:
+            timer.callback()
+        except Exception as e:
+            print(f"[EVENTS] Timer callback failed: {type(e).__name__}: {e}")
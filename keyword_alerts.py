@@ -0,0 +1,163 @@
+"""
+Meeting AI Analyser - Keyword alerts
+Flags watched terms (customer names, "deadline", "budget", incident IDs...)
+as soon as they are spoken. The watch-list (data/watchlist.txt, one term or
+phrase per line, # for comments) is compiled into an Aho-Corasick automaton,
+and each committed line is scanned once, in time linear in its length
+whatever the number of terms.
+
+Matching ignores case and runs of whitespace, and only counts whole words:
+"budget" matches "Budget," but not "budgeting".
+
+Hits are appended to data/alerts.jsonl (one JSON object per line that had
+some, keyed by its [HH:MM:SS] timestamp), served by /api/alerts and pushed
+on the SSE stream.
+"""
+import collections
+import json
+import os
+import time
+
+import applog
+import events
+from paths import ALERTS_FILE, DATA_DIR, WATCHLIST_FILE
+
+log = applog.logger(os.path.join(DATA_DIR, "transcribe_debug.log"))
+
+
+def normalize(text):
+    return " ".join(text.lower().split())
+
+
+def _is_word(ch):
+    return ch.isalnum() or ch == "_"
+
+
+class Automaton:
+    """Aho-Corasick automaton over the normalized terms"""
+
+    def __init__(self, terms):
+        self.terms = []
+        self._keys = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        seen = set()
+        for term in terms:
+            key = normalize(term)
+            if key and key not in seen:
+                seen.add(key)
+                self._add(key, term.strip())
+        self._link()
+
+    def __len__(self):
+        return len(self.terms)
+
+    def _add(self, key, term):
+        node = 0
+        for ch in key:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = self._goto[node][ch] = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = nxt
+        self._out[node] = (len(self.terms),)
+        self.terms.append(term)
+        self._keys.append(key)
+
+    def _link(self):
+        """Failure links, breadth first; each node also outputs the terms of its fail chain"""
+        queue = collections.deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[child] = self._goto[f].get(ch, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+                queue.append(child)
+
+    def search(self, text):
+        """(start, end, term index) of every whole-word occurrence in normalized text"""
+        goto, fail, out, keys = self._goto, self._fail, self._out, self._keys
+        node = 0
+        hits = []
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for idx in out[node]:
+                key = keys[idx]
+                start = i + 1 - len(key)
+                if ((start == 0 or not (_is_word(key[0]) and _is_word(text[start - 1])))
+                        and (i + 1 == len(text) or not (_is_word(key[-1]) and _is_word(text[i + 1])))):
+                    hits.append((start, i + 1, idx))
+        return hits
+
+
+def read_watchlist(path=WATCHLIST_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+
+def write_watchlist(terms, path=WATCHLIST_FILE):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(f"{term.strip()}\n" for term in terms if term.strip()))
+
+
+class Alerter:
+    """Scans committed lines against the watch-list (reloaded when the file changes)"""
+
+    def __init__(self, watchlist=WATCHLIST_FILE, path=ALERTS_FILE):
+        self.watchlist = watchlist
+        self.path = path
+        self.automaton = Automaton([])
+        self.stats = {"terms": 0, "lines": 0, "hits": 0, "avg_us": 0.0}
+        self._mtime = None
+
+    def reset(self):
+        """New transcript: empty the hits file"""
+        open(self.path, "w", encoding="utf-8").close()
+
+    def _reload(self):
+        try:
+            mtime = os.path.getmtime(self.watchlist)
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+        t0 = time.perf_counter()
+        self.automaton = Automaton(read_watchlist(self.watchlist))
+        self.stats["terms"] = len(self.automaton)
+        log(f"Watch-list loaded: {len(self.automaton)} terms ({(time.perf_counter() - t0) * 1000:.1f} ms)")
+
+    def scan(self, timestamp, text):
+        """Watched terms said in one committed line (recorded if any)"""
+        self._reload()
+        if not len(self.automaton):
+            return []
+        t0 = time.perf_counter()
+        found = {}
+        for _, _, idx in self.automaton.search(normalize(text)):
+            term = self.automaton.terms[idx]
+            found[term] = found.get(term, 0) + 1
+        n = self.stats["lines"] = self.stats["lines"] + 1
+        elapsed = (time.perf_counter() - t0) * 1e6
+        self.stats["avg_us"] = round(self.stats["avg_us"] + (elapsed - self.stats["avg_us"]) / n, 1)
+        if not found:
+            return []
+        self.stats["hits"] += len(found)
+        hits = [{"term": term, "count": count} for term, count in found.items()]
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"time": timestamp, "at": time.time(), "hits": hits, "text": text}) + "\n")
+        events.publish("alerts", time=timestamp)
+        log(f"Alert at {timestamp}: {', '.join(found)}")
+        return hits
@@ -0,0 +1,93 @@
+"""
+Meeting AI Analyser - Automatic language detection (language "auto")
+Whisper detects the language of a segment when transcribe() gets no
+language, at the cost of extra decoding on every call. Auto mode pays it
+only when needed; other segments get the cached decision, like a fixed
+language:
+
+  - on the first segments, until a language is detected with confidence
+  - every DETECT_EVERY segments, to follow a meeting that changes language
+  - when confidence drops: LOW_CONFIDENCE_RUN segments in a row decoded
+    with an average log-probability under LOW_LOGPROB (a wrong language
+    makes every token unlikely)
+  - on every segment while a switch is pending
+
+Hysteresis: the cached language changes only when another one is detected
+SWITCH_CONFIRMATIONS times in a row with probability >= SWITCH_PROB (or once
+with >= SWITCH_INSTANT_PROB), so one ambiguous segment of a bilingual
+meeting doesn't flip it. A detection segment itself is transcribed in the
+language Whisper detected.
+"""
+AUTO = "auto"
+
+DETECT_EVERY = 12
+LOW_LOGPROB = -1.0
+LOW_CONFIDENCE_RUN = 2
+# First decision: adopt a detection this sure, or the best after FIRST_ATTEMPTS
+FIRST_PROB = 0.5
+FIRST_ATTEMPTS = 3
+SWITCH_PROB = 0.7
+SWITCH_INSTANT_PROB = 0.95
+SWITCH_CONFIRMATIONS = 2
+
+
+class LanguageTracker:
+    """Cached language decision of one audio stream (one transcription at a time)"""
+
+    def __init__(self):
+        self.language = None
+        self.probability = 0.0
+        self.candidate = None
+        self.candidate_hits = 0
+        self.since_detection = 0
+        self.low_run = 0
+        self.stats = {"segments": 0, "detections": 0, "switches": 0}
+        self._first = []
+
+    def next_language(self):
+        """Language for the next transcribe() call; None lets Whisper detect it"""
+        if (self.language is None or self.candidate is not None
+                or self.since_detection >= DETECT_EVERY or self.low_run >= LOW_CONFIDENCE_RUN):
+            return None
+        return self.language
+
+    def observe(self, language, info, segments):
+        """Account for a finished transcribe(language=...) call and its decoded segments"""
+        self.stats["segments"] += 1
+        if language is None and info is not None:
+            self._detected(info.language, info.language_probability)
+        else:
+            self.since_detection += 1
+        logprobs = [s.avg_logprob for s in segments if getattr(s, "avg_logprob", None) is not None]
+        if logprobs:
+            low = sum(logprobs) / len(logprobs) < LOW_LOGPROB
+            self.low_run = self.low_run + 1 if low else 0
+
+    def _detected(self, language, probability):
+        self.stats["detections"] += 1
+        self.since_detection = 0
+        self.low_run = 0
+        if self.language is None:
+            self._first.append((probability, language))
+            if probability >= FIRST_PROB or len(self._first) >= FIRST_ATTEMPTS:
+                self.probability, self.language = max(self._first)
+                self._first = []
+            return
+        if language == self.language:
+            self.probability = probability
+            self.candidate, self.candidate_hits = None, 0
+            return
+        if probability < SWITCH_PROB:
+            # Ambiguous: keep the current language
+            self.candidate, self.candidate_hits = None, 0
+            return
+        self.candidate_hits = self.candidate_hits + 1 if language == self.candidate else 1
+        self.candidate = language
+        if probability >= SWITCH_INSTANT_PROB or self.candidate_hits >= SWITCH_CONFIRMATIONS:
+            self.language, self.probability = language, probability
+            self.candidate, self.candidate_hits = None, 0
+            self.stats["switches"] += 1
+
+    def status(self):
+        return {"language": self.language, "probability": round(self.probability, 2),
+                "pending": self.candidate, **self.stats}
@@ -38,7 +38,14 @@ if os.path.isdir(_nvidia_path):
     os.add_dll_directory(_nvidia_path)
 
 import numpy as np
-import pyaudiowpatch as pyaudio
+
+import applog
+import audio_mixer
+import events
+import language_detect
+import tracing
+import transcript_store
+from tracing import span
 
 # Output files
 from paths import TRANSCRIPTION_FILE as OUTPUT_FILE, TRANSCRIPTION_LATEST as OUTPUT_LATEST, AUDIO_TEMP, APP_DIR, DATA_DIR
@@ -47,13 +54,13 @@ from paths import TRANSCRIPTION_FILE as OUTPUT_FILE, TRANSCRIPTION_LATEST as OUT
 DEFAULT_SEGMENT_DURATION = 10
 SAMPLE_RATE = 16000
 SILENCE_THRESHOLD = 0.001
+# Longest the capture loop waits for a segment before checking for stop (s)
+CAPTURE_STOP_CHECK = 1.0
 
 # Debug log for exe mode
 _TRANSCRIBE_LOG = os.path.join(DATA_DIR, "transcribe_debug.log")
 
-def _tlog(msg):
-    with open(_TRANSCRIBE_LOG, "a", encoding="utf-8") as f:
-        f.write(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] {msg}\n")
+_tlog = applog.logger(_TRANSCRIBE_LOG)
 
 # Stop flag (threading.Event for module mode, global for standalone)
 _stop_event = None
@@ -68,6 +75,16 @@ audio_levels = {"loopback": 0.0, "mic": 0.0}
 # Active language (mutable, exposed for server.py)
 active_language = "en"
 
+# Diarizer of the running transcription (in-process mode), reset with the transcript
+active_diarizer = None
+
+# Language decision in "auto" mode (language_detect.LanguageTracker), created on first use
+language_tracker = None
+
+# How the loaded model runs (CPU: from the autotune.py profile when there is one)
+inference_settings = {"device": "", "compute_type": "", "cpu_threads": 0, "num_workers": 1,
+                      "beam_size": 5, "profile": False}
+
 
 def signal_handler(sig, frame):
     global running
@@ -79,6 +96,8 @@ def signal_handler(sig, frame):
 
 def list_devices():
     """List audio devices"""
+    import pyaudiowpatch as pyaudio
+
     p = pyaudio.PyAudio()
     print("\n=== Audio Devices ===\n")
     for i in range(p.get_device_count()):
@@ -147,12 +166,100 @@ def find_mic_device(p, mic_device_id=None):
     return None
 
 
+def _device_settings(dev):
+    return {
+        "index": int(dev["index"]),
+        "name": dev["name"],
+        "channels": int(dev["maxInputChannels"]),
+        "rate": int(dev["defaultSampleRate"]),
+    }
+
+
+def select_devices(p, mic_device=None, no_mic=False):
+    """{"loopback": settings, "mic": settings or None}, None without a loopback device.
+
+    Settings are plain dicts ({"index", "name", "channels", "rate"}) so they
+    can be handed to the transcription worker process.
+    """
+    global active_mic_id
+    loopback_dev = find_wasapi_loopback(p)
+    if loopback_dev is None:
+        print("[ERROR] No WASAPI loopback device found.")
+        return None
+
+    devices = {"loopback": _device_settings(loopback_dev), "mic": None}
+    if not no_mic:
+        mic_dev = find_mic_device(p, mic_device)
+        if mic_dev is None:
+            print("[WARN] No microphone found, loopback only mode.")
+        else:
+            devices["mic"] = _device_settings(mic_dev)
+            active_mic_id = devices["mic"]["index"]
+    return devices
+
+
+def mic_format(mic):
+    """(channels, sample rate) of the mic settings, defaults when disabled"""
+    return (mic["channels"], mic["rate"]) if mic else (1, 48000)
+
+
+def print_config(devices, segment, model_size, language):
+    lb, mic = devices["loopback"], devices["mic"]
+    print(f"\n[CONFIG] Loopback: {lb['name']} ({lb['channels']}ch, {lb['rate']}Hz)")
+    if mic:
+        print(f"[CONFIG] Mic:      {mic['name']} ({mic['channels']}ch, {mic['rate']}Hz)")
+    else:
+        print(f"[CONFIG] Mic:      disabled")
+    print(f"[CONFIG] Segments: {segment}s")
+    print(f"[CONFIG] Model: {model_size}, Language: {language}")
+    print(f"[CONFIG] Output: {OUTPUT_FILE}")
+
+
+def open_capture(p, source, settings, on_data, clock=None):
+    """Open and start a callback stream; on_data(bytes) runs on PyAudio's thread.
+
+    Also keeps audio_levels[source] up to date, and ticks clock
+    (audio_mixer.CaptureClock) with the frames delivered.
+    """
+    import pyaudiowpatch as pyaudio
+
+    def callback(in_data, frame_count, time_info, status):
+        if clock:
+            clock.tick(frame_count)
+        on_data(in_data)
+        a = np.frombuffer(in_data, dtype=np.int16).astype(np.float32) / 32768.0
+        audio_levels[source] = float(np.sqrt(np.mean(a ** 2)))
+        return (in_data, pyaudio.paContinue)
+
+    stream = p.open(
+        format=pyaudio.paInt16,
+        channels=settings["channels"],
+        rate=settings["rate"],
+        input=True,
+        input_device_index=settings["index"],
+        frames_per_buffer=int(settings["rate"] * 0.5),
+        stream_callback=callback,
+    )
+    if clock:
+        clock.latency = stream.get_input_latency()
+    stream.start_stream()
+    return stream
+
+
 def is_silence(audio_data, threshold=SILENCE_THRESHOLD):
     rms = np.sqrt(np.mean(audio_data ** 2))
     return rms < threshold
 
 
-def load_whisper_model(model_size="small"):
+def load_whisper_model(model_size="small", num_workers=1, cpu_profile=True):
+    """WhisperModel on GPU, else CPU; None if both fail.
+
+    num_workers > 1 lets that many threads call transcribe() in parallel on
+    the one loaded model (multi-session mode); None takes it from the CPU
+    profile (1 on GPU or without one). On CPU, the profile saved by
+    autotune.py for this machine and model sets the compute type, threads
+    and beam size.
+    """
     _tlog(f"Loading Whisper model '{model_size}'...")
     print(f"[INIT] Loading Whisper model '{model_size}'...")
     print("[INIT] (First launch = model download, please wait...)")
@@ -160,56 +267,108 @@ def load_whisper_model(model_size="small"):
     from faster_whisper import WhisperModel
 
     try:
-        model = WhisperModel(model_size, device="cuda", compute_type="float16")
+        model = WhisperModel(model_size, device="cuda", compute_type="float16", num_workers=num_workers or 1)
+        inference_settings.update(device="cuda", compute_type="float16", cpu_threads=0,
+                                  num_workers=num_workers or 1, beam_size=5, profile=False)
         _tlog("Model loaded on GPU (CUDA)")
         print("[INIT] Model loaded on GPU (CUDA)")
     except Exception as e1:
-        _tlog(f"CUDA failed: {e1}")
+        _tlog.warning(f"CUDA failed: {e1}")
+        settings = {"compute_type": "int8", "cpu_threads": 0, "num_workers": num_workers or 1, "beam_size": 5}
+        profile = None
+        if cpu_profile:
+            import autotune
+            profile = autotune.load_profile(model_size)
+        if profile:
+            workers = num_workers or profile["num_workers"]
+            settings.update(compute_type=profile["compute_type"], num_workers=workers,
+                            cpu_threads=autotune.threads_for(profile, workers), beam_size=profile["beam_size"])
         try:
-            model = WhisperModel(model_size, device="cpu", compute_type="int8")
-            _tlog("Model loaded on CPU (int8)")
-            print("[INIT] Model loaded on CPU (int8)")
+            model = WhisperModel(model_size, device="cpu", compute_type=settings["compute_type"],
+                                 cpu_threads=settings["cpu_threads"], num_workers=settings["num_workers"])
+            inference_settings.update(device="cpu", profile=bool(profile), **settings)
+            detail = settings["compute_type"]
+            if profile:
+                detail += f", {settings['cpu_threads']} threads, beam {settings['beam_size']}, tuned profile"
+            _tlog(f"Model loaded on CPU ({detail})")
+            print(f"[INIT] Model loaded on CPU ({detail})")
         except Exception as e2:
-            _tlog(f"CPU also failed: {e2}")
+            _tlog.error(f"CPU also failed: {e2}")
             print(f"[ERROR] Failed to load model: {e2}")
             return None
 
     return model
 
 
-def transcribe_segment(model, audio_data, sample_rate, language="en"):
-    """Transcribe a mono audio segment"""
+def transcribe_segment(model, audio_data, sample_rate, language="en", wav_path=AUDIO_TEMP, tracker=None):
+    """Transcribe a mono audio segment.
+
+    wav_path=None passes the samples to the model directly (16 kHz only),
+    for concurrent callers that can't share the temp file. The beam size
+    comes from inference_settings (5 unless a CPU profile says otherwise).
+    language "auto" uses the tracker's cached decision (language_detect.py;
+    default: this process's language_tracker).
+    """
     if is_silence(audio_data):
         return None
 
-    audio_int16 = (audio_data * 32767).astype(np.int16)
-    with wave.open(AUDIO_TEMP, "wb") as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(sample_rate)
-        wf.writeframes(audio_int16.tobytes())
+    if language == language_detect.AUTO:
+        tracker = tracker or _default_tracker()
+        language = tracker.next_language()
+    else:
+        tracker = None
+
+    source = audio_data
+    if wav_path:
+        with span("wav_write", cat="transcribe"):
+            audio_int16 = (audio_data * 32767).astype(np.int16)
+            with wave.open(wav_path, "wb") as wf:
+                wf.setnchannels(1)
+                wf.setsampwidth(2)
+                wf.setframerate(sample_rate)
+                wf.writeframes(audio_int16.tobytes())
+        source = wav_path
 
     try:
-        _tlog(f"Transcribing {AUDIO_TEMP} (lang={language})...")
-        segments, info = model.transcribe(
-            AUDIO_TEMP,
-            language=language,
-            beam_size=5,
-            vad_filter=True,
-            vad_parameters=dict(
-                min_silence_duration_ms=500,
-                speech_pad_ms=300,
-            ),
-        )
-        text = " ".join([s.text.strip() for s in segments])
-        _tlog(f"Result: '{text[:80]}...' " if len(text) > 80 else f"Result: '{text}'")
+        _tlog.debug(f"Transcribing {wav_path or 'samples'} (lang={language or 'detect'})...")
+        # Segments are decoded lazily: the span covers the join below
+        with span("model.transcribe", cat="transcribe", language=language or "detect"):
+            segments, info = model.transcribe(
+                source,
+                language=language,
+                beam_size=inference_settings["beam_size"],
+                vad_filter=True,
+                vad_parameters=dict(
+                    min_silence_duration_ms=500,
+                    speech_pad_ms=300,
+                ),
+            )
+            segments = list(segments)
+            text = " ".join([s.text.strip() for s in segments])
+        if tracker:
+            previous = tracker.language
+            tracker.observe(language, info, segments)
+            if language is None:
+                _tlog.debug(f"Language detected: {info.language} ({info.language_probability:.2f})"
+                            if info else "Language detection: no result")
+            if tracker.language != previous:
+                _tlog(f"Language: {previous or '-'} -> {tracker.language}")
+                print(f"[LANG] Auto: {tracker.language} ({tracker.probability:.0%})")
+        _tlog.debug(f"Result: '{text[:80]}...' " if len(text) > 80 else f"Result: '{text}'")
         return text if text.strip() else None
     except Exception as e:
-        _tlog(f"TRANSCRIBE ERROR: {e}")
+        _tlog.error(f"Transcription failed: {e}")
         print(f"[ERROR] Transcription: {e}")
         return None
 
 
+def _default_tracker():
+    global language_tracker
+    if language_tracker is None:
+        language_tracker = language_detect.LanguageTracker()
+    return language_tracker
+
+
 def deduplicate(new_text, prev_text, min_overlap=5):
     """Remove beginning of new text if it repeats end of previous"""
     if not prev_text or not new_text:
@@ -248,20 +407,168 @@ def to_mono_16k(raw_data, channels, source_sr):
     return audio_np
 
 
+def segment_thresholds(source_sr, segment=DEFAULT_SEGMENT_DURATION):
+    """Samples needed before cutting a segment: (first segment, following ones)"""
+    samples_per_segment = segment * source_sr
+    first_segment_samples = min(3 * source_sr, samples_per_segment)
+    return first_segment_samples, samples_per_segment
+
+
+def mix_sources(mixer, lb_mono, mic_mono, lb_frames, mic_frames):
+    """Mix loopback + mic (mono 16kHz float32) into a single signal.
+
+    mixer (audio_mixer.Mixer) aligns the mic on the loopback and carries
+    what isn't mixed yet to the next segment; the result is in its buffer.
+    """
+    return mixer.mix(lb_mono, mic_mono, lb_frames, mic_frames)
+
+
+def init_output():
+    """Start a fresh live transcription file"""
+    transcript_store.clear()
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        f.write(f"=== Live Transcription - {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===\n\n")
+    events.publish("transcript", reset=True)
+
+
+def append_line(timestamp, text):
+    """Append a committed segment to the live transcription files"""
+    line = f"[{timestamp}] {text}"
+    transcript_store.maybe_rollover(OUTPUT_FILE)
+    with open(OUTPUT_FILE, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+    with open(OUTPUT_LATEST, "w", encoding="utf-8") as f:
+        f.write(text)
+    events.publish("transcript", time=timestamp)
+
+
+def make_mixer(devices, clocks=None):
+    """Mixer for the selected devices (audio_mixer.py), None without a mic.
+
+    clocks: {"loopback": CaptureClock, "mic": CaptureClock} ticked by the
+    capture callbacks; without them, the chunks are assumed to end together.
+    """
+    if not devices["mic"]:
+        return None
+    return audio_mixer.Mixer(devices["loopback"]["rate"], devices["mic"]["rate"], clocks, rate=SAMPLE_RATE)
+
+
+def process_segment(model, segment_count, lb_raw, lb_channels, lb_sr,
+                    mic_raw=None, mic_channels=1, mic_sr=48000, prev_text="", language="en",
+                    diarizer=None, alerter=None, mixer=None):
+    """Convert, mix, transcribe and commit one captured segment.
+
+    A mixer (audio_mixer.Mixer) keeps the mic aligned across segments: it
+    may carry the end of this segment's loopback over to the next one. A
+    diarizer (diarization.Diarizer) gets the committed segment's audio
+    after the line is written; an alerter (keyword_alerts.Alerter) scans its
+    text for watched terms. Returns (committed text or None, new prev_text).
+    """
+    # Convert to mono 16kHz
+    with span("to_mono_16k", cat="transcribe", source="loopback"):
+        lb_mono = to_mono_16k(lb_raw, lb_channels, lb_sr)
+    mic_mono = None
+    if mic_raw:
+        with span("to_mono_16k", cat="transcribe", source="mic"):
+            mic_mono = to_mono_16k(mic_raw, mic_channels, mic_sr)
+        if mixer is None:
+            # No state to carry: mix this segment as a whole
+            mixer = audio_mixer.Mixer(lb_sr, mic_sr, rate=SAMPLE_RATE, hold=0)
+
+    if mixer:
+        with span("mix", cat="transcribe"):
+            audio_final = mix_sources(mixer, lb_mono, mic_mono, len(lb_raw) // (2 * lb_channels),
+                                      len(mic_raw or b"") // (2 * mic_channels))
+        lb_mono, mic_mono = mixer.loopback, mixer.mic
+
+        # Debug: show levels
+        lb_rms = np.sqrt(np.mean(lb_mono ** 2))
+        mic_rms = np.sqrt(np.mean(mic_mono ** 2))
+        print(f"[levels: loopback={lb_rms:.4f}, mic={mic_rms:.4f}] ", end="", flush=True)
+    else:
+        audio_final = lb_mono
+
+    timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+    print(f"[{timestamp}] Segment #{segment_count}...", end=" ", flush=True)
+
+    with span("transcribe_segment", cat="transcribe", segment=segment_count):
+        raw_text = transcribe_segment(model, audio_final, SAMPLE_RATE, language)
+
+    if not raw_text:
+        print("(silence)")
+        return None, prev_text
+
+    text = deduplicate(raw_text, prev_text)
+    if not text.strip():
+        print("(duplicate)")
+        return None, raw_text
+
+    print(f"\n  >> {text}")
+    with span("append", cat="transcribe"):
+        append_line(timestamp, text)
+    if alerter:
+        with span("alerts", cat="transcribe"):
+            hits = alerter.scan(timestamp, text)
+        if hits:
+            print(f"  [ALERT] {', '.join(h['term'] for h in hits)}")
+    if diarizer:
+        if mixer:
+            # The mixer's buffers are reused by the next segment
+            lb_mono, mic_mono = lb_mono.copy(), mic_mono.copy()
+        diarizer.submit(timestamp, lb_mono, mic_mono)
+    return text, raw_text
+
+
 def start(stop_event, mic_device=None, segment=DEFAULT_SEGMENT_DURATION,
-          model_size="small", language="en", no_mic=False):
+          model_size="small", language="en", no_mic=False, diarize=False):
     """Entry point for module mode (called from main.py as thread)"""
     global _stop_event, running
     _stop_event = stop_event
     running = True
     _run(stop_event=stop_event, mic_device=mic_device, segment=segment,
-         model_size=model_size, language=language, no_mic=no_mic)
+         model_size=model_size, language=language, no_mic=no_mic, diarize=diarize)
+
+
+def reset_speakers():
+    """Transcript cleared (/api/reset): the running diarizer forgets its speakers"""
+    if active_diarizer:
+        active_diarizer.reset()
+
+
+def make_diarizer(reset=True):
+    """Speaker diarization for the live transcript (diarization.py), None if unavailable.
+
+    reset empties the speaker sidecar (a new transcript file was started).
+    """
+    try:
+        import diarization
+        diarizer = diarization.Diarizer()
+    except Exception as e:
+        print(f"[WARN] Diarization disabled: {e}")
+        return None
+    if reset:
+        diarizer.reset()
+    print(f"[INIT] Diarization: {diarizer.embedder.name} embeddings")
+    return diarizer
+
+
+def make_alerter(reset=True):
+    """Keyword alerts on committed lines (keyword_alerts.py; data/watchlist.txt).
+
+    reset empties the hits file (a new transcript file was started).
+    """
+    import keyword_alerts
+    alerter = keyword_alerts.Alerter()
+    if reset:
+        alerter.reset()
+    return alerter
 
 
 def _run(stop_event=None, mic_device=None, segment=DEFAULT_SEGMENT_DURATION,
-         model_size="small", language="en", no_mic=False):
+         model_size="small", language="en", no_mic=False, diarize=False):
     """Main transcription logic"""
-    global running, active_language
+    global running, active_language, active_diarizer
     active_language = language
 
     def is_running():
@@ -269,46 +576,19 @@ def _run(stop_event=None, mic_device=None, segment=DEFAULT_SEGMENT_DURATION,
             return False
         return running
 
+    # Imported here: only capture needs it (Windows-only, slow to import)
+    import pyaudiowpatch as pyaudio
+
     p = pyaudio.PyAudio()
 
-    # === Loopback device (system audio) ===
-    loopback_dev = find_wasapi_loopback(p)
-    if loopback_dev is None:
-        print("[ERROR] No WASAPI loopback device found.")
+    devices = select_devices(p, mic_device, no_mic)
+    if devices is None:
         p.terminate()
         return
+    lb, mic = devices["loopback"], devices["mic"]
+    use_mic = mic is not None
 
-    lb_channels = int(loopback_dev["maxInputChannels"])
-    lb_sr = int(loopback_dev["defaultSampleRate"])
-    lb_index = int(loopback_dev["index"])
-
-    # === Microphone device ===
-    mic_dev = None
-    mic_channels = 1
-    mic_sr = 48000
-    mic_index = None
-    use_mic = not no_mic
-
-    if use_mic:
-        mic_dev = find_mic_device(p, mic_device)
-        if mic_dev is None:
-            print("[WARN] No microphone found, loopback only mode.")
-            use_mic = False
-        else:
-            mic_channels = int(mic_dev["maxInputChannels"])
-            mic_sr = int(mic_dev["defaultSampleRate"])
-            mic_index = int(mic_dev["index"])
-            global active_mic_id
-            active_mic_id = mic_index
-
-    print(f"\n[CONFIG] Loopback: {loopback_dev['name']} ({lb_channels}ch, {lb_sr}Hz)")
-    if use_mic:
-        print(f"[CONFIG] Mic:      {mic_dev['name']} ({mic_channels}ch, {mic_sr}Hz)")
-    else:
-        print(f"[CONFIG] Mic:      disabled")
-    print(f"[CONFIG] Segments: {segment}s")
-    print(f"[CONFIG] Model: {model_size}, Language: {language}")
-    print(f"[CONFIG] Output: {OUTPUT_FILE}")
+    print_config(devices, segment, model_size, language)
 
     # Load Whisper
     model = load_whisper_model(model_size)
@@ -316,9 +596,9 @@ def _run(stop_event=None, mic_device=None, segment=DEFAULT_SEGMENT_DURATION,
         p.terminate()
         return
 
-    # Init output file
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        f.write(f"=== Live Transcription - {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===\n\n")
+    init_output()
+    diarizer = active_diarizer = make_diarizer() if diarize else None
+    alerter = make_alerter()
 
     print("\n" + "=" * 60)
     print("  TRANSCRIPTION RUNNING - Ctrl+C to stop")
@@ -328,74 +608,53 @@ def _run(stop_event=None, mic_device=None, segment=DEFAULT_SEGMENT_DURATION,
         print("  Source: system audio only")
     print("=" * 60 + "\n")
 
-    # Thread-safe buffers
+    lb_channels, lb_sr = lb["channels"], lb["rate"]
+    first_segment_samples, samples_per_segment = segment_thresholds(lb_sr, segment)
+    clocks = {source: audio_mixer.CaptureClock(settings["rate"]) for source, settings in devices.items() if settings}
+    mixer = make_mixer(devices, clocks)
+
+    # Thread-safe buffers; the loopback callback wakes the loop once a segment is complete
     loopback_lock = threading.Lock()
     mic_lock = threading.Lock()
     loopback_frames = []
+    loopback_bytes = [0]
+    threshold_bytes = [first_segment_samples * 2 * lb_channels]
+    segment_ready = threading.Event()
     mic_frames = []
 
-    def loopback_callback(in_data, frame_count, time_info, status):
+    def on_loopback(in_data):
         with loopback_lock:
             loopback_frames.append(in_data)
-        a = np.frombuffer(in_data, dtype=np.int16).astype(np.float32) / 32768.0
-        audio_levels["loopback"] = float(np.sqrt(np.mean(a ** 2)))
-        return (in_data, pyaudio.paContinue)
+            loopback_bytes[0] += len(in_data)
+            if loopback_bytes[0] >= threshold_bytes[0]:
+                segment_ready.set()
 
-    def mic_callback(in_data, frame_count, time_info, status):
+    def on_mic(in_data):
         with mic_lock:
             mic_frames.append(in_data)
-        a = np.frombuffer(in_data, dtype=np.int16).astype(np.float32) / 32768.0
-        audio_levels["mic"] = float(np.sqrt(np.mean(a ** 2)))
-        return (in_data, pyaudio.paContinue)
 
-    samples_per_segment = segment * lb_sr
-    first_segment_samples = min(3 * lb_sr, samples_per_segment)
     segment_count = 0
     prev_text = ""
+    wait_start = time.perf_counter()
 
     try:
-        # Open loopback stream
-        stream_lb = p.open(
-            format=pyaudio.paInt16,
-            channels=lb_channels,
-            rate=lb_sr,
-            input=True,
-            input_device_index=lb_index,
-            frames_per_buffer=int(lb_sr * 0.5),
-            stream_callback=loopback_callback,
-        )
-        stream_lb.start_stream()
-
-        # Open mic stream
-        stream_mic = None
-        if use_mic:
-            stream_mic = p.open(
-                format=pyaudio.paInt16,
-                channels=mic_channels,
-                rate=mic_sr,
-                input=True,
-                input_device_index=mic_index,
-                frames_per_buffer=int(mic_sr * 0.5),
-                stream_callback=mic_callback,
-            )
-            stream_mic.start_stream()
+        stream_lb = open_capture(p, "loopback", lb, on_loopback, clocks["loopback"])
+        stream_mic = open_capture(p, "mic", mic, on_mic, clocks["mic"]) if use_mic else None
 
         while is_running() and stream_lb.is_active():
-            time.sleep(0.5)
-
-            # Check if we have enough loopback samples
-            with loopback_lock:
-                total_bytes = sum(len(f) for f in loopback_frames)
-            total_samples = total_bytes // (2 * lb_channels)
-
-            threshold = first_segment_samples if segment_count == 0 else samples_per_segment
-            if total_samples >= threshold:
+            # Woken by the capture callback; the timeout only checks for stop
+            if segment_ready.wait(CAPTURE_STOP_CHECK):
                 segment_count += 1
+                tracing.add("wait_segment", wait_start, time.perf_counter(), cat="transcribe",
+                            segment=segment_count)
 
                 # Collect loopback frames
                 with loopback_lock:
                     lb_raw = b"".join(loopback_frames)
                     loopback_frames.clear()
+                    loopback_bytes[0] = 0
+                    threshold_bytes[0] = samples_per_segment * 2 * lb_channels
+                    segment_ready.clear()
 
                 # Collect mic frames
                 mic_raw = None
@@ -404,57 +663,12 @@ def _run(stop_event=None, mic_device=None, segment=DEFAULT_SEGMENT_DURATION,
                         mic_raw = b"".join(mic_frames)
                         mic_frames.clear()
 
-                # Convert to mono 16kHz
-                lb_mono = to_mono_16k(lb_raw, lb_channels, lb_sr)
-
-                if use_mic and mic_raw and len(mic_raw) > 0:
-                    mic_mono = to_mono_16k(mic_raw, mic_channels, mic_sr)
-
-                    # Debug: show levels
-                    lb_rms = np.sqrt(np.mean(lb_mono ** 2))
-                    mic_rms = np.sqrt(np.mean(mic_mono ** 2))
-                    print(f"[levels: loopback={lb_rms:.4f}, mic={mic_rms:.4f}] ", end="", flush=True)
-
-                    # Align sizes (take shortest)
-                    min_len = min(len(lb_mono), len(mic_mono))
-                    lb_mono = lb_mono[:min_len]
-                    mic_mono = mic_mono[:min_len]
-
-                    # Mix: add both sources
-                    mixed = lb_mono + mic_mono
-
-                    # Normalize to prevent clipping
-                    peak = np.max(np.abs(mixed))
-                    if peak > 0.95:
-                        mixed = mixed * (0.95 / peak)
-
-                    audio_final = mixed
-                else:
-                    audio_final = lb_mono
-
-                timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-                print(f"[{timestamp}] Segment #{segment_count}...", end=" ", flush=True)
-
-                raw_text = transcribe_segment(model, audio_final, SAMPLE_RATE, active_language)
-
-                if raw_text:
-                    text = deduplicate(raw_text, prev_text)
-                    prev_text = raw_text
-
-                    if not text.strip():
-                        print("(duplicate)")
-                        continue
-
-                    line = f"[{timestamp}] {text}"
-                    print(f"\n  >> {text}")
-
-                    with open(OUTPUT_FILE, "a", encoding="utf-8") as f:
-                        f.write(line + "\n")
-
-                    with open(OUTPUT_LATEST, "w", encoding="utf-8") as f:
-                        f.write(text)
-                else:
-                    print("(silence)")
+                with span("segment", cat="transcribe", segment=segment_count):
+                    text, prev_text = process_segment(
+                        model, segment_count, lb_raw, lb_channels, lb_sr,
+                        mic_raw, *mic_format(mic), prev_text, active_language, diarizer, alerter, mixer,
+                    )
+                wait_start = time.perf_counter()
 
         stream_lb.stop_stream()
         stream_lb.close()
@@ -486,15 +700,25 @@ def main():
     parser.add_argument("--segment", type=int, default=DEFAULT_SEGMENT_DURATION)
     parser.add_argument("--model", type=str, default="small",
                         help="tiny, base, small, medium, large-v3")
-    parser.add_argument("--language", type=str, default="fr")
+    parser.add_argument("--language", type=str, default="fr", help="Language code, or auto")
+    parser.add_argument("--diarize", action="store_true",
+                        help="Label transcript lines with speakers (data/transcription_speakers.jsonl)")
+    parser.add_argument("--trace", type=str, default=None, metavar="FILE",
+                        help="Record stage spans and write a Chrome trace JSON on exit")
     args = parser.parse_args()
 
     if args.list_devices:
         list_devices()
         return
 
+    if args.trace:
+        tracing.enable()
+
     _run(mic_device=args.mic_device, segment=args.segment,
-         model_size=args.model, language=args.language, no_mic=args.no_mic)
+         model_size=args.model, language=args.language, no_mic=args.no_mic, diarize=args.diarize)
+
+    if args.trace:
+        print(f"[DONE] Trace written to: {tracing.dump(args.trace)}")
 
 
 if __name__ == "__main__":
@@ -1,20 +1,28 @@
 """
 Meeting AI Analyser - Single entry point
-Launches transcription + Claude analysis + web server in threads
+Launches the web server + Claude analysis in threads and the transcription
+engine in a worker process
 """
 import argparse
 import multiprocessing
 import os
 import signal
+import socket
 import sys
 import threading
 import time
 import traceback
 import webbrowser
 
+import applog
+import events
+import startup
+import tracing
 from paths import DATA_DIR
 
 CRASH_LOG = os.path.join(DATA_DIR, "crash.log")
+# Re-check interval of the files when no event arrives (events.py)
+EVENTS_FALLBACK = 30
 
 
 def _log_crash(module, error):
@@ -30,9 +38,56 @@ app_status = {
     "analysis": False,
     "ready": False,
     "message": "Starting...",
+    "startup": startup.milestones,
 }
 
 
+def _open_browser_when_listening(port, timeout=10):
+    """Open the UI as soon as the server accepts connections (off the startup path)"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    webbrowser.open(f"http://localhost:{port}")
+
+
+def run_headless(args, stop_event):
+    """Multi-session mode: shared model + inference scheduler behind the web server"""
+    import meeting_sessions
+    import server
+
+    app_status["message"] = "Loading Whisper model..."
+    server.app_status = app_status
+    manager = meeting_sessions.init(args.model, workers=args.inference_workers)
+    if manager is None:
+        print("[MAIN] Whisper model failed to load")
+        sys.exit(1)
+    threading.Thread(
+        target=server.start,
+        args=(stop_event, args.port, args.host, False),
+        name="server",
+        daemon=True,
+    ).start()
+    app_status.update(server=True, whisper=True, ready=True, message="Ready (headless)")
+    startup.mark("ready")
+    print(f"[MAIN] Headless: model {args.model}, {manager.scheduler.workers} inference worker(s), "
+          f"sessions on http://{args.host}:{args.port}/api/sessions")
+
+    while not stop_event.wait(1):
+        pass
+    print("[MAIN] Closing...")
+    for session_id in list(manager.sessions):
+        manager.close(session_id)
+    manager.scheduler.drain()
+    if args.trace:
+        print(f"[MAIN] Trace written to {tracing.dump(args.trace)}")
+    applog.shutdown()
+    os._exit(0)
+
+
 def main():
     multiprocessing.freeze_support()
 
@@ -41,21 +96,105 @@ def main():
     parser.add_argument("--mic-device", type=int, default=None, help="Microphone ID")
     parser.add_argument("--model", type=str, default="small",
                         help="Whisper model: tiny, base, small, medium, large-v3")
-    parser.add_argument("--language", type=str, default="en", help="Language code")
+    parser.add_argument("--language", type=str, default="en",
+                        help="Language code, or auto to detect it (cached, re-checked periodically)")
     parser.add_argument("--segment", type=int, default=10, help="Segment duration (seconds)")
     parser.add_argument("--no-mic", action="store_true", help="Disable microphone")
     parser.add_argument("--no-analysis", action="store_true", help="Disable Claude analysis")
     parser.add_argument("--no-browser", action="store_true", help="Don't open browser")
+    parser.add_argument("--analysis-mode", choices=["incremental", "mapreduce", "lenses", "full"],
+                        default="incremental",
+                        help="incremental: new transcript + previous analysis; mapreduce: cached "
+                             "chunk summaries + reduce; lenses: one concurrent call per section; "
+                             "full: whole transcript every run")
+    parser.add_argument("--lenses", type=str, default=None,
+                        help="Lens mode: comma-separated lenses (summary, decisions, questions, actions, "
+                             "risks, technical)")
+    parser.add_argument("--consolidate-every", type=int, default=10,
+                        help="Incremental mode: re-consolidate every N runs")
+    parser.add_argument("--chunk-minutes", type=int, default=5, help="Map-reduce chunk length (minutes)")
+    parser.add_argument("--analysis-workers", type=int, default=3, help="Map-reduce/lens parallel calls")
+    parser.add_argument("--analysis-interval", type=int, default=60,
+                        help="Longest wait before analyzing new content (seconds)")
+    parser.add_argument("--analysis-min-words", type=int, default=80,
+                        help="Analyze as soon as this many new words were transcribed")
+    parser.add_argument("--analysis-silence", type=int, default=10,
+                        help="Analyze after this many seconds of silence following new speech")
+    parser.add_argument("--analysis-min-interval", type=int, default=20,
+                        help="Minimum gap between analyses (grows with measured analysis time)")
+    parser.add_argument("--no-stream-analysis", action="store_true",
+                        help="Wait for the complete analysis instead of streaming it to the UI")
+    parser.add_argument("--no-compress-transcript", action="store_true",
+                        help="Send the raw transcript to Claude (no filler/repeat removal, full timestamps)")
+    parser.add_argument("--analysis-token-budget", type=int, default=0,
+                        help="Max transcript tokens per prompt, 0 = no limit")
+    parser.add_argument("--analysis-truncate", choices=["head_tail", "tail"], default="head_tail",
+                        help="What to keep over the token budget: opening + most recent, or most recent only")
+    parser.add_argument("--backend", choices=["cli", "http"], default="cli",
+                        help="Analysis backend: cli runs claude --print per analysis, "
+                             "http calls the API directly over kept-alive connections (ANTHROPIC_API_KEY)")
+    parser.add_argument("--backend-url", type=str, default=None,
+                        help="HTTP backend base URL (e.g. http://127.0.0.1:8765 for bench/stub_server.py)")
+    parser.add_argument("--backend-model", type=str, default=None, help="HTTP backend model")
+    parser.add_argument("--diarize", action="store_true",
+                        help="Label transcript lines with speakers (Me / Speaker N), computed in the background")
+    parser.add_argument("--long-session", action="store_true",
+                        help="All-day meetings: archive the transcript in parts and serve/analyze a recent window, "
+                             "so memory and request cost stay flat")
+    parser.add_argument("--rollover-kb", type=int, default=256,
+                        help="Long-session mode: archive the live transcript once it reaches this size (KB)")
+    parser.add_argument("--window-chars", type=int, default=48 * 1024,
+                        help="Long-session mode: transcript characters served and analyzed")
+    parser.add_argument("--headless", action="store_true",
+                        help="Multi-session server: no local capture, analysis or browser; meetings are "
+                             "created and fed through /api/sessions and share one Whisper model")
+    parser.add_argument("--host", type=str, default="127.0.0.1",
+                        help="Web server address (0.0.0.0 to accept remote clients, which only get /api/sessions)")
+    parser.add_argument("--inference-workers", type=int, default=None,
+                        help="Headless mode: concurrent transcriptions on the shared model "
+                             "(default: from the CPU profile, else 1)")
+    parser.add_argument("--transcribe-in-process", action="store_true",
+                        help="Run transcription in a thread of this process instead of a worker process")
+    parser.add_argument("--trace", type=str, default=None, metavar="FILE",
+                        help="Record stage spans and write a Chrome trace JSON on exit")
+    parser.add_argument("--log-level", choices=list(applog.LEVELS), default=None,
+                        help="Debug log level (default info, or MEETING_AI_LOG_LEVEL)")
+    parser.add_argument("--autotune", action="store_true",
+                        help="Benchmark CPU inference settings for --model on this machine, save the profile "
+                             "applied at startup, then exit")
+    parser.add_argument("--autotune-clip", type=str, default=None, metavar="WAV",
+                        help="Reference recording (speech) for --autotune")
+    parser.add_argument("--import-report", action="store_true",
+                        help="Print how long each module takes to import, then exit")
     args = parser.parse_args()
 
+    if args.import_report:
+        print(startup.format_report(startup.import_report()))
+        return
+
+    if args.autotune:
+        import autotune
+        autotune.run(args.model, args.autotune_clip, language=None if args.language == "auto" else args.language)
+        return
+
+    if args.trace:
+        tracing.enable()
+    applog.configure(args.log_level)
+    if args.long_session:
+        import transcript_store
+        transcript_store.configure(True, args.rollover_kb * 1024, args.window_chars)
+
     app_status["language"] = args.language
     app_status["model"] = args.model
+    # Every producer runs in (or forwards to) this process: file re-checks are only a safety net
+    events.configure(fallback=EVENTS_FALLBACK)
 
     stop_event = threading.Event()
 
     def shutdown(sig=None, frame=None):
         print("\n[MAIN] Shutting down...")
         stop_event.set()
+        events.publish("stop")
 
     signal.signal(signal.SIGINT, shutdown)
     signal.signal(signal.SIGTERM, shutdown)
@@ -64,39 +203,53 @@ def main():
     print("  Meeting AI Analyser")
     print("=" * 60)
 
-    # 1. Web server FIRST (starts fast)
+    if args.headless:
+        run_headless(args, stop_event)
+        return
+
+    # 1. Web server FIRST (starts fast: Flask only, everything else is imported on use)
     import server
     server.app_status = app_status
     t_server = threading.Thread(
         target=server.start,
-        args=(stop_event, args.port),
+        args=(stop_event, args.port, args.host),
         name="server",
         daemon=True,
     )
     t_server.start()
     app_status["server"] = True
     app_status["message"] = "Web server started"
+    startup.mark("server")
     print(f"[MAIN] Web server started on http://localhost:{args.port}")
 
-    # 2. Open browser IMMEDIATELY (shows loader)
+    # 2. Open browser as soon as the server listens (shows loader)
     if not args.no_browser:
-        time.sleep(1)
-        webbrowser.open(f"http://localhost:{args.port}")
+        threading.Thread(target=_open_browser_when_listening, args=(args.port,), name="browser", daemon=True).start()
 
-    # 3. Transcription (loads Whisper = slow)
+    # 3. Transcription (loads Whisper = slow) in a worker process, supervised
+    # from this thread. numpy & co are imported here too, so the analyst
+    # starts meanwhile
     app_status["message"] = "Loading Whisper model..."
-    import live_transcribe
 
     def _run_transcribe():
         try:
-            live_transcribe.start(
-                stop_event,
+            options = dict(
                 mic_device=args.mic_device,
                 segment=args.segment,
                 model_size=args.model,
                 language=args.language,
                 no_mic=args.no_mic,
+                diarize=args.diarize,
             )
+            if args.transcribe_in_process:
+                import live_transcribe
+                startup.mark("transcription_import")
+                live_transcribe.start(stop_event, **options)
+                return
+            import transcription_worker
+            startup.mark("transcription_import")
+            app_status["transcription_worker"] = transcription_worker.worker_status
+            transcription_worker.start(stop_event, **options)
         except Exception:
             _log_crash("TRANSCRIPTION", traceback.format_exc())
 
@@ -109,10 +262,26 @@ def main():
     # 4. Claude analysis (optional)
     if not args.no_analysis:
         import analyst
+        from backends import make_backend
+        try:
+            lenses = analyst.parse_lenses(args.lenses) if args.lenses else analyst.DEFAULT_LENSES
+        except argparse.ArgumentTypeError as e:
+            parser.error(str(e))
+        analyst.set_backend(make_backend(args.backend, args.backend_url, args.backend_model,
+                                         analyst.CLAUDE_TIMEOUT))
+        analyst.set_compression(not args.no_compress_transcript, args.analysis_token_budget, args.analysis_truncate)
 
         def _run_analyst():
             try:
-                analyst.start(stop_event)
+                schedule = {
+                    "min_words": args.analysis_min_words,
+                    "silence": args.analysis_silence,
+                    "min_interval": args.analysis_min_interval,
+                }
+                analyst.start(stop_event, interval=args.analysis_interval, mode=args.analysis_mode,
+                              consolidate_every=args.consolidate_every,
+                              chunk_minutes=args.chunk_minutes, workers=args.analysis_workers,
+                              stream=not args.no_stream_analysis, schedule=schedule, lenses=lenses)
             except Exception:
                 _log_crash("ANALYST", traceback.format_exc())
 
@@ -120,6 +289,7 @@ def main():
         t_analyst.start()
         app_status["analysis"] = True
         app_status["message"] = "Claude analysis started"
+        startup.mark("analysis")
         print("[MAIN] Claude analysis started")
     else:
         app_status["analysis"] = True
@@ -127,6 +297,8 @@ def main():
 
     app_status["ready"] = True
     app_status["message"] = "Ready"
+    startup.mark("ready")
+    print(f"[MAIN] Startup: {', '.join(f'{k} {v:.2f}s' for k, v in startup.milestones.items())}")
     print("\n[MAIN] All systems running. Ctrl+C to stop.\n")
 
     try:
@@ -136,6 +308,11 @@ def main():
         shutdown()
 
     print("[MAIN] Closing...")
+    # Lets the transcription thread stop the worker process cleanly
+    t_transcribe.join(timeout=8)
+    if args.trace:
+        print(f"[MAIN] Trace written to {tracing.dump(args.trace)}")
+    applog.shutdown()
     time.sleep(1)
     os._exit(0)
 
@@ -0,0 +1,339 @@
+"""
+Meeting AI Analyser - Multi-session mode
+Headless server mode (main.py --headless) transcribing many meetings at
+once. Each session has its own pipeline state (language, input format,
+buffered audio, dedup context, transcript file in data/sessions/<id>/)
+while every session shares one loaded Whisper model.
+
+The InferenceScheduler serves the model to the sessions round-robin: each
+inference thread takes the next segment of the next session that has one
+waiting and nothing in flight, so a session with a backlog can't starve
+the others, and a session's segments are committed in order.
+
+Usage:
+    import meeting_sessions
+    manager = meeting_sessions.init("small", workers=2)
+    session = manager.create(language="fr", channels=1, rate=16000)
+    session.feed(pcm_int16_bytes)
+"""
+import collections
+import datetime
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+
+import applog
+import events
+import language_detect
+import live_transcribe
+from paths import SESSIONS_DIR
+from tracing import span
+
+# Sessions without audio for this long are closed (seconds)
+IDLE_TIMEOUT = 30 * 60
+REAP_INTERVAL = 60
+
+SESSION_ID_RE = re.compile(r"^[\w-]{1,64}$")
+# Accepted session formats (inclusive ranges)
+SEGMENT_RANGE = (1, 300)
+CHANNELS_RANGE = (1, 8)
+RATE_RANGE = (8000, 192000)
+
+log = applog.logger(os.path.join(SESSIONS_DIR, "sessions_debug.log"))
+
+_manager = None
+
+
+class Session:
+    """One meeting: raw PCM in, committed lines out"""
+
+    def __init__(self, session_id, scheduler, language="en", segment=live_transcribe.DEFAULT_SEGMENT_DURATION,
+                 channels=1, rate=live_transcribe.SAMPLE_RATE):
+        for name, value, (low, high) in (("segment", segment, SEGMENT_RANGE), ("channels", channels, CHANNELS_RANGE),
+                                         ("rate", rate, RATE_RANGE)):
+            if not low <= value <= high:
+                raise ValueError(f"{name} must be between {low} and {high}")
+        self.id = session_id
+        self.language = language
+        self.segment = segment
+        self.channels = channels
+        self.rate = rate
+        self.created = time.time()
+        self.last_audio = self.created
+        self.dir = os.path.join(SESSIONS_DIR, session_id)
+        self.transcription_file = os.path.join(self.dir, "transcription_live.txt")
+        self.closed = False
+        self.stats = {"segments": 0, "committed": 0, "silent": 0, "audio_seconds": 0.0, "streams": 0}
+        # Active ingest stream stats (audio_ingest.py); one at a time
+        self.streams = []
+        self._scheduler = scheduler
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self._prev_text = ""
+        # Language decision when language is "auto"
+        self._tracker = None
+        self._frame_bytes = 2 * channels
+        self._first, self._per_segment = live_transcribe.segment_thresholds(rate, segment)
+
+        os.makedirs(self.dir, exist_ok=True)
+        with open(self.transcription_file, "w", encoding="utf-8") as f:
+            f.write(f"=== Live Transcription - {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===\n\n")
+
+    def feed(self, data):
+        """Append int16 PCM (interleaved, session format); queues full segments"""
+        if self.closed:
+            raise ValueError(f"session {self.id} is closed")
+        with self._lock:
+            self._buffer += data
+            self.last_audio = time.time()
+            self.stats["audio_seconds"] += len(data) / (self._frame_bytes * self.rate)
+            while True:
+                threshold = (self._first if self.stats["segments"] == 0 else self._per_segment) * self._frame_bytes
+                if len(self._buffer) < threshold:
+                    break
+                self._cut(threshold)
+
+    def _cut(self, size):
+        raw = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        self.stats["segments"] += 1
+        self._scheduler.submit(self, {"raw": raw, "segment": self.stats["segments"],
+                                      "timestamp": datetime.datetime.now().strftime("%H:%M:%S"),
+                                      "queued": time.perf_counter()})
+
+    def open_stream(self, stats):
+        """Register an ingest stream; False if one is already active"""
+        with self._lock:
+            if self.streams:
+                return False
+            self.streams.append(stats)
+            return True
+
+    def close_stream(self, stats):
+        with self._lock:
+            self.streams.remove(stats)
+            self.stats["streams"] += 1
+
+    def set_language(self, language):
+        if language != self.language:
+            self.language = language
+            self._tracker = None
+
+    def flush(self):
+        """Queue whatever is buffered as a last (short) segment"""
+        with self._lock:
+            usable = len(self._buffer) - len(self._buffer) % self._frame_bytes
+            if usable >= self.rate * self._frame_bytes:  # at least one second
+                self._cut(usable)
+            self._buffer.clear()
+
+    def transcribe(self, model, job):
+        """Runs on an inference thread; at most one job per session at a time"""
+        audio = live_transcribe.to_mono_16k(job["raw"], self.channels, self.rate)
+        if self.language == language_detect.AUTO and self._tracker is None:
+            self._tracker = language_detect.LanguageTracker()
+        raw_text = live_transcribe.transcribe_segment(model, audio, live_transcribe.SAMPLE_RATE,
+                                                      self.language, wav_path=None, tracker=self._tracker)
+        if not raw_text:
+            self.stats["silent"] += 1
+            return None
+        text = live_transcribe.deduplicate(raw_text, self._prev_text)
+        self._prev_text = raw_text
+        if not text.strip():
+            return None
+        with open(self.transcription_file, "a", encoding="utf-8") as f:
+            f.write(f"[{job['timestamp']}] {text}\n")
+        self.stats["committed"] += 1
+        return text
+
+    def status(self):
+        return {
+            "id": self.id,
+            "language": self.language,
+            "language_detection": self._tracker.status() if self._tracker else None,
+            "segment": self.segment,
+            "channels": self.channels,
+            "rate": self.rate,
+            "created": self.created,
+            "idle": round(time.time() - self.last_audio, 1),
+            "buffered_seconds": round(len(self._buffer) / (self._frame_bytes * self.rate), 2),
+            "pending": self._scheduler.pending(self.id),
+            "closed": self.closed,
+            "ingest": [dict(s) for s in self.streams],
+            **self.stats,
+        }
+
+
+class InferenceScheduler:
+    """Shares one model between sessions with round-robin fairness"""
+
+    def __init__(self, model, workers=1):
+        self.model = model
+        self.workers = workers
+        self._queues = collections.OrderedDict()  # session id -> deque of (session, job)
+        self._busy = set()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self.stats = {"jobs": 0, "wait_ms_total": 0.0, "infer_ms_total": 0.0, "max_wait_ms": 0.0}
+        self._threads = [threading.Thread(target=self._run, name=f"inference-{i}", daemon=True)
+                         for i in range(workers)]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, session, job):
+        with self._cond:
+            self._queues.setdefault(session.id, collections.deque()).append((session, job))
+            self._cond.notify()
+
+    def pending(self, session_id):
+        with self._cond:
+            return len(self._queues.get(session_id, ())) + (session_id in self._busy)
+
+    def wait_pending(self, session_id, limit, timeout):
+        """Block until the session has fewer than `limit` pending segments; False on timeout"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: len(self._queues.get(session_id, ())) + (session_id in self._busy) < limit, timeout)
+
+    def drop(self, session_id):
+        """Forget the queued segments of a session"""
+        with self._cond:
+            self._queues.pop(session_id, None)
+
+    def _next(self):
+        """First session (in rotation order) with a waiting job and none in flight"""
+        for session_id, jobs in self._queues.items():
+            if jobs and session_id not in self._busy:
+                self._queues.move_to_end(session_id)
+                self._busy.add(session_id)
+                return jobs.popleft()
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                item = self._next()
+                while item is None and not self._stopped:
+                    self._cond.wait()
+                    item = self._next()
+                if item is None:
+                    return
+            session, job = item
+            started = time.perf_counter()
+            try:
+                with span("session.segment", cat="sessions", session=session.id, segment=job["segment"]):
+                    session.transcribe(self.model, job)
+            except Exception as e:
+                log.error(f"Session {session.id} segment {job['segment']}: {type(e).__name__}: {e}")
+            finally:
+                done = time.perf_counter()
+                with self._cond:
+                    self._busy.discard(session.id)
+                    if not self._queues.get(session.id):
+                        self._queues.pop(session.id, None)
+                    wait_ms = (started - job["queued"]) * 1000
+                    self.stats["jobs"] += 1
+                    self.stats["wait_ms_total"] += wait_ms
+                    self.stats["infer_ms_total"] += (done - started) * 1000
+                    self.stats["max_wait_ms"] = max(self.stats["max_wait_ms"], wait_ms)
+                    self._cond.notify_all()
+
+    def info(self):
+        with self._cond:
+            jobs = self.stats["jobs"]
+            return {
+                "workers": self.workers,
+                "queued": sum(len(q) for q in self._queues.values()),
+                "in_flight": len(self._busy),
+                "jobs": jobs,
+                "avg_wait_ms": round(self.stats["wait_ms_total"] / jobs, 1) if jobs else 0,
+                "avg_infer_ms": round(self.stats["infer_ms_total"] / jobs, 1) if jobs else 0,
+                "max_wait_ms": round(self.stats["max_wait_ms"], 1),
+            }
+
+    def drain(self, timeout=30):
+        """Wait until every queued segment is transcribed"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._busy and not any(self._queues.values()), timeout)
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+
+class SessionManager:
+    def __init__(self, model_size, scheduler):
+        self.model_size = model_size
+        self.scheduler = scheduler
+        self.sessions = {}
+        self._lock = threading.Lock()
+        events.call_later(REAP_INTERVAL, self._reap)
+
+    def create(self, session_id=None, **options):
+        session_id = session_id or uuid.uuid4().hex[:12]
+        if not SESSION_ID_RE.match(session_id):
+            raise ValueError("session id: 1-64 letters, digits, '-' or '_'")
+        with self._lock:
+            if session_id in self.sessions:
+                raise KeyError(f"session {session_id} already exists")
+            session = self.sessions[session_id] = Session(session_id, self.scheduler, **options)
+        log(f"Session {session_id} created ({session.channels}ch, {session.rate}Hz, {session.language})")
+        return session
+
+    def get(self, session_id):
+        return self.sessions.get(session_id)
+
+    def close(self, session_id, delete=False):
+        """Transcribe the buffered tail and stop accepting audio"""
+        with self._lock:
+            session = self.sessions.pop(session_id, None)
+        if session is None:
+            return None
+        session.flush()
+        session.closed = True
+        if delete:
+            self.scheduler.drop(session_id)
+            shutil.rmtree(session.dir, ignore_errors=True)
+        log(f"Session {session_id} closed ({session.stats['segments']} segments)")
+        return session
+
+    def _reap(self):
+        """Timer: close idle sessions, then re-arm"""
+        now = time.time()
+        for session in list(self.sessions.values()):
+            if now - session.last_audio > IDLE_TIMEOUT:
+                log(f"Session {session.id} idle for {IDLE_TIMEOUT}s")
+                self.close(session.id)
+        events.call_later(REAP_INTERVAL, self._reap)
+
+    def info(self):
+        return {
+            "model": self.model_size,
+            "inference": live_transcribe.inference_settings,
+            "scheduler": self.scheduler.info(),
+            "sessions": [s.status() for s in list(self.sessions.values())],
+        }
+
+
+def init(model_size="small", workers=None):
+    """Load the shared model and start the scheduler (None if the model fails to load).
+
+    workers=None: as many inference threads as the CPU profile recommends (1 without one).
+    """
+    global _manager
+    os.makedirs(SESSIONS_DIR, exist_ok=True)
+    model = live_transcribe.load_whisper_model(model_size, num_workers=workers)
+    if model is None:
+        return None
+    workers = live_transcribe.inference_settings["num_workers"]
+    _manager = SessionManager(model_size, InferenceScheduler(model, workers))
+    return _manager
+
+
+def get_manager():
+    """The session manager, None unless running in headless mode"""
+    return _manager
@@ -27,13 +27,22 @@ APP_DIR = _get_base_dir()
 BUNDLE_DIR = _get_bundle_dir()
 
 # Data dir: all generated files go here (not at root)
-DATA_DIR = os.path.join(APP_DIR, "data")
+# MEETING_AI_DATA_DIR overrides it (benchmarks run against a scratch dir)
+DATA_DIR = os.environ.get("MEETING_AI_DATA_DIR") or os.path.join(APP_DIR, "data")
 os.makedirs(DATA_DIR, exist_ok=True)
 
 # Output files
 TRANSCRIPTION_FILE = os.path.join(DATA_DIR, "transcription_live.txt")
 TRANSCRIPTION_LATEST = os.path.join(DATA_DIR, "transcription_latest.txt")
 ANALYSIS_FILE = os.path.join(DATA_DIR, "analyse_reunion.md")
+ANALYSIS_SECTIONS_FILE = os.path.join(DATA_DIR, "analysis_sections.json")
 LOG_FILE = os.path.join(DATA_DIR, "analyst_debug.log")
 AUDIO_TEMP = os.path.join(DATA_DIR, "temp_segment.wav")
-TEMP_PROMPT = os.path.join(DATA_DIR, "temp_prompt.txt")
+CHUNK_CACHE_FILE = os.path.join(DATA_DIR, "chunk_summaries.json")
+ANALYSIS_CACHE_DIR = os.path.join(DATA_DIR, "analysis_cache")
+CONVERSATION_INDEX_FILE = os.path.join(DATA_DIR, "conversation_index.json")
+SESSIONS_DIR = os.path.join(DATA_DIR, "sessions")
+SPEAKERS_FILE = os.path.join(DATA_DIR, "transcription_speakers.jsonl")
+TRANSCRIPT_ARCHIVE_DIR = os.path.join(DATA_DIR, "transcript_archive")
+WATCHLIST_FILE = os.path.join(DATA_DIR, "watchlist.txt")
+ALERTS_FILE = os.path.join(DATA_DIR, "alerts.jsonl")
@@ -0,0 +1,110 @@
+"""
+Meeting AI Analyser - Change-driven analysis scheduling
+Decides when the analyst should run from what was said since the last run,
+instead of waking on a fixed interval.
+"""
+import os
+
+
+class TranscriptWatcher:
+    """Tracks the transcription file and returns only newly appended text"""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+
+    def poll(self):
+        """Text appended since the last poll ("" if none). A truncated file starts over."""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if size < self.offset:
+            self.offset = 0
+        if size == self.offset:
+            return ""
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        self.offset = size
+        return data.decode("utf-8", errors="ignore")
+
+
+class AnalysisScheduler:
+    """Triggers an analysis when enough was said, or when speech stops after a burst.
+
+    - volume:   >= min_words new words or >= min_segments new segments
+    - silence:  some new words, then no new text for `silence` seconds
+    - interval: some new words and `max_interval` seconds since the last run
+    Runs are debounced: never closer than max(min_interval, 2 x average analysis duration).
+    Nothing new means no analysis at all.
+    """
+
+    def __init__(self, min_words=80, min_segments=6, silence=10, min_interval=20, max_interval=60):
+        self.min_words = min_words
+        self.min_segments = min_segments
+        self.silence = silence
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.pending_words = 0
+        self.pending_segments = 0
+        self.last_activity = 0
+        self.last_run = 0
+        self.avg_duration = 0
+
+    def observe(self, text, now):
+        """Account for newly appended transcription text"""
+        if not text:
+            return
+        for line in text.splitlines():
+            words = line.split()
+            if not words:
+                continue
+            if words[0].startswith("["):
+                self.pending_segments += 1
+                words = words[1:]
+            self.pending_words += len(words)
+        self.last_activity = now
+
+    def debounce(self):
+        """Minimum gap between runs, adapted to how long analyses take"""
+        return max(self.min_interval, 2 * self.avg_duration)
+
+    def due(self, now):
+        """Reason to run now ("volume", "silence", "interval") or None"""
+        if not self.pending_words:
+            return None
+        since_run = now - self.last_run
+        if since_run < self.debounce():
+            return None
+        if self.pending_words >= self.min_words or self.pending_segments >= self.min_segments:
+            return "volume"
+        if now - self.last_activity >= self.silence:
+            return "silence"
+        if since_run >= self.max_interval:
+            return "interval"
+        return None
+
+    def next_check(self, now):
+        """When due() may turn true with no new text: the debounce, silence or
+        interval deadline (None if nothing is pending)"""
+        if not self.pending_words:
+            return None
+        debounce_end = self.last_run + self.debounce()
+        if self.pending_words >= self.min_words or self.pending_segments >= self.min_segments:
+            return debounce_end
+        return max(debounce_end, min(self.last_activity + self.silence, self.last_run + self.max_interval))
+
+    def next_run(self):
+        """Latest time the next analysis will run (0 if nothing is pending)"""
+        if not self.pending_words:
+            return 0
+        return self.last_run + max(self.max_interval, self.debounce())
+
+    def record_run(self, duration, now):
+        """An analysis finished (or was skipped): clear pending, update the duration average"""
+        self.pending_words = 0
+        self.pending_segments = 0
+        self.last_run = now
+        if duration:
+            self.avg_duration = duration if not self.avg_duration else 0.7 * self.avg_duration + 0.3 * duration
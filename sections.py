@@ -0,0 +1,130 @@
+"""
+Meeting AI Analyser - Structured analysis sections
+Splits the analysis Markdown into its "## " sections and stores them as
+versioned objects in data/analysis_sections.json. A section's version is the
+revision at which its text last changed, so a client holding revision N only
+needs the sections with version > N.
+
+The file is the source of truth: the analyst and the server may run in
+separate processes (manual launch).
+"""
+import json
+import os
+import re
+import threading
+import time
+
+from paths import ANALYSIS_SECTIONS_FILE
+
+# Canonical ids for the headings the prompts ask for; others get a slug
+SECTION_IDS = {
+    "topics discussed": "topics",
+    "decisions made": "decisions",
+    "open questions": "questions",
+    "suggested technical solutions": "solutions",
+    "technical deep-dive": "technical",
+    "action items": "actions",
+    "risks": "risks",
+}
+
+_HEADING_RE = re.compile(r"^##\s+(.+?)\s*#*\s*$")
+_lock = threading.Lock()
+
+
+def section_id(title):
+    key = " ".join(re.sub(r"[^\w\s-]", " ", title.lower()).split())
+    return SECTION_IDS.get(key) or re.sub(r"[\s_]+", "-", key) or "section"
+
+
+def parse(markdown):
+    """[{"id", "title", "body"}] from "## " headings.
+
+    Text before the first heading (minus the "# " title line) becomes an
+    "overview" section; repeated ids get a numeric suffix.
+    """
+    sections = []
+    intro = []
+    current = None
+    for line in markdown.splitlines():
+        m = _HEADING_RE.match(line)
+        if m:
+            current = {"id": section_id(m.group(1)), "title": m.group(1), "lines": []}
+            sections.append(current)
+        elif current:
+            current["lines"].append(line)
+        elif not line.startswith("# "):
+            intro.append(line)
+    if "\n".join(intro).strip():
+        sections.insert(0, {"id": "overview", "title": "", "lines": intro})
+
+    seen = {}
+    for s in sections:
+        n = seen[s["id"]] = seen.get(s["id"], 0) + 1
+        if n > 1:
+            s["id"] = f"{s['id']}-{n}"
+        s["body"] = "\n".join(s.pop("lines")).strip()
+    return sections
+
+
+def read():
+    """Current document: {"revision", "title", "updated", "sections": [...]}"""
+    try:
+        with open(ANALYSIS_SECTIONS_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"revision": 0, "title": "", "updated": 0, "sections": []}
+
+
+def _write(doc):
+    tmp = ANALYSIS_SECTIONS_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(doc, f)
+    for attempt in range(5):
+        try:
+            os.replace(tmp, ANALYSIS_SECTIONS_FILE)
+            return
+        except PermissionError:
+            # Windows: the server may be reading the file right now
+            time.sleep(0.05)
+    os.replace(tmp, ANALYSIS_SECTIONS_FILE)
+
+
+def update(markdown, title=""):
+    """Store a new analysis; returns the ids of the sections that changed"""
+    with _lock:
+        doc = read()
+        revision = doc["revision"] + 1
+        old = {s["id"]: s for s in doc["sections"]}
+        now = time.time()
+        sections = []
+        changed = []
+        for s in parse(markdown):
+            prev = old.get(s["id"])
+            if prev and prev["title"] == s["title"] and prev["body"] == s["body"]:
+                sections.append(prev)
+                continue
+            sections.append(dict(s, version=revision, updated=now))
+            changed.append(s["id"])
+        order_changed = [s["id"] for s in sections] != [s["id"] for s in doc["sections"]]
+        if not changed and not order_changed and title == doc["title"]:
+            return []
+        _write({"revision": revision, "title": title, "updated": now, "sections": sections})
+        return changed
+
+
+def reset():
+    """Drop every section (the revision keeps increasing so clients resync)"""
+    with _lock:
+        doc = read()
+        _write({"revision": doc["revision"] + 1, "title": "", "updated": time.time(), "sections": []})
+
+
+def changes(doc, since=0):
+    """What a client at revision `since` needs: changed sections + the full order"""
+    return {
+        "revision": doc["revision"],
+        "title": doc["title"],
+        "order": [s["id"] for s in doc["sections"]],
+        "sections": [s for s in doc["sections"] if s["version"] > since],
+        "full": since == 0,
+    }
@@ -3,18 +3,24 @@ Meeting AI Analyser - Local web server
 Live transcription interface + AI meeting analysis
 Runs on http://localhost:5555
 """
+import ipaddress
 import json
 import os
-import threading
 import time
 
 import subprocess
 import sys
 
-import psutil
 from flask import Flask, Response, request, send_from_directory
 
-from paths import TRANSCRIPTION_FILE, ANALYSIS_FILE, BUNDLE_DIR, APP_DIR
+import applog
+import events
+import sections
+import tracing
+import transcript_store
+from paths import (TRANSCRIPTION_FILE, ANALYSIS_FILE, ANALYSIS_SECTIONS_FILE, SPEAKERS_FILE, ALERTS_FILE,
+                   BUNDLE_DIR, APP_DIR)
+from tracing import span
 
 TRANSCRIBE_SCRIPT = os.path.join(APP_DIR, "live_transcribe.py")
 
@@ -23,20 +29,39 @@ app = Flask(__name__, static_folder=BUNDLE_DIR)
 # Global status (injected by main.py)
 app_status = {"ready": False, "message": "Starting...", "language": "en", "model": "small"}
 
+# SSE streams wake on these events (events.py), and re-check the files every
+# events fallback interval without them
+STREAM_TOPICS = ("transcript", "segment", "speakers", "alerts", "analysis", "analysis_partial")
+# Minimum gap between two pushes of a streaming analysis
+STREAM_PARTIAL_INTERVAL = 0.25
+
+# Remote clients (--host other than loopback) only get the session API: the
+# other routes (stop, restart, reset, watchlist...) drive this machine unauthenticated
+REMOTE_ROUTES = ("/api/sessions",)
+
 # Heartbeat: browser pings every 5s, if no ping for 15s -> shutdown
-_last_heartbeat = time.time()
+HEARTBEAT_TIMEOUT = 15
+_heartbeat_timer = None
 _stop_event_ref = None
 
 
-def _heartbeat_watcher():
-    """Thread that monitors heartbeat and triggers shutdown if browser is closed"""
-    while True:
-        time.sleep(5)
-        if time.time() - _last_heartbeat > 15 and _stop_event_ref:
-            print("[SERVER] Browser disconnected, shutting down...")
-            _stop_event_ref.set()
-            time.sleep(1)
-            os._exit(0)
+def _exit_soon(delay=1):
+    events.call_later(delay, lambda: (applog.shutdown(), os._exit(0)))
+
+
+def _browser_disconnected():
+    print("[SERVER] Browser disconnected, shutting down...")
+    _stop_event_ref.set()
+    events.publish("stop")
+    _exit_soon()
+
+
+def _arm_heartbeat():
+    """(Re)start the shutdown countdown; each heartbeat pushes it back"""
+    global _heartbeat_timer
+    if _heartbeat_timer:
+        _heartbeat_timer.cancel()
+    _heartbeat_timer = events.call_later(HEARTBEAT_TIMEOUT, _browser_disconnected)
 
 
 def read_file_safe(filepath):
@@ -49,6 +74,52 @@ def read_file_safe(filepath):
         return ""
 
 
+def read_jsonl(path, offset=0):
+    """Entries appended to a JSON-lines sidecar since `offset`.
+
+    Returns (entries, new offset); a partly written last line is left for
+    the next call.
+    """
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+    except OSError:
+        return [], offset
+    complete = data[:data.rfind(b"\n") + 1]
+    entries = []
+    for line in complete.decode("utf-8", errors="replace").splitlines():
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            pass
+    return entries, offset + len(complete)
+
+
+def read_speakers(offset=0):
+    """Speaker labels since `offset`: ({"HH:MM:SS": ["Me", "Speaker 1"]}, new offset)"""
+    entries, offset = read_jsonl(SPEAKERS_FILE, offset)
+    return {e["time"]: e["speakers"] for e in entries if "time" in e and "speakers" in e}, offset
+
+
+def _is_loopback(addr):
+    try:
+        ip = ipaddress.ip_address(addr or "")
+    except ValueError:
+        return False
+    return ip.is_loopback or bool(getattr(ip, "ipv4_mapped", None) and ip.ipv4_mapped.is_loopback)
+
+
+@app.before_request
+def local_only():
+    """Everything but REMOTE_ROUTES is refused to non-loopback clients"""
+    if _is_loopback(request.remote_addr):
+        return None
+    if any(request.path == r or request.path.startswith(r + "/") for r in REMOTE_ROUTES):
+        return None
+    return {"error": "only /api/sessions is available to remote clients"}, 403
+
+
 @app.route("/")
 def index():
     return send_from_directory(BUNDLE_DIR, "index.html")
@@ -61,9 +132,51 @@ def serve_images(filename):
 
 @app.route("/api/transcription")
 def get_transcription():
-    content = read_file_safe(TRANSCRIPTION_FILE)
+    """The transcription (its recent window in long-session mode).
+
+    Query: since (mtime of the client's copy): {"unchanged": true} if the file hasn't changed.
+    cursor (from the previous response): only the lines added since, "full": false
+    if it still matches the transcript.
+    "start" is the logical offset of content (> 0 once older lines are archived).
+    """
     mtime = os.path.getmtime(TRANSCRIPTION_FILE) if os.path.exists(TRANSCRIPTION_FILE) else 0
-    return {"content": content, "mtime": mtime}
+    if mtime and request.args.get("since", type=float) == mtime:
+        return {"unchanged": True, "mtime": mtime}
+    content, start, cursor, full = transcript_store.read_delta(request.args.get("cursor"))
+    return {"content": content, "mtime": mtime, "start": start, "cursor": cursor, "full": full}
+
+
+@app.route("/api/speakers")
+def get_speakers():
+    """Diarization labels by line timestamp (empty unless started with --diarize)"""
+    labels, _ = read_speakers()
+    return {"labels": labels}
+
+
+@app.route("/api/alerts")
+def get_alerts():
+    """Recorded keyword alerts, most recent last. Query: limit (default 100)"""
+    limit = min(max(request.args.get("limit", 100, type=int), 1), 1000)
+    hits, _ = read_jsonl(ALERTS_FILE)
+    return {"alerts": hits[-limit:], "total": len(hits)}
+
+
+@app.route("/api/alerts/watchlist", methods=["GET", "PUT"])
+def alerts_watchlist():
+    """Watched terms; PUT {"terms": [...]} replaces them (picked up at the next segment)"""
+    import keyword_alerts
+    if request.method == "PUT":
+        terms = (request.get_json(silent=True) or {}).get("terms")
+        if not isinstance(terms, list) or not all(isinstance(t, str) for t in terms):
+            return {"error": "terms: list of strings"}, 400
+        keyword_alerts.write_watchlist(terms)
+    return {"terms": keyword_alerts.read_watchlist()}
+
+
+@app.route("/api/analysis/sections")
+def get_analysis_sections():
+    """Analysis sections changed since revision `since` (all of them by default)"""
+    return sections.changes(sections.read(), request.args.get("since", 0, type=int))
 
 
 @app.route("/api/analysis")
@@ -98,6 +211,7 @@ def get_devices():
         except Exception:
             pass
         if active_mic is None:
+            import psutil
             for proc in psutil.process_iter(["pid", "cmdline"]):
                 try:
                     cmdline = proc.info["cmdline"] or []
@@ -115,9 +229,23 @@ def get_devices():
 
 @app.route("/api/restart", methods=["POST"])
 def restart_transcription():
-    """Restart live_transcribe.py with a new mic device"""
+    """Restart transcription with a new mic device.
+
+    main.py launch: clean restart of the transcription worker process.
+    Manual launch (server.py + live_transcribe.py): relaunch live_transcribe.py.
+    """
     data = request.get_json() or {}
     mic_id = data.get("micDevice")
+    try:
+        import transcription_worker
+        if transcription_worker.is_managed():
+            started = transcription_worker.restart(mic_device=mic_id)
+            return {"status": "restarted" if started else "failed", "micDevice": mic_id,
+                    "worker": transcription_worker.worker_status}
+    except ImportError:
+        pass
+
+    import psutil
     # Kill current live_transcribe process
     my_pid = os.getpid()
     killed = False
@@ -142,8 +270,21 @@ def reset():
     """Clear transcription and analysis files completely"""
     with open(TRANSCRIPTION_FILE, "w", encoding="utf-8") as f:
         f.write("")
+    transcript_store.clear()
     with open(ANALYSIS_FILE, "w", encoding="utf-8") as f:
         f.write("")
+    for sidecar in (SPEAKERS_FILE, ALERTS_FILE):
+        if os.path.exists(sidecar):
+            open(sidecar, "w").close()
+    sections.reset()
+    events.publish("transcript", reset=True)
+    events.publish("analysis")
+    # The diarizer would keep numbering the speakers of the cleared transcript
+    try:
+        import transcription_worker
+        transcription_worker.reset_speakers()
+    except Exception:
+        pass
     # Reset analyst memory so next analysis isn't skipped
     try:
         import analyst
@@ -156,6 +297,7 @@ def reset():
 @app.route("/api/stop")
 def stop():
     """Stop all Meeting AI Analyser Python processes"""
+    import psutil
     subprocess.run(
         'taskkill /F /FI "WINDOWTITLE eq Meeting*" >nul 2>&1',
         shell=True,
@@ -169,25 +311,44 @@ def stop():
         except Exception:
             pass
     # Kill self after delay
-    threading.Timer(1, lambda: os._exit(0)).start()
+    _exit_soon()
     return {"status": "stopped"}
 
 
 @app.route("/api/language", methods=["POST"])
 def set_language():
+    """{"language": code}, or "auto" to detect it (see language_detect.py)"""
     data = request.get_json() or {}
     lang = data.get("language")
     if not lang:
         return {"error": "missing language"}, 400
     try:
-        import live_transcribe
-        live_transcribe.active_language = lang
+        import transcription_worker
+        transcription_worker.set_language(lang)
     except Exception:
         pass
     app_status["language"] = lang
     return {"status": "ok", "language": lang}
 
 
+@app.route("/api/model", methods=["POST"])
+def set_model():
+    """Switch the Whisper model of the transcription worker ({"model": "base"})"""
+    data = request.get_json() or {}
+    model = data.get("model")
+    if not model:
+        return {"error": "missing model"}, 400
+    try:
+        import transcription_worker
+        if not transcription_worker.is_managed():
+            return {"error": "no transcription worker"}, 409
+        transcription_worker.set_model(model)
+    except ImportError as e:
+        return {"error": str(e)}, 500
+    app_status["model"] = model
+    return {"status": "loading", "model": model}
+
+
 @app.route("/api/analyst")
 def analyst_info():
     try:
@@ -196,17 +357,27 @@ def analyst_info():
         now = time.time()
         remaining = max(0, s["next_run"] - now) if s["next_run"] > 0 else 0
         progress = 1 - (remaining / s["interval"]) if s["interval"] > 0 and not s["paused"] else 0
-        return {"state": s["state"], "remaining": round(remaining), "progress": round(progress, 3), "interval": s["interval"], "paused": s["paused"], "conversation_id": s.get("conversation_id", "")}
+        return {"state": s["state"], "remaining": round(remaining), "progress": round(progress, 3), "interval": s["interval"], "paused": s["paused"], "conversation_id": s.get("conversation_id", ""),
+                "mode": s.get("mode", ""), "last_kind": s.get("last_kind", ""), "last_prompt_chars": s.get("last_prompt_chars", 0),
+                "cache": analyst.analysis_cache.info(), "pending_words": s.get("pending_words", 0),
+                "last_reason": s.get("last_reason", ""), "debounce": s.get("debounce", 0),
+                "backend": s.get("backend", ""), "lenses": s.get("lenses", {}),
+                "compression": s.get("compression", {})}
     except Exception:
         return {"state": "unknown", "remaining": 0, "progress": 0, "interval": 60, "paused": False}
 
 
 @app.route("/api/conversations")
 def list_conversations():
-    """List available Claude conversation sessions from all projects"""
+    """List available Claude conversation sessions from all projects.
+
+    Query: limit (default 50, max 500), offset, prefix (session id or project name)
+    """
     try:
         import analyst
-        data = analyst.list_conversations()
+        limit = min(max(request.args.get("limit", 50, type=int), 1), 500)
+        offset = max(request.args.get("offset", 0, type=int), 0)
+        data = analyst.list_conversations(limit, offset, request.args.get("prefix", ""))
         return data
     except Exception as e:
         return {"conversations": [], "base_path": None, "error": str(e)}
@@ -239,17 +410,31 @@ def analyst_toggle():
 
 @app.route("/api/analyst/trigger", methods=["POST"])
 def analyst_trigger():
-    """Trigger an immediate analysis"""
+    """Trigger an immediate analysis ({"force": true} bypasses the analysis cache)"""
     try:
         import analyst
         if analyst.analyst_status["state"] == "analyzing":
             return {"status": "already_analyzing"}
-        analyst.trigger_now()
+        data = request.get_json(silent=True) or {}
+        analyst.trigger_now(force=bool(data.get("force")))
         return {"status": "triggered"}
     except Exception as e:
         return {"error": str(e)}, 500
 
 
+@app.route("/api/analyst/cancel", methods=["POST"])
+def analyst_cancel():
+    """Abort the running analysis"""
+    try:
+        import analyst
+        if analyst.analyst_status["state"] != "analyzing":
+            return {"status": "idle"}
+        analyst.cancel_analysis()
+        return {"status": "cancelled"}
+    except Exception as e:
+        return {"error": str(e)}, 500
+
+
 @app.route("/api/levels")
 def levels():
     try:
@@ -259,55 +444,264 @@ def levels():
         return {"loopback": 0.0, "mic": 0.0}
 
 
+def _session_manager():
+    import meeting_sessions
+    return meeting_sessions.get_manager()
+
+
+@app.route("/api/sessions", methods=["GET", "POST"])
+def sessions_collection():
+    """Headless mode: list sessions (GET) or create one (POST).
+
+    POST {"id"?, "language", "segment", "channels", "rate"} -> session status
+    """
+    manager = _session_manager()
+    if manager is None:
+        return {"error": "multi-session mode is off (start with --headless)"}, 409
+    if request.method == "GET":
+        return manager.info()
+    data = request.get_json(silent=True) or {}
+    try:
+        session = manager.create(
+            data.get("id"),
+            language=data.get("language", app_status.get("language", "en")),
+            segment=int(data.get("segment", 10)),
+            channels=int(data.get("channels", 1)),
+            rate=int(data.get("rate", 16000)),
+        )
+    except KeyError as e:
+        return {"error": str(e)}, 409
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    return session.status(), 201
+
+
+@app.route("/api/sessions/<session_id>", methods=["GET", "PATCH", "DELETE"])
+def session_item(session_id):
+    """GET status, PATCH {"language"}, DELETE (?purge=1 also removes its files)"""
+    manager = _session_manager()
+    session = manager.get(session_id) if manager else None
+    if session is None:
+        return {"error": "unknown session"}, 404
+    if request.method == "PATCH":
+        data = request.get_json(silent=True) or {}
+        if data.get("language"):
+            session.set_language(data["language"])
+    elif request.method == "DELETE":
+        manager.close(session_id, delete=request.args.get("purge") == "1")
+    return session.status()
+
+
+@app.route("/api/sessions/<session_id>/audio", methods=["POST"])
+def session_audio(session_id):
+    """Audio stream for a session (see audio_ingest.py): raw PCM or length-prefixed Opus,
+    plain or chunked body, read with backpressure"""
+    import audio_ingest
+    manager = _session_manager()
+    session = manager.get(session_id) if manager else None
+    if session is None:
+        return {"error": "unknown session"}, 404
+    try:
+        stats = audio_ingest.ingest(session, manager.scheduler, request.stream, request.content_type)
+    except audio_ingest.IngestError as e:
+        return {"error": str(e)}, e.status
+    except ValueError as e:
+        # Session closed while streaming
+        return {"error": str(e)}, 410
+    return {"stream": stats, "pending": session.status()["pending"]}
+
+
+@app.route("/api/sessions/<session_id>/transcription")
+def session_transcription(session_id):
+    manager = _session_manager()
+    session = manager.get(session_id) if manager else None
+    if session is None:
+        return {"error": "unknown session"}, 404
+    return {"content": read_file_safe(session.transcription_file), "timestamp": time.time()}
+
+
+@app.route("/api/trace", methods=["GET", "POST"])
+def trace():
+    """GET: Chrome trace JSON of buffered spans. POST {"enabled": bool, "clear": bool}"""
+    if request.method == "POST":
+        data = request.get_json() or {}
+        if data.get("enabled") is True:
+            tracing.enable()
+        elif data.get("enabled") is False:
+            tracing.disable()
+        if data.get("clear"):
+            tracing.clear()
+        # The transcription worker records its own spans
+        worker = sys.modules.get("transcription_worker")
+        if worker and "enabled" in data:
+            worker.set_tracing(tracing.enabled)
+        return {"enabled": tracing.enabled}
+    return tracing.export()
+
+
+def memory_info():
+    """Resident memory of this process and the transcription worker (MB), transcript store sizes"""
+    info = {"transcript": transcript_store.info()}
+    try:
+        import psutil
+    except ImportError:
+        return info
+    info["rss_mb"] = round(psutil.Process().memory_info().rss / 2**20, 1)
+    worker = app_status.get("transcription_worker") or {}
+    if worker.get("pid"):
+        try:
+            info["worker_rss_mb"] = round(psutil.Process(worker["pid"]).memory_info().rss / 2**20, 1)
+        except psutil.Error:
+            pass
+    return info
+
+
+def language_detection():
+    """Auto-detected language of the live transcription (None unless language is auto)"""
+    worker = app_status.get("transcription_worker") or {}
+    if worker.get("language_detection"):
+        return worker["language_detection"]
+    live = sys.modules.get("live_transcribe")
+    tracker = getattr(live, "language_tracker", None)
+    return tracker.status() if tracker else None
+
+
 @app.route("/api/status")
 def status():
+    app_status["memory"] = memory_info()
     return app_status
 
 
 @app.route("/api/heartbeat")
 def heartbeat():
-    global _last_heartbeat
-    _last_heartbeat = time.time()
+    if _heartbeat_timer:
+        _arm_heartbeat()
     return {"status": "ok"}
 
 
 @app.route("/api/stream")
 def stream():
-    """SSE endpoint for real-time streaming"""
+    """SSE endpoint for real-time streaming.
+
+    Query: cursor (from the last transcription event): resume after those lines.
+    """
+    resume_cursor = request.args.get("cursor") or None
+
     def generate():
         last_trans_mtime = 0
+        trans_cursor = resume_cursor
         last_analysis_mtime = 0
+        last_sections_mtime = 0
+        sent_revision = 0
+        speakers_offset = 0
+        alerts_offset = os.path.getsize(ALERTS_FILE) if os.path.exists(ALERTS_FILE) else 0
+        last_partial_version = 0
+        last_partial_sent = 0
+        partial_open = False
+        sent_language = None
+        cursor = events.cursor()
+        try:
+            import analyst
+            partial = analyst.partial_analysis
+        except Exception:
+            partial = {"active": False, "version": 0, "content": ""}
         while True:
-            trans_mtime = os.path.getmtime(TRANSCRIPTION_FILE) if os.path.exists(TRANSCRIPTION_FILE) else 0
-            analysis_mtime = os.path.getmtime(ANALYSIS_FILE) if os.path.exists(ANALYSIS_FILE) else 0
+            with span("sse.poll", cat="server"):
+                trans_mtime = os.path.getmtime(TRANSCRIPTION_FILE) if os.path.exists(TRANSCRIPTION_FILE) else 0
+                analysis_mtime = os.path.getmtime(ANALYSIS_FILE) if os.path.exists(ANALYSIS_FILE) else 0
+                sections_mtime = os.path.getmtime(ANALYSIS_SECTIONS_FILE) if os.path.exists(ANALYSIS_SECTIONS_FILE) else 0
+                speakers_size = os.path.getsize(SPEAKERS_FILE) if os.path.exists(SPEAKERS_FILE) else 0
+                alerts_size = os.path.getsize(ALERTS_FILE) if os.path.exists(ALERTS_FILE) else 0
 
             if trans_mtime != last_trans_mtime:
                 last_trans_mtime = trans_mtime
-                content = read_file_safe(TRANSCRIPTION_FILE)
-                data = json.dumps({"type": "transcription", "content": content})
-                yield f"data: {data}\n\n"
-
-            if analysis_mtime != last_analysis_mtime:
+                # The window on the first event, then only the new lines
+                with span("sse.transcription", cat="server"):
+                    content, start, trans_cursor, full = transcript_store.read_delta(trans_cursor)
+                    data = (content or full) and json.dumps({"type": "transcription", "content": content, "start": start,
+                                                             "cursor": trans_cursor, "full": full})
+                if data:
+                    yield f"data: {data}\n\n"
+
+            detection = language_detection() if app_status.get("language") == "auto" else None
+            detected = detection and (detection["language"], detection["probability"])
+            if detected and detected != sent_language:
+                sent_language = detected
+                yield f"data: {json.dumps(dict(detection, type='language'))}\n\n"
+
+            if speakers_size != speakers_offset:
+                # Diarization labels: only the lines added since the last event
+                reset = speakers_size < speakers_offset
+                labels, speakers_offset = read_speakers(0 if reset else speakers_offset)
+                if labels or reset:
+                    yield f"data: {json.dumps({'type': 'speakers', 'labels': labels, 'reset': reset})}\n\n"
+
+            if alerts_size != alerts_offset:
+                # Keyword alerts said since the last event (older ones: /api/alerts)
+                reset = alerts_size < alerts_offset
+                hits, alerts_offset = read_jsonl(ALERTS_FILE, 0 if reset else alerts_offset)
+                if hits or reset:
+                    yield f"data: {json.dumps({'type': 'alerts', 'alerts': hits, 'reset': reset})}\n\n"
+
+            if sections_mtime != last_sections_mtime:
+                # Structured analysis: only the sections this client doesn't have yet
+                last_sections_mtime = sections_mtime
+                with span("sse.sections", cat="server"):
+                    doc = sections.read()
+                    data = None
+                    if doc["revision"] != sent_revision:
+                        data = json.dumps(dict(sections.changes(doc, sent_revision), type="analysis_sections"))
+                        sent_revision = doc["revision"]
+                if data:
+                    yield f"data: {data}\n\n"
+            elif not sections_mtime and analysis_mtime != last_analysis_mtime:
                 last_analysis_mtime = analysis_mtime
-                content = read_file_safe(ANALYSIS_FILE)
-                data = json.dumps({"type": "analysis", "content": content})
+                with span("sse.analysis", cat="server"):
+                    content = read_file_safe(ANALYSIS_FILE)
+                    data = json.dumps({"type": "analysis", "content": content})
+                yield f"data: {data}\n\n"
+            elif (partial["active"] and partial["version"] != last_partial_version
+                  and time.monotonic() - last_partial_sent >= STREAM_PARTIAL_INTERVAL):
+                # Analysis being generated: push what we have so far
+                last_partial_version = partial["version"]
+                last_partial_sent = time.monotonic()
+                data = json.dumps({"type": "analysis_partial", "content": partial["content"]})
+                partial_open = True
                 yield f"data: {data}\n\n"
 
-            time.sleep(2)
+            if partial_open and not partial["active"]:
+                # Generation over, even when no section changed (or it failed): the
+                # client goes back to the current analysis
+                partial_open = False
+                yield f"data: {json.dumps({'type': 'analysis_done', 'revision': sent_revision})}\n\n"
+
+            # Sleep until something is published. Tokens of a streaming analysis
+            # arriving faster than STREAM_PARTIAL_INTERVAL wait for the next push
+            pending = partial["active"] and partial["version"] != last_partial_version
+            topics = [t for t in STREAM_TOPICS if t != "analysis_partial"] if pending else STREAM_TOPICS
+            with span("sse.wait", cat="server"):
+                timeout = (max(0.01, last_partial_sent + STREAM_PARTIAL_INTERVAL - time.monotonic()) if pending
+                           else events.settings["fallback"])
+                cursor, fired = events.wait(topics, cursor, timeout)
+            if not fired and not pending:
+                # Quiet: a comment line, so a closed connection is noticed
+                yield ": keepalive\n\n"
 
     return Response(generate(), mimetype="text/event-stream")
 
 
-def start(stop_event=None, port=5555):
-    """Entry point for module mode (called from main.py as thread)"""
-    global _stop_event_ref, _last_heartbeat
+def start(stop_event=None, port=5555, host="127.0.0.1", heartbeat=True):
+    """Entry point for module mode (called from main.py as thread).
+
+    heartbeat=False (headless mode) keeps running without a browser tab.
+    """
+    global _stop_event_ref
     _stop_event_ref = stop_event
-    _last_heartbeat = time.time()
-    # Start heartbeat watcher
-    t = threading.Thread(target=_heartbeat_watcher, daemon=True)
-    t.start()
-    print(f"[SERVER] Meeting AI Analyser available at http://localhost:{port}")
-    app.run(host="127.0.0.1", port=port, debug=False, use_reloader=False)
+    # Shutdown countdown, pushed back by every heartbeat
+    if heartbeat and stop_event:
+        _arm_heartbeat()
+    print(f"[SERVER] Meeting AI Analyser available at http://{'localhost' if host == '127.0.0.1' else host}:{port}")
+    app.run(host=host, port=port, debug=False, use_reloader=False, threaded=True)
 
 
 if __name__ == "__main__":
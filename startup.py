@@ -0,0 +1,75 @@
+"""
+Meeting AI Analyser - Startup timing
+Startup milestones (seconds since main.py started) and an import-time
+report of the app's modules, parsed from `python -X importtime`.
+"""
+import os
+import re
+import subprocess
+import sys
+import time
+
+# main.py imports this module first: close enough to process start
+_T0 = time.perf_counter()
+
+# Seconds since start, by milestone (exposed in /api/status as "startup")
+milestones = {}
+
+APP_MODULES = ("server", "analyst", "live_transcribe")
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def mark(name):
+    milestones[name] = round(time.perf_counter() - _T0, 3)
+
+
+def import_report(modules=APP_MODULES):
+    """[{"module", "self", "cumulative", "depth"}] (seconds) for a fresh interpreter importing `modules`.
+
+    A frozen build can't pass -X flags: each module's total import time is
+    measured in-process instead (depth 0 rows only).
+    """
+    if getattr(sys, "frozen", False):
+        rows = []
+        for name in modules:
+            t0 = time.perf_counter()
+            try:
+                __import__(name)
+            except Exception:
+                continue
+            elapsed = time.perf_counter() - t0
+            rows.append({"module": name, "self": elapsed, "cumulative": elapsed, "depth": 0})
+        return rows
+
+    # Modules that fail to import (e.g. no audio stack) are reported as missing, not fatal
+    code = "\n".join(f"try:\n    import {name}\nexcept Exception:\n    pass" for name in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            rows.append({
+                "module": m.group(4),
+                "self": int(m.group(1)) / 1e6,
+                "cumulative": int(m.group(2)) / 1e6,
+                "depth": len(m.group(3)) // 2,
+            })
+    return rows
+
+
+def format_report(rows, modules=APP_MODULES, top=25):
+    """Text table: total per app module, then the slowest imports by self time"""
+    by_name = {r["module"]: r for r in rows}
+    lines = ["Import time (fresh interpreter)", ""]
+    for name in modules:
+        r = by_name.get(name)
+        total = f"{r['cumulative'] * 1000:9.1f} ms" if r else "   not imported"
+        lines.append(f"  {name:<20s}{total}")
+    lines += ["", f"  {'self ms':>9s} {'cumul ms':>9s}  module (top {top} by self time)"]
+    for r in sorted(rows, key=lambda r: r["self"], reverse=True)[:top]:
+        lines.append(f"  {r['self'] * 1000:9.1f} {r['cumulative'] * 1000:9.1f}  {r['module']}")
+    return "\n".join(lines)
@@ -0,0 +1,122 @@
+"""
+Meeting AI Analyser - Lightweight tracing
+Records per-stage spans into a bounded in-memory buffer, exported as
+Chrome trace JSON (open in chrome://tracing or https://ui.perfetto.dev).
+
+Usage:
+    from tracing import span
+    with span("transcribe", cat="whisper", segment=12):
+        ...
+
+Disabled by default: span() then returns a shared no-op context manager.
+"""
+import collections
+import json
+import os
+import threading
+import time
+
+DEFAULT_CAPACITY = 50000
+
+enabled = False
+_buffer = collections.deque(maxlen=DEFAULT_CAPACITY)
+_thread_names = {}
+# Already exported events from other processes (the transcription worker)
+_external = collections.deque(maxlen=DEFAULT_CAPACITY)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        add(self.name, self.start, time.perf_counter(), self.cat, **self.args)
+        return False
+
+
+def span(name, cat="app", **args):
+    """Context manager timing one stage (no-op when tracing is disabled)"""
+    if not enabled:
+        return _NULL_SPAN
+    return _Span(name, cat, args)
+
+
+def add(name, start, end, cat="app", **args):
+    """Record a span measured by the caller (time.perf_counter() values)"""
+    if not enabled:
+        return
+    t = threading.current_thread()
+    _thread_names.setdefault(t.ident, t.name)
+    _buffer.append((name, cat, start, end - start, t.ident, args))
+
+
+def extend(events):
+    """Merge trace events exported by another process (keeps their pid/tid)"""
+    if enabled:
+        _external.extend(events)
+
+
+def enable(capacity=None):
+    global enabled, _buffer, _external
+    if capacity and capacity != _buffer.maxlen:
+        _buffer = collections.deque(_buffer, maxlen=capacity)
+        _external = collections.deque(_external, maxlen=capacity)
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def clear():
+    _buffer.clear()
+    _external.clear()
+
+
+def export():
+    """Buffered spans as a Chrome trace / Perfetto JSON object"""
+    pid = os.getpid()
+    events = [
+        {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": tname}}
+        for tid, tname in list(_thread_names.items())
+    ]
+    for name, cat, start, dur, tid, args in list(_buffer):
+        events.append({
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": round(start * 1e6, 3),
+            "dur": round(dur * 1e6, 3),
+            "pid": pid,
+            "tid": tid,
+            "args": args,
+        })
+    events.extend(_external)
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def dump(path):
+    """Write the trace buffer to a .json file"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(export(), f)
+    return path
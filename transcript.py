@@ -0,0 +1,182 @@
+"""
+Meeting AI Analyser - Transcript helpers
+Parses the live transcription ([HH:MM:SS] lines) and splits it into
+time-bounded chunks for map-reduce analysis
+"""
+import re
+
+LINE_RE = re.compile(r"^\[(\d{2}):(\d{2}):(\d{2})\]\s?(.*)$")
+
+
+def parse_lines(text):
+    """List of (seconds, line) for timestamped lines.
+
+    Seconds are monotonic: a meeting running past midnight keeps increasing.
+    Untimestamped lines (header, wrapped text) stick to the previous line.
+    """
+    lines = []
+    day_offset = 0
+    prev = None
+    for raw in text.splitlines():
+        m = LINE_RE.match(raw)
+        if not m:
+            if lines and raw.strip():
+                seconds, line = lines[-1]
+                lines[-1] = (seconds, line + "\n" + raw)
+            continue
+        seconds = int(m.group(1)) * 3600 + int(m.group(2)) * 60 + int(m.group(3)) + day_offset
+        if prev is not None and seconds < prev - 12 * 3600:
+            day_offset += 86400
+            seconds += 86400
+        prev = seconds
+        lines.append((seconds, raw))
+    return lines
+
+
+def chunk_lines(lines, window=300, partial_head=False):
+    """Group parsed lines into windows of `window` seconds of clock time.
+
+    Chunks are aligned on the clock, not on the first line, so a transcript
+    window that moves forward (long-session mode) keeps the same chunks.
+    Returns a list of {"start", "end", "text", "closed", "partial"}; every
+    chunk but the last is closed (no more lines can land in it), so its text
+    never changes. partial_head: the text was cut before the first line, whose
+    chunk is then marked partial (its older lines may be missing).
+    """
+    chunks = []
+    current_idx = None
+    for seconds, line in lines:
+        idx = seconds // window
+        if idx != current_idx:
+            chunks.append({"start": idx * window, "end": seconds, "lines": []})
+            current_idx = idx
+        chunks[-1]["lines"].append(line)
+        chunks[-1]["end"] = seconds
+    for i, chunk in enumerate(chunks):
+        chunk["text"] = "\n".join(chunk.pop("lines"))
+        chunk["closed"] = i < len(chunks) - 1
+        chunk["partial"] = partial_head and i == 0
+    return chunks
+
+
+def format_clock(seconds):
+    seconds = int(seconds) % 86400
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+# ---------------------------------------------------------------------------
+# Compression before prompting
+# ---------------------------------------------------------------------------
+
+# Whisper output on silence/noise, dropped when it is the whole segment
+HALLUCINATIONS = {
+    "thank you", "thank you very much", "thanks for watching", "thank you for watching",
+    "please subscribe", "bye", "you", "subtitles by the amaraorg community",
+}
+FILLER_RE = re.compile(r",?\s*\b(?:uh+|um+|erm|hmm+|mm+)\b[,.]?(?=\s|$)", re.IGNORECASE)
+# Sentence ends: punctuation followed by whitespace (not "3.5" or inside "e.g.")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+_WORD_RE = re.compile(r"[\w']+")
+
+
+def _norm(text):
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def _collapse_sentences(text):
+    """"Okay. Okay. Okay. Let's go." -> "Okay. Let's go."
+
+    "Revenue hit 3.5 million, e.g. in Q3." is left as is.
+    """
+    out = []
+    prev = None
+    for sentence in _SENTENCE_END_RE.split(text.strip()):
+        key = _norm(sentence)
+        if key and key != prev:
+            out.append(sentence.strip())
+        prev = key or prev
+    return " ".join(out)
+
+
+def _strip_overlap(text, prev, min_overlap=3, max_check=20):
+    """Drop the start of text if it repeats the end of prev (punctuation/case-insensitive)"""
+    prev_words = _norm(prev).split()
+    words = text.split()
+    norm_words = [_norm(w) for w in words]
+    best = 0
+    for n in range(min_overlap, min(len(prev_words), len(words), max_check) + 1):
+        if prev_words[-n:] == norm_words[:n]:
+            best = n
+    return " ".join(words[best:])
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token for English)"""
+    return (len(text) + 3) // 4
+
+
+def compress(text, granularity=60):
+    """Normalize a timestamped transcript for prompting.
+
+    Drops fillers and silence hallucinations, collapses repeated sentences and
+    lines, strips residual overlaps between segments, and merges consecutive
+    lines into one paragraph per `granularity` seconds with an [HH:MM] stamp.
+    Text without timestamps is returned as is.
+    """
+    lines = parse_lines(text)
+    if not lines:
+        return text
+    blocks = []
+    prev = ""
+    for seconds, line in lines:
+        first, *wrapped = line.split("\n")
+        body = " ".join([LINE_RE.match(first).group(4)] + wrapped)
+        body = _collapse_sentences(FILLER_RE.sub("", body))
+        key = _norm(body)
+        if not key or key in HALLUCINATIONS or key == _norm(prev):
+            continue
+        body = _strip_overlap(body, prev)
+        if not body:
+            continue
+        prev = body
+        slot = seconds // granularity
+        if blocks and blocks[-1][0] == slot:
+            blocks[-1][2].append(body)
+        else:
+            blocks.append((slot, seconds, [body]))
+    return "\n".join(f"[{format_clock(start)[:5]}] {' '.join(parts)}" for _, start, parts in blocks)
+
+
+def fit_budget(text, budget, policy="head_tail"):
+    """Trim a (compressed) transcript to about `budget` tokens, whole lines only.
+
+    policy "tail" keeps the most recent lines; "head_tail" also keeps the
+    opening (a fifth of the budget), where the meeting goal is usually stated.
+    Omitted lines are replaced by a marker.
+    """
+    if not budget or estimate_tokens(text) <= budget:
+        return text
+    lines = text.split("\n")
+    head = []
+    if policy == "head_tail":
+        used = 0
+        for line in lines:
+            cost = estimate_tokens(line) + 1
+            if used + cost > budget // 5:
+                break
+            head.append(line)
+            used += cost
+        budget -= used
+    tail = []
+    for line in reversed(lines[len(head):]):
+        cost = estimate_tokens(line) + 1
+        if cost > budget:
+            break
+        tail.append(line)
+        budget -= cost
+    if not tail and len(lines) > len(head):
+        # Even the newest line is over budget: keep what fits of it (and the marker)
+        tail.append(lines[-1][:max(budget - 10, 4) * 4].rstrip() + " [...]")
+    omitted = len(lines) - len(head) - len(tail)
+    marker = [f"[... {omitted} lines omitted ...]"] if omitted else []
+    return "\n".join(head + marker + tail[::-1])
@@ -0,0 +1,206 @@
+"""
+Meeting AI Analyser - Long-session transcript store
+Keeps an all-day transcript cheap to serve and analyze (main.py --long-session).
+
+The writer (live_transcribe.append_line) rolls the live file over into
+numbered archive parts (data/transcript_archive/part-0001.txt ...) once it
+grows past rollover_bytes. Readers (SSE stream, /api/transcription, the
+analyst) get a window: the last window_chars of the transcript, made of the
+live file plus the tail of the latest archive parts. The live file stays
+small, so memory and per-request cost don't grow with the meeting length.
+
+Offsets are logical: characters since the start of the transcript, archive
+parts included. The analyst uses them to find what was said since its last run,
+and read_delta() to send clients only the lines they don't have yet.
+
+Disabled (the default), the live file is never rolled over and the window
+is the whole file.
+"""
+import hashlib
+import json
+import os
+import shutil
+
+from paths import TRANSCRIPTION_FILE, TRANSCRIPT_ARCHIVE_DIR
+
+INDEX_FILE = os.path.join(TRANSCRIPT_ARCHIVE_DIR, "index.json")
+
+settings = {"enabled": False, "rollover_bytes": 256 * 1024, "window_chars": 48 * 1024}
+
+# Characters before a read_delta() cursor that must still match
+CURSOR_MARK = 64
+
+# Reader-side copy of the archive index, reloaded when the file changes
+_index_cache = {"mtime": None, "index": None}
+
+
+def configure(enabled=True, rollover_bytes=None, window_chars=None):
+    settings["enabled"] = enabled
+    if rollover_bytes:
+        settings["rollover_bytes"] = rollover_bytes
+    if window_chars:
+        settings["window_chars"] = window_chars
+
+
+def fingerprint(text):
+    """Short digest used to detect changes without keeping the text around"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _empty_index():
+    return {"parts": [], "chars": 0, "bytes": 0}
+
+
+def read_index():
+    """{"parts": [{"file", "chars", "bytes"}], "chars", "bytes"} of the archive"""
+    try:
+        mtime = os.path.getmtime(INDEX_FILE)
+    except OSError:
+        return _empty_index()
+    if mtime != _index_cache["mtime"]:
+        try:
+            with open(INDEX_FILE, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return _empty_index()
+        _index_cache.update(mtime=mtime, index=index)
+    return _index_cache["index"]
+
+
+def _write_index(index):
+    tmp = INDEX_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp, INDEX_FILE)
+
+
+def maybe_rollover(path=TRANSCRIPTION_FILE):
+    """Writer side, before appending: archive the live file once it is too big.
+
+    The live file is copied to the next part then truncated (not renamed:
+    on Windows a reader may have it open). True if it was rolled over.
+    """
+    if not settings["enabled"]:
+        return False
+    try:
+        if os.path.getsize(path) < settings["rollover_bytes"]:
+            return False
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+    except OSError:
+        return False
+    os.makedirs(TRANSCRIPT_ARCHIVE_DIR, exist_ok=True)
+    index = dict(read_index())
+    name = f"part-{len(index['parts']) + 1:04d}.txt"
+    size = len(text.encode("utf-8"))
+    with open(os.path.join(TRANSCRIPT_ARCHIVE_DIR, name), "w", encoding="utf-8") as f:
+        f.write(text)
+    open(path, "w", encoding="utf-8").close()
+    index["parts"] = index["parts"] + [{"file": name, "chars": len(text), "bytes": size}]
+    index["chars"] += len(text)
+    index["bytes"] += size
+    _write_index(index)
+    return True
+
+
+def clear():
+    """New transcript: drop the archive"""
+    shutil.rmtree(TRANSCRIPT_ARCHIVE_DIR, ignore_errors=True)
+    _index_cache.update(mtime=None, index=None)
+
+
+def _read(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def _tail(path, max_chars):
+    """Last max_chars characters of a file, reading only its end"""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            # UTF-8: at most 4 bytes per character
+            f.seek(max(0, size - 4 * max_chars))
+            data = f.read()
+    except OSError:
+        return ""
+    return data.decode("utf-8", errors="ignore")[-max_chars:]
+
+
+def read_window(max_chars=None, path=TRANSCRIPTION_FILE):
+    """(text, start): the end of the transcript and the logical offset of its first character.
+
+    At most max_chars (window_chars by default) when enabled, cut at a line
+    start; the whole live file (start 0) otherwise.
+    """
+    live = _read(path)
+    if not settings["enabled"]:
+        return live, 0
+    max_chars = max_chars or settings["window_chars"]
+    index = read_index()
+    end = index["chars"] + len(live)
+    if len(live) >= max_chars:
+        text = live[-max_chars:]
+    else:
+        # Fill the window from the latest archive parts, newest first
+        pieces = [live]
+        need = max_chars - len(live)
+        for part in reversed(index["parts"]):
+            if need <= 0:
+                break
+            piece = _tail(os.path.join(TRANSCRIPT_ARCHIVE_DIR, part["file"]), need)
+            pieces.append(piece)
+            need -= len(piece)
+        text = "".join(reversed(pieces))
+    if len(text) < end:
+        # Started mid-line: drop the partial line
+        cut = text.find("\n") + 1
+        text = text[cut:] if cut else text
+    return text, end - len(text)
+
+
+def _cursor(text, start, pos):
+    """Cursor of logical position pos: the offset and a digest of the CURSOR_MARK chars before it"""
+    i = pos - start
+    return f"{pos}:{fingerprint(text[max(0, i - CURSOR_MARK):i])[:12]}"
+
+
+def read_delta(cursor=None, path=TRANSCRIPTION_FILE):
+    """(content, start, cursor, full): the complete lines added since `cursor`.
+
+    cursor is the value returned by the previous call. When it no longer
+    matches the transcript (reset, rewritten file, or older than the window)
+    or is missing, the whole window is returned with full=True.
+    """
+    text, start = read_window(path=path)
+    # Complete lines only: a line being written goes with the next delta
+    text = text[:text.rfind("\n") + 1]
+    end = start + len(text)
+    pos = None
+    if cursor:
+        try:
+            pos = int(cursor.split(":", 1)[0])
+        except ValueError:
+            pos = None
+    if pos is not None and start <= pos <= end and _cursor(text, start, pos) == cursor:
+        return text[pos - start:], pos, _cursor(text, start, end), False
+    return text, start, _cursor(text, start, end), True
+
+
+def info(path=TRANSCRIPTION_FILE):
+    index = read_index()
+    try:
+        live_bytes = os.path.getsize(path)
+    except OSError:
+        live_bytes = 0
+    return {
+        "enabled": settings["enabled"],
+        "archived_parts": len(index["parts"]),
+        "archived_bytes": index["bytes"],
+        "live_bytes": live_bytes,
+        "window_chars": settings["window_chars"] if settings["enabled"] else 0,
+    }
@@ -0,0 +1,513 @@
+"""
+Meeting AI Analyser - Transcription worker process
+Runs the Whisper segment loop in its own process, so decoding never
+competes with the web server and the analyst for the GIL, and a crash or a
+hang there is recovered by restarting the worker.
+
+Audio capture stays in the main process (PyAudio callbacks only copy
+bytes): each source is handed over through a shared-memory ring buffer.
+Two queues form the control channel: commands down (language, model, trace,
+stop), events up (ready, segment, model, error, trace, log, event, stopped).
+"event" carries what the worker publishes on its event bus (transcript,
+speakers, alerts), republished on the main process bus (events.py).
+
+Usage (main.py):
+    import transcription_worker
+    transcription_worker.start(stop_event, mic_device=None, segment=10,
+                               model_size="small", language="en", no_mic=False)
+"""
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import applog
+import audio_mixer
+import events as bus
+import live_transcribe
+import tracing
+import transcript_store
+from paths import AUDIO_TEMP
+from tracing import span
+
+# Ring capacity: at least this many seconds of source audio, and 4 segments
+RING_SECONDS = 60
+# Longest sleep of the segment loop: it wakes when the segment should be
+# complete, or at once for a command
+POLL_INTERVAL = 5
+# Seconds a stop request may take before the worker is terminated
+STOP_TIMEOUT = 5
+# A running worker that hasn't looped for this long is considered hung
+HANG_TIMEOUT = 180
+# Unexpected exits restarted in a row before giving up
+MAX_RESTARTS = 5
+
+# Exposed in /api/status as "transcription_worker"
+worker_status = {
+    "state": "stopped",  # stopped | starting | running | loading | restarting | error
+    "pid": None,
+    "model": "",
+    "language": "",
+    "segments": 0,
+    "restarts": 0,
+    "dropped_bytes": 0,
+    "last_text": "",
+    "diarization": None,
+    "inference": {},
+    "alerts": None,
+    "language_detection": None,
+    "mixer": None,
+    "error": "",
+}
+
+_engine = None
+
+
+class AudioRing:
+    """Single-producer / single-consumer byte ring in shared memory.
+
+    The header holds monotonically increasing write/read byte counters, the
+    bytes dropped on overflow and the capacity, as uint64. Only the producer
+    moves the write counter and only the consumer the read counter, so no
+    lock is needed across processes. When the consumer falls behind, new
+    audio is dropped (and counted) rather than overwriting unread data.
+    It is followed by the producer's capture clock fit (audio_mixer.CaptureClock
+    state), as float64.
+    """
+
+    HEADER = 48  # write, read, dropped, capacity, clock start, clock period
+
+    def __init__(self, capacity=0, name=None):
+        self.owner = name is None
+        if self.owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=self.HEADER + capacity)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self.name = self._shm.name
+        self._header = self._shm.buf[:32].cast("Q")
+        self.clock = self._shm.buf[32:self.HEADER].cast("d")
+        if self.owner:
+            self._header[0] = self._header[1] = self._header[2] = 0
+            self._header[3] = capacity
+            self.clock[0] = self.clock[1] = 0.0
+        self.capacity = self._header[3]
+        self._data = self._shm.buf[self.HEADER:self.HEADER + self.capacity]
+
+    @property
+    def dropped(self):
+        return self._header[2]
+
+    def available(self):
+        return self._header[0] - self._header[1]
+
+    def write(self, data):
+        """Producer: append bytes; False (data dropped) if they don't fit"""
+        n = len(data)
+        w = self._header[0]
+        if n > self.capacity - (w - self._header[1]):
+            self._header[2] += n
+            return False
+        pos = w % self.capacity
+        first = min(n, self.capacity - pos)
+        view = memoryview(data)
+        self._data[pos:pos + first] = view[:first]
+        if first < n:
+            self._data[:n - first] = view[first:]
+        # Publish only once the bytes are in place
+        self._header[0] = w + n
+        return True
+
+    def read(self):
+        """Consumer: every available byte"""
+        r = self._header[1]
+        n = self._header[0] - r
+        pos = r % self.capacity
+        first = min(n, self.capacity - pos)
+        out = bytearray(self._data[pos:pos + first])
+        if first < n:
+            out += self._data[:n - first]
+        self._header[1] = r + n
+        return bytes(out)
+
+    def clear(self):
+        """Consumer: discard the available bytes; returns the stream position reading resumes at
+        (bytes captured so far, dropped ones included)"""
+        self._header[1] = self._header[0]
+        return self._header[1] + self._header[2]
+
+    def close(self):
+        self._header.release()
+        self.clock.release()
+        self._data.release()
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+
+# ---------------------------------------------------------------------------
+# Worker process
+# ---------------------------------------------------------------------------
+
+def _handle_command(cmd, value, state, events):
+    if cmd == "language":
+        state["language"] = value
+    elif cmd == "reset" and state["diarizer"]:
+        state["diarizer"].reset()
+    elif cmd == "model" and value != state["model_size"]:
+        # The segment loop (and its beat) is blocked until the model is loaded
+        events.put(("loading", value))
+        model = live_transcribe.load_whisper_model(value)
+        if model is None:
+            events.put(("error", f"failed to load Whisper model '{value}'"))
+        else:
+            state["model"], state["model_size"] = model, value
+            events.put(("model", {"model": value, "inference": dict(live_transcribe.inference_settings)}))
+    elif cmd == "trace":
+        if value:
+            tracing.enable()
+        else:
+            tracing.disable()
+
+
+def worker_main(config, commands, events, beat):
+    """Worker process entry point: Whisper segment loop fed by the rings"""
+    if config["trace"]:
+        tracing.enable()
+    # Log lines are written by the main process (single writer per file)
+    applog.configure(config["log_level"])
+    applog.redirect(lambda record: events.put(("log", record)))
+    bus.subscribe("*", lambda topic, data: events.put(("event", (topic, data))))
+    transcript_store.settings.update(config["transcript_store"])
+    rings = {source: AudioRing(name=name) for source, name in config["rings"].items()}
+    lb, mic = config["devices"]["loopback"], config["devices"]["mic"]
+    state = {"language": config["language"], "model_size": config["model_size"], "model": None, "diarizer": None}
+    segment_count = 0
+    try:
+        state["model"] = live_transcribe.load_whisper_model(state["model_size"])
+        if state["model"] is None:
+            events.put(("error", f"failed to load Whisper model '{state['model_size']}'"))
+            return
+        if config["init_output"]:
+            live_transcribe.init_output()
+        if config["diarize"]:
+            state["diarizer"] = live_transcribe.make_diarizer(reset=config["init_output"])
+        diarizer = state["diarizer"]
+        alerter = live_transcribe.make_alerter(reset=config["init_output"])
+        # Fed by the capture clocks of the main process (ring headers)
+        mixer = live_transcribe.make_mixer(config["devices"], {
+            source: audio_mixer.CaptureClock(config["devices"][source]["rate"], state=ring.clock)
+            for source, ring in rings.items()})
+        # Audio captured while the model loaded is stale
+        skipped = {source: ring.clear() // (2 * config["devices"][source]["channels"])
+                   for source, ring in rings.items()}
+        if mixer:
+            mixer.skip(skipped["loopback"], skipped["mic"])
+        events.put(("ready", {"pid": os.getpid(), "model": state["model_size"], "language": state["language"],
+                              "inference": dict(live_transcribe.inference_settings)}))
+
+        first_segment_samples, samples_per_segment = live_transcribe.segment_thresholds(lb["rate"], config["segment"])
+        frame_bytes = 2 * lb["channels"]
+        prev_text = ""
+        wait_start = time.perf_counter()
+        parent = multiprocessing.parent_process()
+
+        while parent is None or parent.is_alive():
+            beat.value = time.time()
+            threshold = first_segment_samples if segment_count == 0 else samples_per_segment
+            missing = threshold - rings["loopback"].available() // frame_bytes
+            # Sleep until the segment should be complete (the ring can't signal across processes)
+            timeout = min(POLL_INTERVAL, max(0.01, missing / lb["rate"])) if missing > 0 else 0
+            try:
+                cmd, value = commands.get(timeout=timeout) if timeout else commands.get_nowait()
+            except queue.Empty:
+                cmd = value = None
+            if cmd == "stop":
+                break
+            if cmd:
+                _handle_command(cmd, value, state, events)
+
+            if rings["loopback"].available() // frame_bytes < threshold:
+                continue
+
+            segment_count += 1
+            tracing.add("wait_segment", wait_start, time.perf_counter(), cat="transcribe",
+                        segment=segment_count)
+            lb_raw = rings["loopback"].read()
+            mic_raw = rings["mic"].read() if mic else None
+            with span("segment", cat="transcribe", segment=segment_count):
+                text, prev_text = live_transcribe.process_segment(
+                    state["model"], segment_count, lb_raw, lb["channels"], lb["rate"],
+                    mic_raw, *live_transcribe.mic_format(mic), prev_text, state["language"], diarizer, alerter,
+                    mixer,
+                )
+            wait_start = time.perf_counter()
+            events.put(("segment", {"count": segment_count, "text": text,
+                                    "dropped": sum(r.dropped for r in rings.values()),
+                                    "diarization": dict(diarizer.stats) if diarizer else None,
+                                    "alerts": dict(alerter.stats),
+                                    "mixer": dict(mixer.stats) if mixer else None,
+                                    "language_detection": live_transcribe.language_tracker.status()
+                                    if live_transcribe.language_tracker else None}))
+            if tracing.enabled:
+                events.put(("trace", tracing.export()["traceEvents"]))
+                tracing.clear()
+    finally:
+        for ring in rings.values():
+            ring.close()
+        if os.path.exists(AUDIO_TEMP):
+            os.remove(AUDIO_TEMP)
+        events.put(("stopped", segment_count))
+
+
+# ---------------------------------------------------------------------------
+# Main process side
+# ---------------------------------------------------------------------------
+
+class TranscriptionEngine:
+    """Owns the capture streams, the rings and the worker process"""
+
+    def __init__(self, mic_device=None, segment=live_transcribe.DEFAULT_SEGMENT_DURATION,
+                 model_size="small", language="en", no_mic=False, diarize=False):
+        self.options = {"mic_device": mic_device, "segment": segment, "model_size": model_size,
+                        "language": language, "no_mic": no_mic, "diarize": diarize}
+        self._ctx = multiprocessing.get_context("spawn")
+        self._lock = threading.RLock()
+        self._pa = None
+        self._streams = []
+        self._rings = {}
+        self._proc = None
+        self._commands = None
+        self._beat = None
+        self._reader = None
+        # Only the first worker starts a fresh transcription file
+        self._fresh = True
+
+    def start(self):
+        """Open capture and spawn a worker; False if no loopback device"""
+        import pyaudiowpatch as pyaudio
+
+        with self._lock:
+            opts = self.options
+            live_transcribe.active_language = opts["language"]
+            worker_status.update(state="starting", model=opts["model_size"], language=opts["language"], error="")
+            self._pa = pyaudio.PyAudio()
+            devices = live_transcribe.select_devices(self._pa, opts["mic_device"], opts["no_mic"])
+            if devices is None:
+                self._pa.terminate()
+                self._pa = None
+                worker_status.update(state="error", error="no WASAPI loopback device")
+                return False
+            live_transcribe.print_config(devices, opts["segment"], opts["model_size"], opts["language"])
+
+            seconds = max(RING_SECONDS, 4 * opts["segment"])
+            for source, settings in devices.items():
+                if settings:
+                    self._rings[source] = AudioRing(seconds * settings["rate"] * settings["channels"] * 2)
+
+            self._commands = self._ctx.Queue()
+            events = self._ctx.Queue()
+            self._beat = self._ctx.Value("d", time.time(), lock=False)
+            config = {
+                "devices": devices,
+                "rings": {source: ring.name for source, ring in self._rings.items()},
+                "segment": opts["segment"],
+                "model_size": opts["model_size"],
+                "language": opts["language"],
+                "init_output": self._fresh,
+                "diarize": opts["diarize"],
+                "trace": tracing.enabled,
+                "log_level": applog.level,
+                "transcript_store": dict(transcript_store.settings),
+            }
+            self._proc = self._ctx.Process(target=worker_main, args=(config, self._commands, events, self._beat),
+                                           name="transcription-worker", daemon=True)
+            self._proc.start()
+            self._fresh = False
+            worker_status["pid"] = self._proc.pid
+            self._reader = threading.Thread(target=self._read_events, args=(events, self._proc),
+                                            name="transcription-events", daemon=True)
+            self._reader.start()
+
+            # The worker discards what arrives while its model loads
+            for source, ring in self._rings.items():
+                clock = audio_mixer.CaptureClock(devices[source]["rate"], state=ring.clock)
+                self._streams.append(live_transcribe.open_capture(self._pa, source, devices[source], ring.write, clock))
+            print(f"[WORKER] Transcription worker started (pid {self._proc.pid})")
+            return True
+
+    def _read_events(self, events, proc):
+        while True:
+            try:
+                event, data = events.get(timeout=1)
+            except queue.Empty:
+                if not proc.is_alive():
+                    return
+                continue
+            except (EOFError, OSError):
+                return
+            if event == "ready":
+                worker_status.update(state="running", **data)
+                print(f"[WORKER] Ready: model {data['model']}, language {data['language']}")
+            elif event == "segment":
+                worker_status["segments"] += 1
+                worker_status["dropped_bytes"] = data["dropped"]
+                worker_status["diarization"] = data["diarization"]
+                worker_status["alerts"] = data["alerts"]
+                worker_status["language_detection"] = data["language_detection"]
+                worker_status["mixer"] = data["mixer"]
+                if data["text"]:
+                    worker_status["last_text"] = data["text"]
+                bus.publish("segment", count=data["count"])
+            elif event == "loading":
+                worker_status["state"] = "loading"
+                print(f"[WORKER] Loading model {data}...")
+            elif event == "model":
+                self._loaded()
+                worker_status.update(data)
+                print(f"[WORKER] Model switched to {data['model']}")
+            elif event == "error":
+                if worker_status["state"] == "loading":
+                    self._loaded()
+                worker_status["error"] = data
+                print(f"[WORKER] {data}")
+            elif event == "trace":
+                tracing.extend(data)
+            elif event == "log":
+                applog.emit(data)
+            elif event == "event":
+                bus.publish(data[0], **data[1])
+            elif event == "stopped":
+                return
+
+    def _loaded(self):
+        """Model switch over: back to running, the load time doesn't count as a hang"""
+        self._beat.value = time.time()
+        worker_status["state"] = "running"
+
+    def send(self, cmd, value=None):
+        with self._lock:
+            if self._proc and self._proc.is_alive():
+                self._commands.put((cmd, value))
+
+    def set_language(self, language):
+        self.options["language"] = language
+        worker_status["language"] = language
+        self.send("language", language)
+
+    def set_model(self, model_size):
+        self.options["model_size"] = model_size
+        self.send("model", model_size)
+
+    def stop(self):
+        """Stop capture, then ask the worker to exit (terminated if it doesn't)"""
+        with self._lock:
+            for stream in self._streams:
+                try:
+                    stream.stop_stream()
+                    stream.close()
+                except Exception:
+                    pass
+            self._streams = []
+            if self._proc:
+                if self._proc.is_alive():
+                    self._commands.put(("stop", None))
+                    self._proc.join(STOP_TIMEOUT)
+                if self._proc.is_alive():
+                    print("[WORKER] Not responding, terminating")
+                    self._proc.terminate()
+                    self._proc.join(2)
+                if self._proc.is_alive():
+                    self._proc.kill()
+                    self._proc.join()
+                self._reader.join(1)
+                self._commands.close()
+                self._proc = None
+            if self._pa:
+                self._pa.terminate()
+                self._pa = None
+            for ring in self._rings.values():
+                ring.close()
+            self._rings = {}
+            worker_status.update(state="stopped", pid=None)
+
+    def restart(self, **changes):
+        """Clean worker restart, optionally with new options (e.g. mic_device)"""
+        with self._lock:
+            worker_status["state"] = "restarting"
+            self.stop()
+            self.options.update(changes)
+            worker_status["restarts"] += 1
+            return self.start()
+
+    def alive(self):
+        return self._proc is not None and self._proc.is_alive()
+
+    def hung(self):
+        # "loading" (model switch) blocks the loop on purpose: not a hang
+        return (worker_status["state"] == "running" and self._beat is not None
+                and time.time() - self._beat.value > HANG_TIMEOUT)
+
+    def supervise(self, stop_event):
+        """Block until stop_event; restarts a worker that died or hung"""
+        failures = 0
+        while not stop_event.wait(1):
+            with self._lock:
+                if self._proc is None:
+                    continue
+                if self.alive() and not self.hung():
+                    if worker_status["state"] == "running":
+                        failures = 0
+                    continue
+                if failures >= MAX_RESTARTS:
+                    worker_status.update(state="error", error=f"worker failed {failures} times, giving up")
+                    print(f"[WORKER] {worker_status['error']}")
+                    self.stop()
+                    worker_status["state"] = "error"
+                    continue
+                failures += 1
+                reason = "hung" if self.alive() else f"exited (code {self._proc.exitcode})"
+                print(f"[WORKER] Worker {reason}, restarting...")
+                live_transcribe._tlog.warning(f"Worker {reason}, restarting")
+                self.restart()
+        self.stop()
+
+
+def start(stop_event, **options):
+    """Entry point for module mode (main.py transcription thread): returns on stop_event"""
+    global _engine
+    _engine = TranscriptionEngine(**options)
+    if _engine.start():
+        _engine.supervise(stop_event)
+
+
+def is_managed():
+    """True when the worker is managed by this process (main.py launch)"""
+    return _engine is not None and worker_status["state"] != "stopped"
+
+
+def restart(**changes):
+    return _engine.restart(**changes)
+
+
+def set_language(language):
+    live_transcribe.active_language = language
+    if _engine:
+        _engine.set_language(language)
+
+
+def reset_speakers():
+    live_transcribe.reset_speakers()
+    if _engine:
+        _engine.send("reset")
+
+
+def set_model(model_size):
+    if _engine:
+        _engine.set_model(model_size)
+
+
+def set_tracing(enabled):
+    if _engine:
+        _engine.send("trace", enabled)